@@ -65,6 +65,9 @@ from src.hotkeys import HotkeyManager
 from src.osrs_items import OSRSItems
 from src.phase_tracker import RotationManager as ColorDataManager # For color data
 from src.ui_utils import UI_GRID_SPECS # For inventory slot detection
+from src.game_screen import GameScreen # For pixel sampling
+from src.vision.color_lut import PhasePalette # For phase classification
+from src.vision.vitals import VitalsReader # For orb-based HP/prayer
 
 # --- Globals for Click Detection ---
 CLICK_DETECTOR = None
@@ -85,16 +88,14 @@ class ClickPhaseDetector:
         self.listener = None
         self.client_window = client
         self.ui_interaction = UIInteraction(HumanizedGridClicker(), None, self.client_window)
+        self.game_screen = GameScreen()
         self.color_data_manager = ColorDataManager()
         self.phase_colors = {p_info['style']: p_info['colors'] for _, p_info in self.color_data_manager._get_zulrah_rotations_data()['types'].items()}
         self.tolerance = 20
+        self.palette = PhasePalette(self.phase_colors, self.tolerance)
 
     def get_phase_from_color(self, clicked_color: tuple) -> str:
-        for phase, colors in self.phase_colors.items():
-            for color in colors:
-                if all(abs(int(clicked_color[i]) - color[i]) <= self.tolerance for i in range(3)):
-                    return phase
-        return None
+        return self.palette.classify_color(clicked_color)
 
     def on_click(self, x, y, button, pressed):
         global LISTENING_FOR_PHASE_CLICK, SCRIPT, PHASE_HANDLER, AWAITING_MAGIC_XP_DROP, combat_mode_active
@@ -109,7 +110,7 @@ class ClickPhaseDetector:
             return
 
         # --- Phase Click Detection ---
-        clicked_color = pyautogui.pixel(x, y)
+        clicked_color = tuple(int(c) for c in self.game_screen.sample_pixels([(x, y)])[0])
         detected_phase = self.get_phase_from_color(clicked_color)
 
         expected_phase = SCRIPT['state']['phase'] # Get expected phase for logging
@@ -218,6 +219,7 @@ SCRIPT={
         "manual_spell_slot": 1,
         "manual_spell_book": "standard",
         "render_grids_and_clicks": False,
+        "use_orb_vitals": False, # Read HP/prayer from the minimap orbs instead of the API; orb rects are not verified yet
     },
     "state": {
         "start_time": int(0),
@@ -801,10 +803,19 @@ def equip_melee(): equip_gear(target_type="MELEE")
 
 def get_async_hp_prayer(api: RuneLiteAPI, stop_event: threading.Event):
     global health, prayer
+    # Opt-in: read the minimap orbs; the API is then only asked every few seconds to cross-check
+    vitals = VitalsReader(CLICK_DETECTOR.game_screen if CLICK_DETECTOR else None, api=api) if SCRIPT['settings']['use_orb_vitals'] else None
     try:
         while not stop_event.is_set():
-            health = api.get_health_points()
-            prayer = api.get_prayer_points()
+            if vitals is not None:
+                values = vitals.read()
+                health = values['hitpoints']
+                prayer = values['prayer']
+            else:
+                # One /stats request covers both values
+                stats = api.get_stats() or {}
+                health = stats['HITPOINTS']['boostedLevel'] if 'HITPOINTS' in stats else None
+                prayer = stats['PRAYER']['boostedLevel'] if 'PRAYER' in stats else None
             time.sleep(0.1) # Polling interval
     finally:
         print("HP/Prayer thread stopped")
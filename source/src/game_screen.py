@@ -3,116 +3,439 @@ This module provides a GameScreen class for interacting with the game screen,
 including color detection, OCR, and other screen analysis tools.
 """
 
-import pyautogui
 import numpy as np
 import cv2
-from PIL import ImageGrab
-import easyocr
 import re
 import os
-import sys
-import warnings
 
-from .client_window import RuneLiteClientWindow
+from .ui_utils import CoordinateTransformer, get_probe_set
+from .vision.capture import CaptureBackend, create_backend
+from .vision.frame_cache import FrameCache
+from .vision.phase_detection import detect_phase, detect_phase_scores, detect_phase_in_regions
+from .vision import color_search
+from .vision.color_query import ColorQuerySet, QueryResult
+from .vision.pyramid import FramePyramid
+from .vision.color_space import color_ranges, convert as convert_color_space
+from .vision import kernels
+from .vision.ui_mask import UIMaskCache
+from .vision import ocr
+from .vision.glyph_ocr import GlyphReader, supports_scale
 
 class GameScreen:
     """
     A class to handle screen interactions, including OCR and color detection.
     """
 
-    def __init__(self):
-        # Temporarily suppress stdout/stderr and warnings to hide the noisy
-        # "CUDA not available" and "pin_memory" messages from easyocr/torch.
-        original_stdout = sys.stdout
-        original_stderr = sys.stderr
-        sys.stdout = open(os.devnull, 'w')
-        sys.stderr = open(os.devnull, 'w')
-        
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore", UserWarning)
-            try:
-                self.ocr_reader = easyocr.Reader(['en'])
-            finally:
-                # Restore stdout/stderr
-                sys.stdout.close()
-                sys.stderr.close()
-                sys.stdout = original_stdout
-                sys.stderr = original_stderr
+    def __init__(self, capture_backend: CaptureBackend = None, frame_cache: FrameCache = None):
+        # A long-lived grabber that reuses its buffers between calls.
+        self.capture = capture_backend or (frame_cache.capture if frame_cache else create_backend())
+        # Optional per-tick snapshot of the client area shared with other callers.
+        self.frame_cache = frame_cache
+        self._transformer = None
+        self._pyramid = None
+        self._pyramid_key = None
+        self._ui_masks = None
+        self._glyph_reader = None
+        # Client stretch for glyph OCR; None derives it from the frame cache's client width.
+        self.text_scale = None
+        # Glyph reads below this confidence fall back to easyocr.
+        self.glyph_min_confidence = 0.8
 
-    # --- Color Detection --- #
+    def _grab(self, region: tuple, max_age_ms: float = None, color_space: str = 'rgb') -> np.ndarray | None:
+        """
+        Grab a (x1, y1, x2, y2) region as RGB (or HSV/Lab). The array is reused by the next grab.
+        Regions inside the client area are served as views of the cached frame
+        when a frame cache is attached and its frame is not older than `max_age_ms`;
+        the cached frame is converted to another color space at most once.
+        """
+        if self.frame_cache is not None:
+            view = self.frame_cache.get_region(region, max_age_ms, color_space)
+            if view is not None:
+                return view
+        image = self.capture.grab(region)
+        if image is None or color_space == 'rgb':
+            return image
+        return convert_color_space(image, color_space)
+
+    def grab_region(self, region: tuple, max_age_ms: float = None, color_space: str = 'rgb') -> np.ndarray | None:
+        """Grab a (x1, y1, x2, y2) region without copying. Use capture_region for a copy that can be kept."""
+        return self._grab(region, max_age_ms, color_space)
 
-    def find_color(self, color: tuple, spectrum_range: list = None, region: tuple = None, size: tuple = None) -> tuple:
-        """Find a color on the screen within the specified range."""
-        if spectrum_range is None:
-            r, g, b = color
-            spectrum_range = [r, g, b, r, g, b]
+    # --- Color Detection --- #
 
+    def _resolve_region(self, region: tuple, size: tuple = None) -> tuple | None:
+        """Defaults the region to the client window and applies an optional (width, height) size."""
+        if region is None and self.frame_cache is not None and self.frame_cache.fixed_region is not None:
+            # A fixed capture region (e.g. a replay) stands in for the window
+            region = tuple(int(v) for v in self.frame_cache.fixed_region)
         if region is None:
+            from .client_window import RuneLiteClientWindow
             client_rect = RuneLiteClientWindow().get_rect()
-            if client_rect:
-                region = (client_rect['left'], client_rect['top'], client_rect['right'], client_rect['bottom'])
-            else:
+            if not client_rect:
                 return None # No window found
-        
+            region = (client_rect['left'], client_rect['top'], client_rect['right'], client_rect['bottom'])
+
         if size is not None:
             region = (region[0], region[1], region[0] + size[0], region[1] + size[1])
+        return region
+
+    @property
+    def ui_masks(self) -> UIMaskCache:
+        """Game-view masks for the client area (the frame cache's area when one is attached)."""
+        if self._ui_masks is None:
+            if self.frame_cache is not None:
+                self._ui_masks = UIMaskCache(self.frame_cache.client, self.frame_cache.fixed_region)
+            else:
+                self._ui_masks = UIMaskCache()
+        return self._ui_masks
+
+    def _game_view_mask(self, region: tuple, game_view_only: bool) -> np.ndarray | None:
+        """The cached game-view mask for a region, or None when the search is not limited to the game view."""
+        if not game_view_only:
+            return None
+        return self.ui_masks.region_mask(region)
+
+    def _clip_to_game_view(self, region: tuple) -> tuple | None:
+        """Clips a region to the game view's bounding rect, or None if they do not overlap."""
+        view = self.ui_masks.game_view_rect()
+        if view is None:
+            return region
+        region = (max(region[0], view[0]), max(region[1], view[1]), min(region[2], view[2]), min(region[3], view[3]))
+        return region if region[0] < region[2] and region[1] < region[3] else None
+
+    def add_chrome_exclusions(self, exclude_region=None, exclude: tuple = ()):
+        """Adds the UI chrome rects (and optional masks such as 'player') to a phase-detection exclusion spec."""
+        chrome = self.ui_masks.exclude_rects(exclude=exclude)
+        return [exclude_region] + chrome if exclude_region else chrome
+
+    @staticmethod
+    def _resolve_spectrum(color: tuple, spectrum_range: list, color_space: str, tolerance) -> list:
+        """An explicit range is used as-is (in `color_space` units); otherwise one is built around the RGB `color`."""
+        if spectrum_range is not None:
+            return spectrum_range
+        if color_space == 'rgb':
+            return color_search.color_to_spectrum(color, tolerance or 0)
+        return color_ranges(color, color_space, tolerance)
+
+    def _prepare_color_search(self, color: tuple, spectrum_range: list, region: tuple, size: tuple, max_age_ms: float,
+                              color_space: str = 'rgb', tolerance=None) -> tuple:
+        """Resolves the search range and region and grabs it. Returns (image, spectrum_range, region)."""
+        spectrum_range = self._resolve_spectrum(color, spectrum_range, color_space, tolerance)
+
+        region = self._resolve_region(region, size)
+        if region is None:
+            return None, spectrum_range, None
+
+        return self._grab(region, max_age_ms, color_space), spectrum_range, region
+
+    def query_colors(self, query_set: ColorQuerySet, region: tuple = None, size: tuple = None, max_age_ms: float = None) -> QueryResult | None:
+        """Evaluates every query of a ColorQuerySet on one grab of the region, in a single pass."""
+        region = self._resolve_region(region, size)
+        if region is None:
+            return None
+        img_array = self._grab(region, max_age_ms)
+        if img_array is None:
+            return None
+        return query_set.evaluate(img_array, region[:2])
+
+    def pyramid(self, region: tuple = None, max_age_ms: float = None, color_space: str = 'rgb') -> FramePyramid | None:
+        """
+        Returns a lazily downscaled pyramid of a region (default: the client window).
+        With a frame cache the pyramid is reused until the cached frame changes.
+        Template searches need the default 'rgb' pyramid.
+        """
+        region = self._resolve_region(region)
+        if region is None:
+            return None
+        img_array = self._grab(region, max_age_ms, color_space)
+        if img_array is None:
+            return None
+
+        key = None
+        if self.frame_cache is not None and self.frame_cache.contains(region):
+            key = (self.frame_cache.frame_id, tuple(region), color_space)
+            if key == self._pyramid_key:
+                return self._pyramid
+        pyramid = FramePyramid(img_array, region[:2])
+        self._pyramid, self._pyramid_key = pyramid, key
+        return pyramid
+
+    def find_color(self, color: tuple, spectrum_range: list = None, region: tuple = None, size: tuple = None, max_age_ms: float = None,
+                   target_size: int = None, color_space: str = 'rgb', tolerance=None, game_view_only: bool = False) -> tuple:
+        """
+        Find the first pixel (row-major) on the screen within the specified range.
+        With `target_size` (smallest side of the target in pixels), a downscaled copy is searched first.
+        With color_space 'hsv' or 'lab', the color is matched in that space with `tolerance`
+        (an int or per-channel tuple, None = the space's default).
+        With `game_view_only`, pixels on the minimap, side panel and chatbox are ignored.
+        """
+        if target_size:
+            spectrum_range = self._resolve_spectrum(color, spectrum_range, color_space, tolerance)
+            region = self._resolve_region(region, size)
+            if region is not None and game_view_only:
+                region = self._clip_to_game_view(region)
+            pyramid = self.pyramid(region, max_age_ms, color_space) if region is not None else None
+            return pyramid.find_color(spectrum_range, target_size) if pyramid else None
+
+        img_array, spectrum_range, region = self._prepare_color_search(color, spectrum_range, region, size, max_age_ms, color_space, tolerance)
+        if img_array is None:
+            return None
+
+        match = color_search.find_first(img_array, spectrum_range, mask=self._game_view_mask(region, game_view_only))
+        if match:
+            return (match[0] + region[0], match[1] + region[1])
+        return None
+
+    def find_color_all(self, color: tuple, spectrum_range: list = None, region: tuple = None, size: tuple = None, max_age_ms: float = None,
+                       color_space: str = 'rgb', tolerance=None, game_view_only: bool = False) -> np.ndarray:
+        """Find every pixel within the specified range. Returns an (N, 2) array of screen (x, y)."""
+        img_array, spectrum_range, region = self._prepare_color_search(color, spectrum_range, region, size, max_age_ms, color_space, tolerance)
+        if img_array is None:
+            return np.empty((0, 2), dtype=np.int64)
+        mask = self._game_view_mask(region, game_view_only)
+        return color_search.find_all(img_array, spectrum_range, mask) + np.array(region[:2], dtype=np.int64)
+
+    def find_color_blobs(self, color: tuple, spectrum_range: list = None, region: tuple = None, size: tuple = None,
+                         min_area: int = 1, near: tuple = None, max_age_ms: float = None, target_size: int = None,
+                         color_space: str = 'rgb', tolerance=None, game_view_only: bool = False) -> list:
+        """
+        Find connected blobs of the color with screen-space centroids, areas and bounding boxes.
+        Blobs are ranked by area, or by distance to the screen point `near` when given.
+        With `target_size`, only areas where a downscaled copy matched are searched at full resolution
+        (with `game_view_only`, that search is clipped to the game view's bounding rect).
+        """
+        if target_size:
+            spectrum_range = self._resolve_spectrum(color, spectrum_range, color_space, tolerance)
+            region = self._resolve_region(region, size)
+            if region is not None and game_view_only:
+                region = self._clip_to_game_view(region)
+            pyramid = self.pyramid(region, max_age_ms, color_space) if region is not None else None
+            return pyramid.find_blobs(spectrum_range, min_area, target_size, near) if pyramid else []
+
+        img_array, spectrum_range, region = self._prepare_color_search(color, spectrum_range, region, size, max_age_ms, color_space, tolerance)
+        if img_array is None:
+            return []
+        mask = self._game_view_mask(region, game_view_only)
+        blobs = [blob.offset(region[0], region[1]) for blob in color_search.find_blobs(img_array, spectrum_range, min_area, mask=mask)]
+        return color_search.rank_blobs(blobs, near)
 
-        screenshot = ImageGrab.grab(bbox=region)
-        offset_x, offset_y = region[0], region[1]
-
-        img_array = np.array(screenshot)
-        
-        matches = np.where(
-            (img_array[:, :, 0] >= spectrum_range[0]) & (img_array[:, :, 0] <= spectrum_range[1]) &
-            (img_array[:, :, 1] >= spectrum_range[2]) & (img_array[:, :, 1] <= spectrum_range[3]) &
-            (img_array[:, :, 2] >= spectrum_range[4]) & (img_array[:, :, 2] <= spectrum_range[5])
-        )
-        
-        if len(matches[0]) > 0:
-            y, x = matches[0][0], matches[1][0]
-            return (x + offset_x, y + offset_y)
-        
+    def find_palette_blobs(self, colors, tolerance=20, region: tuple = None, size: tuple = None, min_area: int = 1,
+                           near: tuple = None, max_age_ms: float = None, game_view_only: bool = False) -> dict:
+        """
+        Find blobs of several RGB colors at once, each matched within `tolerance` (an int or per-channel tuple).
+        `colors` is a {name: (r, g, b)} dict or a list of colors (named by index); where colors
+        overlap, the one listed first wins. Returns {name: [Blob, ...]} ranked like find_color_blobs.
+        """
+        names = list(colors) if isinstance(colors, dict) else list(range(len(colors)))
+        values = list(colors.values()) if isinstance(colors, dict) else list(colors)
+        region = self._resolve_region(region, size)
+        if region is None:
+            return {name: [] for name in names}
+        img_array = self._grab(region, max_age_ms)
+        if img_array is None:
+            return {name: [] for name in names}
+
+        labels = kernels.palette_labels(img_array, values, tolerance)
+        view_mask = self._game_view_mask(region, game_view_only)
+        if view_mask is not None:
+            labels[view_mask == 0] = 0
+        results = {}
+        for label, name in enumerate(names, start=1):
+            mask = cv2.compare(labels, label, cv2.CMP_EQ)
+            blobs = [blob.offset(region[0], region[1]) for blob in color_search.mask_blobs(mask, min_area)]
+            results[name] = color_search.rank_blobs(blobs, near)
+        return results
+
+    def find_color_nearest(self, color: tuple, point: tuple, spectrum_range: list = None, region: tuple = None, size: tuple = None, max_age_ms: float = None,
+                           color_space: str = 'rgb', tolerance=None, game_view_only: bool = False) -> tuple:
+        """Find the matching pixel closest to the screen point `point`."""
+        img_array, spectrum_range, region = self._prepare_color_search(color, spectrum_range, region, size, max_age_ms, color_space, tolerance)
+        if img_array is None:
+            return None
+        mask = self._game_view_mask(region, game_view_only)
+        match = color_search.find_nearest(img_array, spectrum_range, (point[0] - region[0], point[1] - region[1]), mask)
+        if match:
+            return (match[0] + region[0], match[1] + region[1])
         return None
 
-    def move_to_color(self, color: tuple, spectrum_range: list = None, region: tuple = None) -> tuple:
-        """Move the mouse to a color on screen."""
-        pos = self.find_color(color, spectrum_range, region)
+    def find_image(self, image, confidence: float = 0.8, region: tuple = None, target_size: int = None, max_age_ms: float = None) -> tuple | None:
+        """
+        Find an image (file path or RGB array) on screen, coarse-to-fine.
+        Returns the screen (x, y) center of the best match, or None.
+        """
+        template = self._load_template(image)
+        if template is None:
+            return None
+        pyramid = self.pyramid(region, max_age_ms)
+        if pyramid is None:
+            return None
+        match = pyramid.find_template(template, confidence, target_size)
+        if match is None:
+            return None
+        return (match[0] + template.shape[1] // 2, match[1] + template.shape[0] // 2)
+
+    @staticmethod
+    def _load_template(image) -> np.ndarray | None:
+        if isinstance(image, np.ndarray):
+            return image
+        path = image
+        if not os.path.exists(path):
+            # Route steps refer to images stored next to the route files
+            path = os.path.join(os.path.dirname(__file__), 'data', 'routes', image)
+        template = cv2.imread(path, cv2.IMREAD_COLOR)
+        if template is None:
+            print(f"Error: Could not load image {image}")
+            return None
+        return cv2.cvtColor(template, cv2.COLOR_BGR2RGB)
+
+    def move_to_color(self, color: tuple, spectrum_range: list = None, region: tuple = None, min_area: int = None) -> tuple:
+        """Move the mouse to a color on screen. With `min_area`, targets the largest blob's centroid instead of the first pixel."""
+        if min_area:
+            blobs = self.find_color_blobs(color, spectrum_range, region, min_area=min_area)
+            pos = blobs[0].center if blobs else None
+        else:
+            pos = self.find_color(color, spectrum_range, region)
         if pos:
+            import pyautogui
             pyautogui.moveTo(pos[0], pos[1])
             return pos
         return None
 
+    # --- Pixel Sampling --- #
+
+    def sample_pixels(self, points, max_age_ms: float = None, frame=None) -> np.ndarray:
+        """
+        Sample the RGB color at any number of (x, y) screen points in one call.
+        Points are read from `frame` (a CaptureThread frame) or the cached frame
+        when possible; the rest come from a single grab of their bounding box.
+        Returns an (N, 3) uint8 array in the order of `points`.
+        """
+        pts = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        colors = np.zeros((len(pts), 3), dtype=np.uint8)
+        if len(pts) == 0:
+            return colors
+
+        source = None
+        if frame is not None:
+            source = (frame.image, frame.rect)
+        elif self.frame_cache is not None:
+            image = self.frame_cache.get_frame(max_age_ms)
+            if image is not None:
+                source = (image, self.frame_cache.rect)
+
+        pending = np.ones(len(pts), dtype=bool)
+        if source is not None:
+            image, rect = source
+            inside = ((pts[:, 0] >= rect[0]) & (pts[:, 0] < rect[2]) &
+                      (pts[:, 1] >= rect[1]) & (pts[:, 1] < rect[3]))
+            colors[inside] = image[pts[inside, 1] - rect[1], pts[inside, 0] - rect[0]]
+            pending &= ~inside
+
+        if pending.any():
+            rest = pts[pending]
+            x1, y1 = rest.min(axis=0)
+            x2, y2 = rest.max(axis=0) + 1
+            image = self.capture.grab((x1, y1, x2, y2))
+            if image is not None:
+                colors[pending] = image[rest[:, 1] - y1, rest[:, 0] - x1]
+        return colors
+
+    def sample_probe_set(self, name: str, max_age_ms: float = None) -> dict:
+        """Sample a named probe set from user-interface.json. Returns {label: (r, g, b)}."""
+        probes = get_probe_set(name)
+        if not probes:
+            return {}
+        if self._transformer is None:
+            from .client_window import RuneLiteClientWindow
+            client = self.frame_cache.client if self.frame_cache and self.frame_cache.client else RuneLiteClientWindow()
+            self._transformer = CoordinateTransformer(client)
+
+        abs_points = self._transformer.transform_stretched_coords_many(list(probes.values()))
+        if abs_points is None:
+            return {}
+        colors = self.sample_pixels(abs_points, max_age_ms)
+        return {label: tuple(int(c) for c in color) for label, color in zip(probes, colors)}
+
     # --- OCR --- #
 
-    def capture_region(self, x1, y1, x2, y2):
+    def capture_region(self, x1, y1, x2, y2, max_age_ms: float = None):
         """Capture a specific region of the screen."""
         try:
-            screenshot = ImageGrab.grab(bbox=(x1, y1, x2, y2))
-            return np.array(screenshot)
+            screenshot = self._grab((x1, y1, x2, y2), max_age_ms)
+            return screenshot.copy() if screenshot is not None else None
         except Exception as e:
             print(f"Error capturing screen region: {str(e)}")
             return None
 
-    def read_text_from_region(self, x1, y1, x2, y2, clean_pattern=r'[^a-zA-Z0-9,.]'):
+    @property
+    def ocr_reader(self):
+        """The process-wide easyocr reader, loaded on first use (see vision.ocr.warm_up)."""
+        return ocr.get_reader()
+
+    @property
+    def glyph_reader(self) -> GlyphReader:
+        """Bitmap-font reader for UI text (see vision.glyph_ocr)."""
+        if self._glyph_reader is None:
+            self._glyph_reader = GlyphReader()
+        return self._glyph_reader
+
+    def _text_scale(self) -> float:
+        if self.text_scale is not None:
+            return self.text_scale
+        if self.frame_cache is not None and self.frame_cache.rect is not None:
+            rect = self.frame_cache.rect
+            return (rect[2] - rect[0]) / CoordinateTransformer.REF_CLIENT_WIDTH
+        return 1.0
+
+    def read_glyph_text(self, image: np.ndarray, threshold: int = 180, spectrum_range: list = None, charset: str = None):
+        """
+        Read UI text by matching the game's font glyphs. Returns a glyph_ocr.TextResult,
+        empty when the client is stretched by a non-whole factor.
+        charset: characters the text can contain, e.g. glyph_ocr.DIGITS for numeric readouts
+        """
+        return self.glyph_reader.read(image, threshold, spectrum_range, self._text_scale(), charset)
+
+    def read_text_from_region(self, x1, y1, x2, y2, clean_pattern=r'[^a-zA-Z0-9,.]', max_age_ms: float = None,
+                              charset: str = None):
         """Read text from a specific region of the screen with preprocessing."""
         try:
             # 1. Capture the region
-            image_pil = ImageGrab.grab(bbox=(x1, y1, x2, y2))
-            if image_pil is None: return None
-            
-            # 2. Convert to OpenCV format
-            image_cv = cv2.cvtColor(np.array(image_pil), cv2.COLOR_RGB2BGR)
+            image = self._grab((x1, y1, x2, y2), max_age_ms)
+        except Exception as e:
+            print(f"Error capturing text region: {str(e)}")
+            return None
+        if image is None: return None
+        return self.read_text_from_image(image, clean_pattern, charset)
+
+    def read_text_from_image(self, image: np.ndarray, clean_pattern=r'[^a-zA-Z0-9,.]', charset: str = None):
+        """
+        Read text from an already captured RGB image. Game-font text is read
+        from its glyphs when the client is unstretched or stretched by a whole
+        factor; easyocr is used otherwise, or when the glyph read is not confident.
+        charset: characters the text can contain, applied to the glyph read
+        """
+        try:
+            # 1. Match the game font's glyphs
+            glyphs = self.read_glyph_text(image, charset=charset) if supports_scale(self._text_scale()) else None
+            if glyphs is not None and glyphs.text and glyphs.confidence >= self.glyph_min_confidence:
+                text = ' '.join(glyphs.text.split())
+                if clean_pattern:
+                    text = re.sub(r'[^a-zA-Z0-9,.\- ]', '', text)
+                return text.strip()
+        except Exception as e:
+            print(f"Error reading glyph text: {str(e)}")
 
-            # 3. Convert to grayscale
-            gray = cv2.cvtColor(image_cv, cv2.COLOR_BGR2GRAY)
+        try:
+            # 2. Convert to grayscale
+            gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
 
-            # 4. Apply a binary threshold to isolate the text
+            # 3. Apply a binary threshold to isolate the text
             _ , thresh = cv2.threshold(gray, 180, 255, cv2.THRESH_BINARY)
 
-            # 5. Invert the image for better OCR performance
+            # 4. Invert the image for better OCR performance
             thresh = cv2.bitwise_not(thresh)
 
-            # 6. Read text from the processed image
+            # 5. Read text from the processed image
             result = self.ocr_reader.readtext(thresh, detail=0)
             
             if result:
@@ -136,45 +459,38 @@ class GameScreen:
         y2 = y1 + 32
         return self.read_text_from_region(x1, y1, x2, y2)
 
-    def detect_phase_from_screen(self, region: tuple, samples: int, tolerance: int, phase_colors: dict, exclude_region: tuple = None) -> tuple:
-        """Detects the most likely phase from screen based on color sampling, with an optional exclusion zone."""
-        screenshot = ImageGrab.grab(bbox=region)
-        img_array = np.array(screenshot)
-        
-        height, width, _ = img_array.shape
-        
-        num_x = int(np.sqrt(samples))
-        num_y = int(np.sqrt(samples))
-        
-        x_points = np.linspace(0, width - 1, num_x, dtype=int)
-        y_points = np.linspace(0, height - 1, num_y, dtype=int)
-        
-        phase_scores = {phase: 0 for phase in phase_colors}
-        valid_samples = 0
-
-        for y_offset in y_points:
-            for x_offset in x_points:
-                # Convert local offset to absolute screen coordinates
-                abs_x = region[0] + x_offset
-                abs_y = region[1] + y_offset
-
-                # Check if the point is in the exclusion zone
-                if exclude_region and (exclude_region[0] <= abs_x < exclude_region[2] and exclude_region[1] <= abs_y < exclude_region[3]):
-                    continue
-                
-                valid_samples += 1
-                pixel_color = tuple(img_array[y_offset, x_offset])
-                
-                for phase, colors in phase_colors.items():
-                    for color in colors:
-                        if all(abs(int(pixel_color[i]) - color[i]) <= tolerance for i in range(3)):
-                            phase_scores[phase] += 1
-                            break
-        
-        if valid_samples == 0:
+    def detect_phase_from_screen(self, region: tuple, samples: int, tolerance: int, phase_colors: dict, exclude_region=None, max_age_ms: float = None,
+                                 stride: int = None, color_space: str = 'rgb', game_view_only: bool = False) -> tuple:
+        """
+        Detects the most likely phase from screen based on its colors, with optional exclusion zones.
+        `exclude_region` can be a rectangle, a polygon or a list of both; `samples` None classifies every pixel.
+        With color_space 'hsv' or 'lab' the phase colors are matched in that space.
+        With `game_view_only`, the UI chrome overlapping the region is excluded as well.
+        """
+        img_array = self._grab(region, max_age_ms)
+        if img_array is None:
             return None, 0.0
 
-        best_phase = max(phase_scores, key=phase_scores.get)
-        confidence = (phase_scores[best_phase] / valid_samples) * 100 if valid_samples > 0 else 0
+        if game_view_only:
+            exclude_region = self.add_chrome_exclusions(exclude_region)
+        return detect_phase(img_array, region[:2], samples, tolerance, phase_colors, exclude_region, stride, color_space)
+
+    def detect_phase_scores_from_screen(self, region: tuple, tolerance: int, phase_colors: dict, exclude_region=None, max_age_ms: float = None,
+                                        stride: int = 1, color_space: str = 'rgb', game_view_only: bool = False) -> dict:
+        """Returns the confidence of every phase at once for a screen region."""
+        img_array = self._grab(region, max_age_ms)
+        if img_array is None:
+            return {}
+
+        if game_view_only:
+            exclude_region = self.add_chrome_exclusions(exclude_region)
+        return detect_phase_scores(img_array, region[:2], tolerance, phase_colors, exclude_region, stride, color_space)
+
+    def detect_phase_in_regions(self, region: tuple, sub_regions: list, tolerance: int, phase_colors: dict, max_age_ms: float = None,
+                                stride: int = 1, color_space: str = 'rgb') -> list:
+        """Returns (phase, confidence) for every screen sub-region of `region`, from a single grab and classification."""
+        img_array = self._grab(region, max_age_ms)
+        if img_array is None:
+            return [(None, 0.0) for _ in sub_regions]
 
-        return best_phase, confidence
+        return detect_phase_in_regions(img_array, region[:2], sub_regions, tolerance, phase_colors, stride, color_space)
@@ -1,8 +1,12 @@
-from typing import List, Optional, Tuple
+import time
+from typing import List, Optional, Tuple, TYPE_CHECKING
 from dataclasses import dataclass
 from .runelite_api import RuneLiteAPI
 from .game_state import GameState, WorldPoint, NPC
 
+if TYPE_CHECKING:
+    from .vision.minimap_radar import MinimapRadar
+
 @dataclass
 class BoundaryArea:
     min_x: int
@@ -40,11 +44,17 @@ class BoundaryArea:
 class GuardTracker:
     """Track guards and maintain boundary restrictions"""
     
-    def __init__(self, api: RuneLiteAPI, boundary: BoundaryArea = None):
+    def __init__(self, api: RuneLiteAPI, boundary: BoundaryArea = None, radar: 'MinimapRadar' = None, poll_interval: float = 5.0):
         self.api = api
         self.game_state = GameState(api)
         self.boundary = boundary
         self.tracked_guards: List[NPC] = []
+        # With a minimap radar, /npcs is only polled when an NPC dot appears, leaves or moves a tile
+        # (the player walking moves them all), or every poll_interval seconds
+        self.radar = radar
+        self.poll_interval = poll_interval
+        self._last_poll = 0.0
+        self._last_poll_key = None
         
     def set_boundary_from_current_location(self, radius: int = 20):
         """Set boundary area centered on current location"""
@@ -70,8 +80,28 @@ class GuardTracker:
             
         return self.boundary.contains_point(loc.x, loc.y, loc.plane)
         
+    def _radar_unchanged(self, max_distance: int) -> bool:
+        """
+        True while the radar shows the NPC dots at the same tiles as at the last poll and the poll is recent.
+        Comparing positions rather than the dot count keeps tracked_guards' locations and distances current
+        to within a tile; a guard that moved is re-polled, not returned from the last poll.
+        """
+        if not self.radar:
+            return False
+        dots = self.radar.scan()
+        tiles = tuple(sorted((round(dot.tiles_x), round(dot.tiles_y)) for dot in dots
+                             if dot.kind == 'npc' and dot.distance <= max_distance))
+        key = (max_distance, tiles)
+        unchanged = key == self._last_poll_key and time.time() - self._last_poll < self.poll_interval
+        self._last_poll_key = key
+        return unchanged
+
     def get_nearby_guards(self, max_distance: int = 15) -> List[NPC]:
         """Get all guard NPCs in vicinity"""
+        if self._radar_unchanged(max_distance):
+            return self.tracked_guards
+
+        self._last_poll = time.time()
         npcs = self.game_state.get_npcs_in_vicinity(max_distance)
         
         # Filter for guard NPCs (common guard NPC IDs)
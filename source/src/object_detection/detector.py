@@ -0,0 +1,408 @@
+"""
+This module runs a small object-detection model on the CPU.
+
+Models are YOLO-style ONNX exports (one output of boxes and class scores),
+run with OpenCV DNN or, when it is installed, ONNX Runtime. Regions of
+interest are cut from the shared frame, letterboxed to the model's input
+size and inferred as one batch. Every call records its preprocess, inference
+and postprocess latency, and an optional per-frame budget stops a batch run
+before it overruns the frame.
+"""
+
+import ast
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+import cv2
+
+from ..game_screen import GameScreen
+from .utils import clip_boxes, cxcywh_to_xyxy, nms
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+# Letterbox padding value, as used by the YOLO exporters.
+PAD_VALUE = 114
+
+
+@dataclass
+class Detection:
+    """One detected object."""
+    label: str
+    class_id: int
+    confidence: float
+    box: tuple  # Screen (x1, y1, x2, y2)
+
+    @property
+    def center(self) -> tuple:
+        return ((self.box[0] + self.box[2]) // 2, (self.box[1] + self.box[3]) // 2)
+
+
+class LatencyStats:
+    """Rolling latency samples in milliseconds, per stage."""
+
+    STAGES = ('preprocess', 'inference', 'postprocess', 'total')
+
+    def __init__(self, size: int = 120):
+        self.samples = {stage: deque(maxlen=size) for stage in self.STAGES}
+        self.over_budget = 0
+        self.skipped = 0
+
+    def add(self, stage: str, ms: float):
+        self.samples[stage].append(ms)
+
+    def last(self, stage: str = 'total') -> float | None:
+        return self.samples[stage][-1] if self.samples[stage] else None
+
+    def summary(self) -> dict:
+        """Returns {stage: {'count', 'mean', 'p50', 'p95', 'max'}} in milliseconds."""
+        summary = {}
+        for stage, samples in self.samples.items():
+            if not samples:
+                continue
+            values = np.fromiter(samples, dtype=np.float64)
+            summary[stage] = {
+                'count': len(values),
+                'mean': float(values.mean()),
+                'p50': float(np.percentile(values, 50)),
+                'p95': float(np.percentile(values, 95)),
+                'max': float(values.max()),
+            }
+        return summary
+
+
+def load_labels(labels) -> list:
+    """Class names from a list or from a text file with one name per line."""
+    if labels is None:
+        return []
+    if isinstance(labels, str):
+        with open(labels, 'r') as f:
+            return [line.strip() for line in f if line.strip()]
+    return list(labels)
+
+
+def letterbox(image: np.ndarray, size: tuple, out: np.ndarray = None) -> tuple:
+    """
+    Resizes an RGB image into a (width, height) canvas keeping its aspect ratio.
+    Returns (canvas, scale, pad_x, pad_y); `out` is reused as the canvas when given.
+    """
+    width, height = size
+    h, w = image.shape[:2]
+    scale = min(width / w, height / h)
+    new_w, new_h = max(int(round(w * scale)), 1), max(int(round(h * scale)), 1)
+    pad_x, pad_y = (width - new_w) // 2, (height - new_h) // 2
+
+    canvas = out if out is not None else np.empty((height, width, 3), dtype=np.uint8)
+    canvas[:] = PAD_VALUE
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    return canvas, scale, pad_x, pad_y
+
+
+def quantized_path(model_path: str) -> str:
+    """The int8 sibling of a model file: model.onnx -> model.int8.onnx."""
+    root, ext = os.path.splitext(model_path)
+    return f"{root}.int8{ext}"
+
+
+def quantize_model(model_path: str, output_path: str = None) -> str | None:
+    """
+    Writes a dynamically int8-quantized copy of an ONNX model with ONNX Runtime.
+    The result runs on ONNX Runtime; OpenCV DNN only runs statically quantized (QDQ) models.
+    Returns the output path, or None if ONNX Runtime's quantization tools are not installed.
+    """
+    try:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+    except ImportError:
+        print("Int8 quantization needs onnxruntime: pip install onnxruntime")
+        return None
+    output_path = output_path or quantized_path(model_path)
+    quantize_dynamic(model_path, output_path, weight_type=QuantType.QUInt8)
+    return output_path
+
+
+class ObjectDetector:
+    """
+    CPU inference for a YOLO-style ONNX detector.
+
+    Both YOLOv5 (boxes, objectness, class scores) and YOLOv8 (boxes, class
+    scores) output layouts are decoded. Models exported with a fixed batch
+    size of 1 are run one region at a time.
+    """
+
+    def __init__(self, model_path: str, labels=None, input_size=320, backend: str = 'auto', threads: int = None,
+                 int8: bool = False, confidence: float = 0.4, iou_threshold: float = 0.45, max_detections: int = 100,
+                 max_batch: int = 8, budget_ms: float = None, layout: str = 'auto', game_screen: GameScreen = None,
+                 max_age_ms: float = None):
+        """
+        model_path: ONNX model file
+        labels: class names, or a text file with one name per line
+        input_size: model input as an int or (width, height)
+        backend: 'onnxruntime', 'opencv', or 'auto' (ONNX Runtime when installed)
+        threads: CPU threads for inference (None = the runtime's default)
+        int8: use the model's int8 sibling (model.int8.onnx), creating it with ONNX Runtime if it is missing
+        confidence: minimum class confidence of a detection
+        iou_threshold: overlap above which non-maximum suppression drops the weaker box
+        max_detections: most detections kept per region
+        max_batch: most regions inferred in one batch
+        budget_ms: per-call time budget; remaining batches are skipped once it is spent
+        layout: output layout, 'yolov5', 'yolov8', or 'auto' (from the channel count: 4 + classes for YOLOv8, 5 + classes for YOLOv5)
+        game_screen: screen to read from; use one with a frame cache to read the shared frame
+        max_age_ms: maximum age of a cached frame to read from
+        """
+        self.labels = load_labels(labels)
+        self.input_size = (input_size, input_size) if isinstance(input_size, int) else tuple(input_size)
+        self.threads = threads
+        self.confidence = confidence
+        self.iou_threshold = iou_threshold
+        self.max_detections = max_detections
+        self.max_batch = max(1, max_batch)
+        self.budget_ms = budget_ms
+        self.layout = layout
+        self.game_screen = game_screen
+        self.max_age_ms = max_age_ms
+        self.stats = LatencyStats()
+
+        if backend == 'auto':
+            backend = 'onnxruntime' if onnxruntime is not None else 'opencv'
+        if backend == 'onnxruntime' and onnxruntime is None:
+            print("ONNX Runtime is not installed, using OpenCV DNN.")
+            backend = 'opencv'
+        self.backend = backend
+
+        if int8:
+            int8_path = quantized_path(model_path)
+            if os.path.exists(int8_path):
+                model_path = int8_path
+            elif backend == 'onnxruntime':
+                model_path = quantize_model(model_path, int8_path) or model_path
+            else:
+                print(f"No int8 model at {int8_path}, using {model_path}.")
+        self.model_path = model_path
+
+        self._batch = None  # Reused letterbox canvases
+        self._output_layouts = {}  # Output shape -> (transpose, layout)
+        self._load()
+
+    def _load(self):
+        if self.backend == 'onnxruntime':
+            options = onnxruntime.SessionOptions()
+            if self.threads:
+                options.intra_op_num_threads = self.threads
+                options.inter_op_num_threads = 1
+            options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self.session = onnxruntime.InferenceSession(self.model_path, options, providers=['CPUExecutionProvider'])
+            model_input = self.session.get_inputs()[0]
+            self.input_name = model_input.name
+            if isinstance(model_input.shape[0], int):
+                self.max_batch = min(self.max_batch, model_input.shape[0])
+            if not self.labels:
+                self.labels = self._metadata_labels()
+        else:
+            if self.threads:
+                cv2.setNumThreads(self.threads)  # Process-wide in OpenCV
+            self.net = cv2.dnn.readNetFromONNX(self.model_path)
+            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+
+    def _metadata_labels(self) -> list:
+        """Class names from the 'names' entry Ultralytics writes into the model metadata, or []."""
+        try:
+            names = ast.literal_eval(self.session.get_modelmeta().custom_metadata_map.get('names', '{}'))
+        except (ValueError, SyntaxError):
+            return []
+        if isinstance(names, dict):
+            return [str(names[i]) for i in sorted(names)]
+        return [str(name) for name in names] if isinstance(names, (list, tuple)) else []
+
+    def _output_layout(self, shape: tuple) -> tuple:
+        """
+        Returns (transpose, layout) for a per-image output of `shape`. The channel axis is the one
+        holding 4 + classes (YOLOv8, usually rows) or 5 + classes (YOLOv5, usually columns) values.
+        Without labels, the smaller axis is taken as the channels, since models predict many anchors.
+        """
+        layout = self._output_layouts.get(shape)
+        if layout is not None:
+            return layout
+
+        rows, columns = shape
+        classes = len(self.labels)
+        candidates = [(False, 'yolov5', columns == classes + 5), (True, 'yolov8', rows == classes + 4),
+                      (False, 'yolov8', columns == classes + 4), (True, 'yolov5', rows == classes + 5)]
+        matches = [(transpose, name) for transpose, name, match in candidates
+                   if classes and match and self.layout in ('auto', name)]
+        if matches:
+            layout = matches[0]
+        else:
+            if classes:
+                print(f"Detector output {rows}x{columns} does not match {classes} classes; guessing its layout.")
+            layout = (rows < columns, 'yolov5' if self.layout == 'yolov5' else 'yolov8')
+        self._output_layouts[shape] = layout
+        return layout
+
+    def _forward(self, blob: np.ndarray) -> np.ndarray:
+        if self.backend == 'onnxruntime':
+            return self.session.run(None, {self.input_name: blob})[0]
+        self.net.setInput(blob)
+        return self.net.forward()
+
+    def _infer(self, blob: np.ndarray) -> np.ndarray:
+        """Runs a (B, 3, H, W) blob, splitting it if the model has a fixed batch size."""
+        if len(blob) > 1 and self.backend == 'opencv':
+            try:
+                return self._forward(blob)
+            except cv2.error:
+                self.max_batch = 1  # Exported with a fixed batch of one
+        if len(blob) > self.max_batch:
+            return np.concatenate([self._forward(blob[i:i + self.max_batch]) for i in range(0, len(blob), self.max_batch)])
+        return self._forward(blob)
+
+    def _preprocess(self, images: list) -> tuple:
+        """Letterboxes the images into a float (B, 3, H, W) blob. Returns (blob, [(scale, pad_x, pad_y)])."""
+        width, height = self.input_size
+        if self._batch is None or len(self._batch) < len(images):
+            self._batch = np.empty((len(images), height, width, 3), dtype=np.uint8)
+        transforms = []
+        for i, image in enumerate(images):
+            _, scale, pad_x, pad_y = letterbox(image, self.input_size, self._batch[i])
+            transforms.append((scale, pad_x, pad_y))
+        blob = np.ascontiguousarray(self._batch[:len(images)].transpose(0, 3, 1, 2), dtype=np.float32)
+        blob *= 1.0 / 255.0
+        return blob, transforms
+
+    def _decode(self, output: np.ndarray, transform: tuple, origin: tuple, image_size: tuple) -> list:
+        """Detections of one image from its (rows, columns) output."""
+        transpose, layout = self._output_layout(output.shape)
+        if transpose:
+            output = output.T  # YOLOv8 exports are (4 + classes, anchors)
+        if layout == 'yolov5':
+            scores = output[:, 5:] * output[:, 4:5]
+        else:
+            scores = output[:, 4:]
+
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(scores)), class_ids]
+        keep = confidences >= self.confidence
+        if not keep.any():
+            return []
+        boxes, class_ids, confidences = output[keep, :4], class_ids[keep], confidences[keep]
+
+        scale, pad_x, pad_y = transform
+        corners = (cxcywh_to_xyxy(boxes) - (pad_x, pad_y, pad_x, pad_y)) / scale
+        corners = clip_boxes(corners, (0, 0) + tuple(image_size)) + (origin[0], origin[1], origin[0], origin[1])
+
+        detections = []
+        for i in nms(corners, confidences, self.iou_threshold, class_ids, self.max_detections):
+            class_id = int(class_ids[i])
+            detections.append(Detection(
+                label=self.labels[class_id] if class_id < len(self.labels) else str(class_id),
+                class_id=class_id,
+                confidence=float(confidences[i]),
+                box=tuple(int(v) for v in corners[i]),
+            ))
+        return detections
+
+    def detect_images(self, images: list, origins: list = None) -> list:
+        """
+        Detects objects in several RGB images, batched. Returns one list of
+        Detections per image; images skipped for the time budget get [].
+        origins: screen (x, y) of each image's top-left, added to the boxes
+        """
+        origins = origins or [(0, 0)] * len(images)
+        results = [[] for _ in images]
+        start = time.perf_counter()
+        preprocess = inference = postprocess = 0.0
+
+        for first in range(0, len(images), self.max_batch):
+            if self.budget_ms is not None and first and (time.perf_counter() - start) * 1000 >= self.budget_ms:
+                self.stats.skipped += len(images) - first
+                break
+            chunk = images[first:first + self.max_batch]
+
+            t0 = time.perf_counter()
+            blob, transforms = self._preprocess(chunk)
+            t1 = time.perf_counter()
+            outputs = self._infer(blob)
+            t2 = time.perf_counter()
+            for i, image in enumerate(chunk):
+                results[first + i] = self._decode(outputs[i], transforms[i], origins[first + i],
+                                                  (image.shape[1], image.shape[0]))
+            t3 = time.perf_counter()
+            preprocess += t1 - t0
+            inference += t2 - t1
+            postprocess += t3 - t2
+
+        total = (time.perf_counter() - start) * 1000
+        self.stats.add('preprocess', preprocess * 1000)
+        self.stats.add('inference', inference * 1000)
+        self.stats.add('postprocess', postprocess * 1000)
+        self.stats.add('total', total)
+        if self.budget_ms is not None and total > self.budget_ms:
+            self.stats.over_budget += 1
+        return results
+
+    def detect_image(self, image: np.ndarray, origin: tuple = (0, 0)) -> list:
+        """Detects objects in one RGB image."""
+        return self.detect_images([image], [origin])[0]
+
+    def detect_regions(self, regions: list, max_age_ms: float = None) -> list:
+        """
+        Detects objects in several screen (x1, y1, x2, y2) regions of the current frame, batched.
+        Returns one list of Detections (in screen coordinates) per region.
+        """
+        if self.game_screen is None:
+            self.game_screen = GameScreen()
+        max_age_ms = max_age_ms if max_age_ms is not None else self.max_age_ms
+        images, origins, indices = [], [], []
+        for i, region in enumerate(regions):
+            image = self.game_screen.grab_region(tuple(int(v) for v in region), max_age_ms)
+            if image is not None and image.size:
+                images.append(image)
+                origins.append((int(region[0]), int(region[1])))
+                indices.append(i)
+        results = [[] for _ in regions]
+        for i, detections in zip(indices, self.detect_images(images, origins) if images else []):
+            results[i] = detections
+        return results
+
+    def detect(self, region: tuple = None, max_age_ms: float = None) -> list:
+        """Detects objects in one screen region, defaulting to the game view."""
+        if self.game_screen is None:
+            self.game_screen = GameScreen()
+        region = region or self.game_screen.ui_masks.game_view_rect()
+        if region is None:
+            return []
+        return self.detect_regions([region], max_age_ms)[0]
+
+    def warm_up(self, runs: int = 2):
+        """Runs a few blank batches so the first real frame does not pay for lazy initialization."""
+        width, height = self.input_size
+        blank = np.full((height, width, 3), PAD_VALUE, dtype=np.uint8)
+        for _ in range(runs):
+            self.detect_images([blank])
+        for samples in self.stats.samples.values():
+            samples.clear()
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m src.object_detection.detector <model.onnx> [labels.txt] [threads]")
+        sys.exit(1)
+    detector = ObjectDetector(sys.argv[1], labels=sys.argv[2] if len(sys.argv) > 2 else None,
+                              threads=int(sys.argv[3]) if len(sys.argv) > 3 else None)
+    detector.warm_up()
+    print(f"--- Object Detector ({detector.backend}, {detector.model_path}) ---")
+    try:
+        while True:
+            detections = detector.detect()
+            summary = ", ".join(f"{d.label} {d.confidence:.2f} @{d.center}" for d in detections[:5])
+            print(f"{len(detections)} detections ({detector.stats.last():.1f} ms): {summary}")
+            time.sleep(0.2)
+    except KeyboardInterrupt:
+        print(detector.stats.summary())
@@ -0,0 +1,334 @@
+"""
+This module builds auto-labeled detection datasets from sideloader events.
+
+The sideloader plugin sends NPC bounding boxes with its ACTOR_POSITION_UPDATE
+and NPC_SPAWNED events. Captured frames are kept in a chunked, compressed
+array store that skips near-identical frames, and every stored frame is
+joined with the events closest to its capture time to produce YOLO-format
+labels. A CPU-only training entry point fine-tunes a small model on the
+result and exports it to ONNX for ObjectDetector.
+"""
+
+import glob
+import json
+import os
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+import cv2
+
+from ..game_data_models import ActorPositionUpdateEvent, BoundingBox, NpcSpawnedEvent
+from .utils import as_boxes, clip_boxes, valid_boxes
+from ..vision.api_fusion import CanvasMapper
+from ..vision.change_detector import tile_hashes
+from ..vision.frame_cache import FrameCache
+
+try:
+    from ultralytics import YOLO
+except ImportError:
+    YOLO = None
+
+# Event types that carry an NPC bounding box, and how to read them.
+LABEL_EVENTS = {
+    'ACTOR_POSITION_UPDATE': ActorPositionUpdateEvent,
+    'NPC_SPAWNED': NpcSpawnedEvent,
+}
+
+
+@dataclass
+class LabelEvent:
+    """An NPC bounding box reported by the sideloader."""
+    timestamp: float  # Unix seconds
+    npc_id: int
+    name: str
+    box: tuple  # Canvas (x1, y1, x2, y2)
+
+
+def parse_timestamp(value) -> float:
+    """Unix seconds from a sideloader timestamp (ISO-8601 Instant) or a number."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = re.sub(r'(\.\d{6})\d+', r'\1', value.replace('Z', '+00:00'))  # Instants can carry nanoseconds
+    return datetime.fromisoformat(value).timestamp()
+
+
+def load_events(source) -> list:
+    """
+    Loads raw sideloader events, oldest first.
+    source: a list of event dicts, a JSON file (one event or a list, e.g. a
+    /api/client/session dump) or a directory of them (the webhook's requests/ folder)
+    """
+    if isinstance(source, (list, tuple)):
+        events = list(source)
+    else:
+        paths = sorted(glob.glob(os.path.join(source, '*.json'))) if os.path.isdir(source) else [source]
+        events = []
+        for path in paths:
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Skipping {path}: {e}")
+                continue
+            events.extend(data if isinstance(data, list) else [data])
+    events = [event for event in events if isinstance(event, dict) and 'timestamp' in event]
+    events.sort(key=lambda event: parse_timestamp(event['timestamp']))
+    return events
+
+
+def label_events(events: list) -> list:
+    """The NPC bounding boxes in a list of raw events, as LabelEvents. Events without a box or with missing fields are skipped."""
+    labels = []
+    for event in events:
+        model = LABEL_EVENTS.get(event.get('eventType'))
+        data = event.get('eventData') or {}
+        box = data.get('boundingBox') or {}
+        if model is None or not box.get('width') or not box.get('height'):
+            continue
+        fields = {key: value for key, value in data.items() if key in model.__dataclass_fields__}
+        fields['boundingBox'] = BoundingBox(**{key: box.get(key, 0) for key in ('x', 'y', 'width', 'height')})
+        try:
+            parsed = model(**fields)
+        except TypeError:
+            continue  # A field the model requires is missing
+        if isinstance(parsed, ActorPositionUpdateEvent):
+            npc_id, name = parsed.actorId, parsed.actorName
+        else:
+            npc_id, name = parsed.npcId, parsed.npcName
+        bb = parsed.boundingBox
+        labels.append(LabelEvent(parse_timestamp(event['timestamp']), npc_id, name,
+                                 (bb.x, bb.y, bb.x + bb.width, bb.y + bb.height)))
+    return labels
+
+
+class FrameStore:
+    """
+    A directory of compressed .npz chunks of captured frames.
+
+    Each chunk holds up to `chunk_size` same-sized frames with their capture
+    timestamps and screen rects. A frame is dropped as a near-duplicate when
+    fewer than `min_change` of its tiles differ from the last stored frame.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 64, min_change: float = 0.02, tile_size: int = 32):
+        """
+        path: directory of the store, created if missing
+        chunk_size: frames per chunk file
+        min_change: share of changed tiles (0-1) a frame needs to be stored (0 = keep every frame)
+        tile_size: tile edge used to compare frames
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.min_change = min_change
+        self.tile_size = tile_size
+        os.makedirs(path, exist_ok=True)
+
+        self.added = 0
+        self.duplicates = 0
+        self._frames, self._timestamps, self._rects = [], [], []
+        self._last_hashes = None
+        self._chunk_index = len(self.chunk_paths())
+
+    def chunk_paths(self) -> list:
+        return sorted(glob.glob(os.path.join(self.path, 'chunk_*.npz')))
+
+    def is_duplicate(self, frame: np.ndarray) -> bool:
+        """Whether a frame is nearly identical to the last stored frame. Updates the reference when it is not."""
+        hashes = tile_hashes(frame, self.tile_size)
+        last = self._last_hashes
+        if last is not None and last.shape == hashes.shape and np.count_nonzero(last != hashes) < self.min_change * hashes.size:
+            return True
+        self._last_hashes = hashes
+        return False
+
+    def add(self, frame: np.ndarray, timestamp: float = None, rect: tuple = None) -> bool:
+        """Stores a copy of an RGB frame unless it is a near-duplicate. Returns whether it was stored."""
+        if self.min_change > 0 and self.is_duplicate(frame):
+            self.duplicates += 1
+            return False
+        if self._frames and self._frames[0].shape != frame.shape:
+            self.flush()  # Chunks hold one frame size
+        self._frames.append(np.array(frame, dtype=np.uint8, copy=True))
+        self._timestamps.append(timestamp if timestamp is not None else time.time())
+        self._rects.append(rect or (0, 0, frame.shape[1], frame.shape[0]))
+        self.added += 1
+        if len(self._frames) >= self.chunk_size:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Writes the pending frames as a new chunk."""
+        if not self._frames:
+            return
+        path = os.path.join(self.path, f"chunk_{self._chunk_index:05d}.npz")
+        np.savez_compressed(path, frames=np.stack(self._frames), timestamps=np.asarray(self._timestamps, dtype=np.float64),
+                            rects=np.asarray(self._rects, dtype=np.int32))
+        self._chunk_index += 1
+        self._frames, self._timestamps, self._rects = [], [], []
+
+    def __iter__(self):
+        """Yields (frame, timestamp, rect) for every stored frame, chunk by chunk."""
+        self.flush()
+        for path in self.chunk_paths():
+            with np.load(path) as chunk:
+                frames, timestamps, rects = chunk['frames'], chunk['timestamps'], chunk['rects']
+            for frame, timestamp, rect in zip(frames, timestamps, rects):
+                yield frame, float(timestamp), tuple(int(v) for v in rect)
+
+
+class FrameRecorder:
+    """Captures client-area frames into a FrameStore with wall-clock timestamps to match the events."""
+
+    def __init__(self, store: FrameStore, frame_cache: FrameCache = None):
+        self.store = store
+        self.frame_cache = frame_cache or FrameCache()
+
+    def step(self) -> bool:
+        """Captures and stores one frame. Returns whether it was stored."""
+        frame = self.frame_cache.tick()
+        if frame is None:
+            return False
+        return self.store.add(frame, time.time(), self.frame_cache.rect)
+
+    def record(self, duration: float, fps: float = 5.0):
+        """Records for `duration` seconds at up to `fps` frames per second."""
+        interval = 1.0 / fps
+        end = time.time() + duration
+        while time.time() < end:
+            started = time.perf_counter()
+            self.step()
+            time.sleep(max(0.0, interval - (time.perf_counter() - started)))
+        self.store.flush()
+
+
+def match_labels(labels: list, timestamp: float, max_skew: float, times: np.ndarray = None) -> list:
+    """
+    The LabelEvents nearest to `timestamp`, one per NPC, within `max_skew` seconds.
+    labels: LabelEvents sorted by timestamp
+    times: the labels' timestamps as an array; pass it when matching many frames against the same labels
+    """
+    if times is None:
+        times = np.fromiter((label.timestamp for label in labels), dtype=np.float64, count=len(labels))
+    lo = int(np.searchsorted(times, timestamp - max_skew, side='left'))
+    hi = int(np.searchsorted(times, timestamp + max_skew, side='right'))
+    nearest = {}
+    for label in labels[lo:hi]:
+        key = (label.npc_id, label.name)
+        if key not in nearest or abs(label.timestamp - timestamp) < abs(nearest[key].timestamp - timestamp):
+            nearest[key] = label
+    return list(nearest.values())
+
+
+def build_dataset(store: FrameStore, events, output_dir: str, max_skew: float = 0.3, canvas_transform: tuple = None,
+                  min_size: int = 4, class_key: str = 'name', classes: list = None, val_every: int = 10,
+                  keep_empty: bool = False) -> dict:
+    """
+    Joins stored frames with the event bounding boxes and writes a YOLO dataset
+    (images/, labels/, classes.txt, data.yaml) to `output_dir`.
+
+    events: anything load_events accepts
+    max_skew: largest time difference in seconds between a frame and its labels (a game tick is 0.6 s)
+    canvas_transform: (origin_x, origin_y, scale_x, scale_y) of the game canvas inside a stored frame; by default
+    frames are client-area captures and the canvas is mapped like CanvasMapper does for a client of the frame's size
+    min_size: smallest box edge in pixels after clipping to the frame
+    class_key: label NPCs by 'name' or by 'id'
+    classes: fixed class list; NPCs not in it are skipped (default: every NPC seen, sorted)
+    val_every: every n-th labeled frame goes to the validation split
+    keep_empty: also write frames without labels, as background examples
+    Returns {'frames': written frames, 'boxes': written boxes, 'classes': class names}.
+    """
+    labels = label_events(load_events(events))
+    key = (lambda label: label.name) if class_key == 'name' else (lambda label: str(label.npc_id))
+    classes = list(classes) if classes is not None else sorted({key(label) for label in labels if key(label)})
+    class_ids = {name: i for i, name in enumerate(classes)}
+    times = np.fromiter((label.timestamp for label in labels), dtype=np.float64, count=len(labels))
+
+    for split in ('train', 'val'):
+        os.makedirs(os.path.join(output_dir, 'images', split), exist_ok=True)
+        os.makedirs(os.path.join(output_dir, 'labels', split), exist_ok=True)
+
+    written = boxes = 0
+    transforms = {}
+    for frame, timestamp, _ in store:
+        height, width = frame.shape[:2]
+        transform = canvas_transform
+        if transform is None:
+            if (width, height) not in transforms:
+                transforms[(width, height)] = CanvasMapper(region=(0, 0, width, height)).transform()
+            transform = transforms[(width, height)]
+
+        matched = [label for label in match_labels(labels, timestamp, max_skew, times) if key(label) in class_ids]
+        frame_boxes = as_boxes([label.box for label in matched])
+        frame_boxes = frame_boxes * (transform[2], transform[3], transform[2], transform[3])
+        frame_boxes += (transform[0], transform[1], transform[0], transform[1])
+        frame_boxes = clip_boxes(frame_boxes, (0, 0, width, height))
+        lines = []
+        for label, (x1, y1, x2, y2), valid in zip(matched, frame_boxes, valid_boxes(frame_boxes, min_size)):
+            if not valid:
+                continue
+            class_id = class_ids[key(label)]
+            lines.append(f"{class_id} {(x1 + x2) / 2 / width:.6f} {(y1 + y2) / 2 / height:.6f} "
+                         f"{(x2 - x1) / width:.6f} {(y2 - y1) / height:.6f}")
+        if not lines and not keep_empty:
+            continue
+
+        split = 'val' if val_every and written % val_every == val_every - 1 else 'train'
+        name = f"{int(timestamp * 1000)}_{written:06d}"
+        cv2.imwrite(os.path.join(output_dir, 'images', split, f"{name}.png"), cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+        with open(os.path.join(output_dir, 'labels', split, f"{name}.txt"), 'w') as f:
+            f.write("\n".join(lines))
+        written += 1
+        boxes += len(lines)
+
+    with open(os.path.join(output_dir, 'classes.txt'), 'w') as f:
+        f.write("\n".join(classes))
+    with open(os.path.join(output_dir, 'data.yaml'), 'w') as f:
+        f.write(f"path: {os.path.abspath(output_dir)}\ntrain: images/train\nval: images/val\n")
+        f.write(f"names: {json.dumps(classes)}\n")
+    return {'frames': written, 'boxes': boxes, 'classes': classes}
+
+
+def train(dataset_dir: str, model: str = 'yolov8n.pt', epochs: int = 50, imgsz: int = 320, batch: int = 16,
+          workers: int = 2, export: bool = True, **kwargs) -> str | None:
+    """
+    Fine-tunes a YOLO model on a dataset from build_dataset, on the CPU.
+    Returns the exported ONNX path (or the best weights when `export` is False),
+    or None if ultralytics is not installed. Extra keyword arguments go to ultralytics' train().
+    """
+    if YOLO is None:
+        print("Training needs ultralytics: pip install ultralytics")
+        return None
+    yolo = YOLO(model)
+    results = yolo.train(data=os.path.join(dataset_dir, 'data.yaml'), epochs=epochs, imgsz=imgsz, batch=batch,
+                         workers=workers, device='cpu', **kwargs)
+    best = os.path.join(str(results.save_dir), 'weights', 'best.pt')
+    if not export:
+        return best
+    return YOLO(best).export(format='onnx', imgsz=imgsz, dynamic=True, simplify=True)
+
+
+if __name__ == '__main__':
+    import sys
+
+    usage = ("Usage:\n"
+             "  python -m src.object_detection.training record <store_dir> <seconds> [fps]\n"
+             "  python -m src.object_detection.training build <store_dir> <events> <dataset_dir>\n"
+             "  python -m src.object_detection.training train <dataset_dir> [epochs]")
+    if len(sys.argv) < 3:
+        print(usage)
+        sys.exit(1)
+    command = sys.argv[1]
+    if command == 'record' and len(sys.argv) >= 4:
+        recorder = FrameRecorder(FrameStore(sys.argv[2]))
+        recorder.record(float(sys.argv[3]), float(sys.argv[4]) if len(sys.argv) > 4 else 5.0)
+        print(f"Stored {recorder.store.added} frames, skipped {recorder.store.duplicates} duplicates.")
+    elif command == 'build' and len(sys.argv) >= 5:
+        summary = build_dataset(FrameStore(sys.argv[2]), sys.argv[3], sys.argv[4])
+        print(f"Wrote {summary['frames']} frames with {summary['boxes']} boxes, classes: {summary['classes']}")
+    elif command == 'train':
+        print(train(sys.argv[2], epochs=int(sys.argv[3]) if len(sys.argv) > 3 else 50))
+    else:
+        print(usage)
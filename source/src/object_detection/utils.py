@@ -0,0 +1,192 @@
+"""
+This module provides vectorized box geometry for detectors and trackers.
+
+Boxes are numpy (N, 4) float arrays of screen corners (x1, y1, x2, y2)
+unless a function says otherwise. Every function works on whole arrays, so
+thousands of boxes are converted, clipped, compared and suppressed without a
+Python loop per box.
+"""
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+
+def as_boxes(boxes) -> np.ndarray:
+    """Any sequence of 4-value boxes as a float (N, 4) array."""
+    return np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+
+
+def xywh_to_xyxy(boxes) -> np.ndarray:
+    """(x, y, width, height) boxes, like the API's boundingBox, to corners."""
+    boxes = as_boxes(boxes).copy()
+    boxes[:, 2:] += boxes[:, :2]
+    return boxes
+
+
+def xyxy_to_xywh(boxes) -> np.ndarray:
+    """Corner boxes to (x, y, width, height)."""
+    boxes = as_boxes(boxes).copy()
+    boxes[:, 2:] -= boxes[:, :2]
+    return boxes
+
+
+def cxcywh_to_xyxy(boxes) -> np.ndarray:
+    """(center x, center y, width, height) boxes, as YOLO models output them, to corners."""
+    boxes = as_boxes(boxes)
+    half = boxes[:, 2:] / 2
+    return np.concatenate([boxes[:, :2] - half, boxes[:, :2] + half], axis=1)
+
+
+def api_boxes(objects, origin: tuple = (0, 0), scale: tuple = (1.0, 1.0)) -> np.ndarray:
+    """
+    Screen corner boxes of API objects or dicts with a bounding box.
+    objects: items with a `bounding_box`/`boundingBox` attribute or key, or the boxes
+    themselves (objects with x/y/width/height attributes, or dicts with those keys)
+    origin: screen position of the game canvas's top-left
+    scale: screen pixels per canvas pixel, for stretched mode
+    """
+    values = np.empty((len(objects), 4), dtype=np.float64)
+    for i, obj in enumerate(objects):
+        box = obj
+        if isinstance(obj, dict):
+            box = obj.get('boundingBox', obj.get('bounding_box', obj))
+        elif hasattr(obj, 'bounding_box'):
+            box = obj.bounding_box
+        elif hasattr(obj, 'boundingBox'):
+            box = obj.boundingBox
+        if isinstance(box, dict):
+            values[i] = (box.get('x', 0), box.get('y', 0), box.get('width', 0), box.get('height', 0))
+        else:
+            values[i] = (box.x, box.y, box.width, box.height)
+    boxes = xywh_to_xyxy(values)
+    boxes *= (scale[0], scale[1], scale[0], scale[1])
+    boxes += (origin[0], origin[1], origin[0], origin[1])
+    return boxes
+
+
+def clip_boxes(boxes, rect: tuple) -> np.ndarray:
+    """Clips corner boxes to a (x1, y1, x2, y2) rect, e.g. the client area."""
+    boxes = as_boxes(boxes)
+    return np.clip(boxes, (rect[0], rect[1], rect[0], rect[1]), (rect[2], rect[3], rect[2], rect[3]))
+
+
+def box_areas(boxes) -> np.ndarray:
+    boxes = as_boxes(boxes)
+    return np.clip(boxes[:, 2] - boxes[:, 0], 0, None) * np.clip(boxes[:, 3] - boxes[:, 1], 0, None)
+
+
+def valid_boxes(boxes, min_size: float = 1) -> np.ndarray:
+    """Bool mask of boxes at least `min_size` wide and high."""
+    boxes = as_boxes(boxes)
+    return (boxes[:, 2] - boxes[:, 0] >= min_size) & (boxes[:, 3] - boxes[:, 1] >= min_size)
+
+
+def iou_matrix(boxes_a, boxes_b) -> np.ndarray:
+    """(N, M) intersection-over-union of two sets of corner boxes."""
+    a, b = as_boxes(boxes_a), as_boxes(boxes_b)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    union = box_areas(a)[:, None] + box_areas(b)[None, :] - inter
+    return np.where(union > 0, inter / np.where(union > 0, union, 1), 0.0)
+
+
+def pair_iou(boxes_a, boxes_b) -> np.ndarray:
+    """Element-wise IoU of two equally long sets of corner boxes."""
+    a, b = as_boxes(boxes_a), as_boxes(boxes_b)
+    inter = (np.clip(np.minimum(a[:, 2], b[:, 2]) - np.maximum(a[:, 0], b[:, 0]), 0, None) *
+             np.clip(np.minimum(a[:, 3], b[:, 3]) - np.maximum(a[:, 1], b[:, 1]), 0, None))
+    union = box_areas(a) + box_areas(b) - inter
+    return np.where(union > 0, inter / np.where(union > 0, union, 1), 0.0)
+
+
+def overlapping_pairs(boxes, iou_threshold: float, block: int = 1024) -> tuple:
+    """
+    (rows, cols) index arrays of every box pair i < j whose IoU exceeds the threshold.
+    Boxes are swept in x1 order, so IoU is only computed for pairs whose x ranges
+    overlap; the sweep runs in blocks to keep the pair arrays small.
+    """
+    boxes = as_boxes(boxes)
+    count = len(boxes)
+    by_x = np.argsort(boxes[:, 0], kind='stable')
+    swept = boxes[by_x]
+    # Boxes after i in x1 order whose x1 lies before box i's x2
+    ends = np.searchsorted(swept[:, 0], swept[:, 2], side='left')
+    counts = np.clip(ends - np.arange(count) - 1, 0, None)
+
+    rows, cols = [], []
+    for start in range(0, count, block):
+        chunk = counts[start:start + block]
+        total = int(chunk.sum())
+        if not total:
+            continue
+        first = np.repeat(np.arange(start, start + len(chunk)), chunk)
+        second = first + 1 + np.arange(total) - np.repeat(np.cumsum(chunk) - chunk, chunk)
+        over = pair_iou(swept[first], swept[second]) > iou_threshold
+        a, b = by_x[first[over]], by_x[second[over]]
+        rows.append(np.minimum(a, b))
+        cols.append(np.maximum(a, b))
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(rows), np.concatenate(cols)
+
+
+def nms(boxes, scores, iou_threshold: float = 0.45, class_ids=None, max_detections: int = None) -> np.ndarray:
+    """
+    Non-maximum suppression. Returns the indices of the kept boxes, best score first.
+    class_ids: when given, boxes only suppress boxes of the same class
+
+    Same result as greedy NMS, computed without a loop per box: a box is kept
+    when no kept, higher-scoring box overlaps it, which is resolved for all
+    boxes at once and repeated until nothing changes (a few passes, as many
+    as the longest chain of overlapping boxes).
+    """
+    boxes = as_boxes(boxes)
+    scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+    if not len(boxes):
+        return np.empty(0, dtype=np.int64)
+    if class_ids is not None:
+        # Shift every class into its own area so boxes of different classes never overlap
+        offset = np.asarray(class_ids, dtype=np.float64).reshape(-1, 1) * (boxes.max() - boxes.min() + 1)
+        boxes = boxes + offset
+
+    order = np.argsort(-scores, kind='stable')
+    rows, cols = overlapping_pairs(boxes[order], iou_threshold)
+    keep = np.ones(len(order), dtype=bool)
+    while True:
+        suppressed = np.zeros(len(order), dtype=bool)
+        suppressed[cols[keep[rows]]] = True
+        if np.array_equal(keep, ~suppressed):
+            break
+        keep = ~suppressed
+    kept = order[keep]
+    return kept[:max_detections] if max_detections is not None else kept
+
+
+def match_boxes(iou: np.ndarray, min_iou: float) -> list:
+    """
+    Pairs rows with columns of an IoU matrix. Uses the Hungarian algorithm
+    when scipy is available, otherwise greedily takes the best remaining pair.
+    Returns [(row, col), ...] with IoU >= min_iou.
+    """
+    if iou.size == 0:
+        return []
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(-iou)
+        return [(int(r), int(c)) for r, c in zip(rows, cols) if iou[r, c] >= min_iou]
+
+    pairs = []
+    scores = iou.copy()
+    while True:
+        r, c = np.unravel_index(int(np.argmax(scores)), scores.shape)
+        if scores[r, c] < min_iou:
+            return pairs
+        pairs.append((int(r), int(c)))
+        scores[r, :] = -1
+        scores[:, c] = -1
@@ -12,6 +12,13 @@ from .client_window import RuneLiteClientWindow
 from .game_screen import GameScreen
 from . import ui_utils
 from .window_overlay import WindowOverlay
+from .vision import color_search
+from .vision.integral import IntegralImage
+from .vision.minimap_radar import MinimapRadar
+from .vision.api_fusion import TargetLocator
+from .vision import ocr
+from .runelite_api import RuneLiteAPI
+from .game_state import GameState
 
 class RoutePather:
     """
@@ -24,9 +31,14 @@ class RoutePather:
         if not self.route_data or 'steps' not in self.route_data:
             raise ValueError(f"Invalid or empty route data in {route_name}.json")
 
+        if any(step.get("method") == "gamescreen-action-sampler" for step in self.route_data['steps']):
+            ocr.warm_up()  # Action sampling reads text; load the reader while the route starts
+
         self.confidence = confidence
         self.overlay = overlay
         self.stop_event = threading.Event()
+        self.radar = None  # Created on the first minimap-radar-dot step
+        self.locator = None  # Created on the first api-target-click step
 
         self.ui_interaction = ui_utils.UIInteraction(
             ui_utils.HumanizedGridClicker(), 
@@ -98,7 +110,7 @@ class RoutePather:
             print("Could not determine minimap region. Aborting.")
             return False
         
-        region_tuple = (minimap_region['left'], minimap_region['top'], minimap_region['w'], minimap_region['h'])
+        region_tuple = (minimap_region['left'], minimap_region['top'], minimap_region['left'] + minimap_region['w'], minimap_region['top'] + minimap_region['h'])
         location = self.game_screen.find_image(image_file, confidence=confidence, region=region_tuple)
 
         if location:
@@ -109,6 +121,57 @@ class RoutePather:
             print(f"Error: Could not find image {image_file} for minimap-image-recognition.")
             return False
 
+    def _execute_minimap_radar_dot(self, args: Dict[str, Any]) -> bool:
+        kind = args.get("kind", "npc")
+        max_distance = args.get("max_distance")
+        timeout = args.get("timeout", 0)
+
+        if self.radar is None:
+            self.radar = MinimapRadar(self.game_screen, self.client)
+
+        # Wait up to `timeout` seconds for a dot of the kind to show up on the minimap
+        deadline = time.time() + timeout
+        dot = self.radar.nearest(kind, max_distance)
+        while dot is None and time.time() < deadline and not self.stop_event.is_set():
+            time.sleep(0.1)
+            dot = self.radar.nearest(kind, max_distance)
+
+        if dot is None:
+            print(f"Error: No '{kind}' dot found on the minimap for minimap-radar-dot.")
+            return False
+
+        print(f"  - Nearest {kind} dot: {dot.distance:.1f} tiles at {dot.bearing:.0f} degrees.")
+        pyautogui.click(dot.center)
+        return True
+
+    def _execute_api_target_click(self, args: Dict[str, Any]) -> bool:
+        kind = args.get("kind", "npc")
+        name = args.get("name")
+        target_id = args.get("id")
+        max_distance = args.get("max_distance", 10)
+        color = args.get("color")
+        tolerance = args.get("tolerance", 20)
+        timeout = args.get("timeout", 0)
+
+        if self.locator is None:
+            self.locator = TargetLocator(GameState(RuneLiteAPI()), self.game_screen)
+        locate = self.locator.locate_npc if kind == "npc" else self.locator.locate_object
+
+        # Wait up to `timeout` seconds for the target to come on screen
+        deadline = time.time() + timeout
+        target = locate(name, target_id, max_distance, color=color, tolerance=tolerance)
+        while target is None and time.time() < deadline and not self.stop_event.is_set():
+            time.sleep(0.2)
+            target = locate(name, target_id, max_distance, color=color, tolerance=tolerance)
+
+        if target is None:
+            print(f"Error: No {kind} '{name or target_id}' found on screen for api-target-click.")
+            return False
+
+        print(f"  - Found {kind} {target.name} ({target.id}) {target.distance:.0f} tiles away at {target.point}.")
+        pyautogui.click(target.point)
+        return True
+
     def _execute_gamescreen_action_sampler(self, args: Dict[str, Any]) -> bool:
         target_action = args.get("target_action")
         scan_region_offset_x = args.get("scan_region_offset_x", 1)
@@ -124,6 +187,8 @@ class RoutePather:
         required_match_percentage = args.get("required_match_percentage", 0.7)
         pre_scan_keyboard_press = args.get("pre_scan_keyboard_press")
         pre_scan_keyboard_press_duration = args.get("pre_scan_keyboard_press_duration", 1.0)
+        scan_spectrum_range = args.get("scan_spectrum_range")
+        scan_window_size = args.get("scan_window_size", 6)
 
         if not target_action or not ocr_region_p1_rel or not ocr_region_p2_rel:
             print("Error: 'gamescreen-action-sampler' requires 'target_action', 'ocr_region_p1_rel', 'ocr_region_p2_rel' arguments.")
@@ -161,38 +226,39 @@ class RoutePather:
         ocr_region = (min(abs_p1[0], abs_p2[0]), min(abs_p1[1], abs_p2[1]), max(abs_p1[0], abs_p2[0]), max(abs_p1[1], abs_p2[1]))
 
         print(f"  - Scanning region {scan_region} for '{target_action}' action...")
-        
+
+        scan_points = [(x_scan, y_scan) for x_scan in range(scan_region[0], scan_region[2], 2) for y_scan in range(scan_region[1], scan_region[3], 2)]
+        if scan_spectrum_range:
+            scan_points = self._rank_scan_points(scan_points, scan_region, scan_spectrum_range, scan_window_size)
+
         step_success = False
-        for x_scan in range(scan_region[0], scan_region[2], 2):
-            for y_scan in range(scan_region[1], scan_region[3], 2):
-                if self.stop_event.is_set(): break
-                pyautogui.moveTo(x_scan, y_scan)
-                time.sleep(0.2)
-
-                ocr_region_below_mouse = (
-                    x_scan + ocr_region_below_mouse_offset_x,
-                    y_scan + ocr_region_below_mouse_offset_y,
-                    x_scan + ocr_region_below_mouse_offset_x + ocr_region_below_mouse_width,
-                    y_scan + ocr_region_below_mouse_offset_y + ocr_region_below_mouse_height
-                )
-
-                if self.overlay:
-                    self.overlay.add_highlight(top_left=(ocr_region[0], ocr_region[1]), bottom_right=(ocr_region[2], ocr_region[3]), color_start=(0, 0, 255), duration=1.0)
-                    self.overlay.add_highlight(top_left=(ocr_region_below_mouse[0], ocr_region_below_mouse[1]), bottom_right=(ocr_region_below_mouse[2], ocr_region_below_mouse[3]), color_start=(128, 0, 128), duration=1.0)
-
-                action_text_main = self.game_screen.read_text_from_region(*ocr_region)
-                action_text_below = self.game_screen.read_text_from_region(*ocr_region_below_mouse)
-
-                print(f"  - OCR Result (Main) at ({x_scan},{y_scan}): '{action_text_main}'")
-                print(f"  - OCR Result (Below Mouse) at ({x_scan},{y_scan}): '{action_text_below}'")
-                
-                if (self.game_screen.fuzzy_text_match(action_text_main, target_action, word_similarity_threshold, required_match_percentage) or
-                    self.game_screen.fuzzy_text_match(action_text_below, target_action, word_similarity_threshold, required_match_percentage)):
-                    print(f"  - OCR validation successful. Found action similar to '{target_action}'. Clicking at ({x_scan},{y_scan}).")
-                    pyautogui.click(x_scan, y_scan)
-                    step_success = True
-                    break
-            if step_success or self.stop_event.is_set():
+        for x_scan, y_scan in scan_points:
+            if self.stop_event.is_set(): break
+            pyautogui.moveTo(x_scan, y_scan)
+            time.sleep(0.2)
+
+            ocr_region_below_mouse = (
+                x_scan + ocr_region_below_mouse_offset_x,
+                y_scan + ocr_region_below_mouse_offset_y,
+                x_scan + ocr_region_below_mouse_offset_x + ocr_region_below_mouse_width,
+                y_scan + ocr_region_below_mouse_offset_y + ocr_region_below_mouse_height
+            )
+
+            if self.overlay:
+                self.overlay.add_highlight(top_left=(ocr_region[0], ocr_region[1]), bottom_right=(ocr_region[2], ocr_region[3]), color_start=(0, 0, 255), duration=1.0)
+                self.overlay.add_highlight(top_left=(ocr_region_below_mouse[0], ocr_region_below_mouse[1]), bottom_right=(ocr_region_below_mouse[2], ocr_region_below_mouse[3]), color_start=(128, 0, 128), duration=1.0)
+
+            action_text_main = self.game_screen.read_text_from_region(*ocr_region)
+            action_text_below = self.game_screen.read_text_from_region(*ocr_region_below_mouse)
+
+            print(f"  - OCR Result (Main) at ({x_scan},{y_scan}): '{action_text_main}'")
+            print(f"  - OCR Result (Below Mouse) at ({x_scan},{y_scan}): '{action_text_below}'")
+
+            if (self.game_screen.fuzzy_text_match(action_text_main, target_action, word_similarity_threshold, required_match_percentage) or
+                self.game_screen.fuzzy_text_match(action_text_below, target_action, word_similarity_threshold, required_match_percentage)):
+                print(f"  - OCR validation successful. Found action similar to '{target_action}'. Clicking at ({x_scan},{y_scan}).")
+                pyautogui.click(x_scan, y_scan)
+                step_success = True
                 break
         
         if not step_success:
@@ -200,6 +266,19 @@ class RoutePather:
             return False
         return True
 
+    def _rank_scan_points(self, scan_points: list, scan_region: tuple, spectrum_range: list, window_size: int) -> list:
+        """Orders scan points by how many pixels around them match the spectrum range, densest first."""
+        img_array = self.game_screen.capture_region(*scan_region)
+        if img_array is None:
+            return scan_points
+
+        integral = IntegralImage(color_search.color_mask(img_array, spectrum_range), scan_region[:2])
+        half = window_size // 2
+        windows = [(x - half, y - half, x + half + 1, y + half + 1) for x, y in scan_points]
+        counts = integral.counts(windows)
+        order = sorted(range(len(scan_points)), key=lambda i: -counts[i])
+        return [scan_points[i] for i in order]
+
     def _execute_view_reset_zoomout_stable(self, args: Dict[str, Any]) -> bool:
         try:
             self.client.bring_to_foreground()
@@ -230,6 +309,8 @@ class RoutePather:
             "minimap-image-recognition": self._execute_minimap_image_recognition,
             "gamescreen-action-sampler": self._execute_gamescreen_action_sampler,
             "minimap-compass-direction": self._execute_minimap_compass_direction,
+            "minimap-radar-dot": self._execute_minimap_radar_dot,
+            "api-target-click": self._execute_api_target_click,
             "view-reset-zoomout-stable": self._execute_view_reset_zoomout_stable,
         }
 
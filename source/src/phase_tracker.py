@@ -1,40 +1,111 @@
 import threading
 import time
 from .game_screen import GameScreen
+from .vision.frame_cache import FrameCache
+from .vision.capture_thread import CaptureThread
+from .vision.phase_detection import detect_phase
+from .vision.change_detector import ChangeDetector
+from .vision.color_lut import get_phase_palette
+from .vision import kernels
+from .vision.pipeline import VisionPipeline
 
 class PhaseDetector:
-    def __init__(self, phase_data, on_phase_change=None):
+    def __init__(self, phase_data, on_phase_change=None, frame_cache: FrameCache = None, capture_thread: CaptureThread = None):
         self.phase_colors = {phase_info['style']: phase_info['colors'] for phase_info in phase_data.values()}
-        self.game_screen = GameScreen()
+        self.game_screen = GameScreen(frame_cache=frame_cache)
+        # When set, the loop blocks on the next published frame instead of sleeping and grabbing.
+        self.capture_thread = capture_thread
+        # Skips detection while the game view is unchanged. Every pixel is hashed: a strided hash can miss
+        # a small recolour (e.g. a few pixels of a phase colour) and hold a stale phase until the next big change.
+        self.change_detector = ChangeDetector(step=1)
         self.on_phase_change = on_phase_change
         self.last_phase = None
         self.running = False
         self.thread = None
+        self.pipeline = None
 
-    def _detector_loop(self, region, samples, tolerance, interval, exclude_region):
+    def _report(self, phase, confidence):
+        if phase and phase != self.last_phase:
+            self.last_phase = phase
+            if self.on_phase_change:
+                self.on_phase_change(phase, confidence)
+
+    def _detector_loop(self, region, samples, tolerance, interval, exclude_region, max_age_ms, stride, color_space, game_view_only):
+        last_index = None
         while self.running:
-            phase, confidence = self.game_screen.detect_phase_from_screen(region, samples, tolerance, self.phase_colors, exclude_region)
-            if phase and phase != self.last_phase:
-                self.last_phase = phase
-                if self.on_phase_change:
-                    self.on_phase_change(phase, confidence)
-            time.sleep(interval)
-
-    def start(self, region: tuple, samples: int = 16, tolerance: int = 20, interval: float = 0.1, exclude_region: tuple = None):
+            # Chrome rects only move with the window; the exclusion mask is cached per position
+            exclude = self.game_screen.add_chrome_exclusions(exclude_region) if game_view_only else exclude_region
+            if self.capture_thread is not None:
+                frame = self.capture_thread.next_frame(last_index, timeout=1.0)
+                if frame is None:
+                    continue
+                last_index = frame.index
+                image = frame.region(region)
+                if image is None:
+                    continue
+                self.change_detector.update(frame.image, frame.rect)
+            else:
+                image = self.game_screen.grab_region(region, max_age_ms)
+                if image is None:
+                    time.sleep(interval)
+                    continue
+                self.change_detector.update(image, region)
+
+            phase, confidence = self.change_detector.cached(
+                'phase', lambda: detect_phase(image, region[:2], samples, tolerance, self.phase_colors, exclude, stride, color_space), region)
+
+            self._report(phase, confidence)
+            if self.capture_thread is None:
+                time.sleep(interval)
+
+    def start(self, region: tuple, samples: int = None, tolerance: int = 20, interval: float = 0.1, exclude_region=None, max_age_ms: float = None, stride: int = 2, color_space: str = 'rgb', game_view_only: bool = False):
+        """
+        Starts detecting in a background thread. Every `stride`-th pixel of `region` is
+        classified; pass stride=None to sample roughly `samples` pixels instead.
+        color_space 'hsv' or 'lab' matches hue/chroma instead of an RGB box; pass tolerance=None for its defaults.
+        game_view_only also excludes the UI chrome listed in user-interface.json.
+        """
         if self.running:
             print("Phase detector is already running.")
             return
 
+        # Compile (or load) the palette for this color space and the pixel kernels before the first frame
+        get_phase_palette(self.phase_colors, tolerance, color_space=color_space)
+        kernels.warm_up()
+
         self.running = True
-        self.thread = threading.Thread(target=self._detector_loop, args=(region, samples, tolerance, interval, exclude_region))
+        self.thread = threading.Thread(target=self._detector_loop, args=(region, samples, tolerance, interval, exclude_region, max_age_ms, stride, color_space, game_view_only))
         self.thread.daemon = True
         self.thread.start()
 
+    def attach(self, pipeline: VisionPipeline, roi: tuple = (4, 4, 515, 339), samples: int = None, tolerance: int = 20, interval: float = 0.1, exclude_region=None, stride: int = 2, color_space: str = 'rgb', game_view_only: bool = False):
+        """
+        Runs detection as the 'phase' detector of a shared VisionPipeline instead of in its own thread,
+        so it shares the pipeline's capture with the other detectors.
+        roi is relative to the client area (see vision.pipeline.Detector); the other arguments are as for start().
+        """
+        get_phase_palette(self.phase_colors, tolerance, color_space=color_space)
+        kernels.warm_up()
+
+        def detect(ctx):
+            exclude = self.game_screen.add_chrome_exclusions(exclude_region) if game_view_only else exclude_region
+            self.change_detector.update(ctx.image, ctx.rect)
+            return self.change_detector.cached(
+                'phase', lambda: detect_phase(ctx.image, ctx.rect[:2], samples, tolerance, self.phase_colors, exclude, stride, color_space), ctx.rect)
+
+        self.pipeline = pipeline
+        return pipeline.add('phase', roi, detect, rate=1.0 / interval if interval else None,
+                            on_result=lambda name, result: self._report(*result))
+
     def stop(self):
         self.running = False
         if self.thread:
             self.thread.join()
+        if self.pipeline is not None:
+            self.pipeline.remove('phase')
+            self.pipeline = None
         self.last_phase = None
+        self.change_detector.reset()
 
 
 class RotationManager:
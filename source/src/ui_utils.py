@@ -4,14 +4,17 @@ import json
 import logging
 import random
 import time
-import pyautogui
-from typing import Literal
+import numpy as np
+from typing import Literal, TYPE_CHECKING
 
 # Add the project root to sys.path to allow for absolute imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from .client_window import RuneLiteClientWindow
-from .window_overlay import WindowOverlay
+# Window, overlay and input modules need a desktop session; they are imported where they are used
+# so the coordinate and UI-data helpers also work headless.
+if TYPE_CHECKING:
+    from .client_window import RuneLiteClientWindow
+    from .window_overlay import WindowOverlay
 
 # --- Coordinate Transformation for Stretched Mode ---
 class CoordinateTransformer:
@@ -20,7 +23,7 @@ class CoordinateTransformer:
     REF_CLIENT_WIDTH = 765
     REF_CLIENT_HEIGHT = 503
 
-    def __init__(self, client_window: RuneLiteClientWindow):
+    def __init__(self, client_window: 'RuneLiteClientWindow'):
         self.client = client_window or None;
 
     def transform_stretched_coords(self, relative_coords: tuple) -> tuple | None:
@@ -46,6 +49,18 @@ class CoordinateTransformer:
 
         return (int(live_abs_x), int(live_abs_y))
 
+    def transform_stretched_coords_many(self, relative_coords: list) -> np.ndarray | None:
+        """Vectorized transform_stretched_coords: transforms many points with a single client-rect lookup."""
+        live_client_rect = self.client.get_client_rect()
+        if not live_client_rect:
+            print("Error: Live client rectangle not found. Cannot transform coordinates.")
+            return None
+
+        coords = np.asarray(relative_coords, dtype=np.float64).reshape(-1, 2)
+        scale = np.array([live_client_rect['w'] / self.REF_CLIENT_WIDTH, live_client_rect['h'] / (self.REF_CLIENT_HEIGHT + 38)])
+        corner = np.array([live_client_rect['right'], live_client_rect['bottom']])
+        return (corner - coords * scale).astype(np.int64)
+
 # --- Data Loading ---
 def _load_ui_data():
     """Loads the JSON file."""
@@ -109,10 +124,34 @@ def _get_grid_slot_coords(grid_name: Grid, slot: int) -> tuple | None:
 
     return (int(round(x)), int(round(y)))
 
+def get_probe_set(name: str) -> dict:
+    """Resolves a named probe set from the 'probes' section to {label: (x, y)} reference-relative coordinates."""
+    spec = _ui_data.get('probes', {}).get(name)
+    if not spec: return {}
+
+    if 'grid' in spec:
+        grid_name = spec['grid']
+        slots = _ui_data.get(grid_name, {}).get('slots', 0)
+        return {str(slot): _get_grid_slot_coords(grid_name, slot) for slot in range(1, slots + 1)}
+    if 'section' in spec:
+        section = _ui_data.get(spec['section'], {})
+        return {label: (point['x'], point['y']) for label, point in section.items() if isinstance(point, dict) and 'x' in point}
+    return {label: (point['x'], point['y']) for label, point in spec.get('points', {}).items()}
+
+def get_ui_rects(section_name: str) -> dict:
+    """Returns a section of x1/y1/x2/y2 entries as {name: (x1, y1, x2, y2)} bottom-right-relative reference rects."""
+    section = _ui_data.get(section_name, {})
+    return {name: (rect['x1'], rect['y1'], rect['x2'], rect['y2']) for name, rect in section.items() if isinstance(rect, dict)}
+
+def get_chrome_rects() -> dict:
+    """Returns the 'chrome' section, see get_ui_rects."""
+    return get_ui_rects('chrome')
+
 def find_ui_element_by_image(image_file: str, confidence=0.8, region: tuple | None = None) -> tuple | None:
     if not os.path.exists(image_file):
         print(f"Warning: Image file not found at {image_file}")
         return None
+    import pyautogui
     try:
         return pyautogui.locateCenterOnScreen(image_file, confidence=confidence, region=region)
     except pyautogui.PyAutoGUIException as e:
@@ -205,7 +244,7 @@ class HumanizedGridClicker:
 
 # --- UI Interaction Class ---
 class UIInteraction:
-    def __init__(self, clicker: HumanizedGridClicker, overlay: WindowOverlay, client_window: RuneLiteClientWindow, templates_dir: str = '../res/image'):
+    def __init__(self, clicker: HumanizedGridClicker, overlay: 'WindowOverlay', client_window: 'RuneLiteClientWindow', templates_dir: str = '../res/image'):
         self.clicker = clicker
         self.overlay = overlay
         self.client_window = client_window
@@ -234,6 +273,7 @@ class UIInteraction:
 
     def _perform_click(self, abs_click_coords: tuple):
         if not abs_click_coords: return
+        import pyautogui
         pyautogui.click(abs_click_coords[0], abs_click_coords[1])
         if self.overlay:
             self.overlay.add_highlight((abs_click_coords[0]-5, abs_click_coords[1]-5), (abs_click_coords[0]+5, abs_click_coords[1]+5), duration=0.5)
@@ -315,6 +355,10 @@ class UIInteraction:
         self._perform_click(abs_coords)
 
 if __name__ == '__main__':
+    import pyautogui
+    from .client_window import RuneLiteClientWindow
+    from .window_overlay import WindowOverlay
+
     print("--- UI Utils Demo ---")
     client = RuneLiteClientWindow()
     win_rect = client.get_rect()
@@ -0,0 +1,228 @@
+"""
+This module places RuneLite API targets on the screen.
+
+NPCs and objects from GameState carry a canvas location and a bounding box
+in game-canvas pixels. The canvas is anchored at the client's bottom-right
+and stretched like every other reference coordinate, so mapping them to the
+screen is one multiply-add with the cached client rect. A target can be
+confirmed by sampling a few pixels inside its box against a color range,
+instead of searching the frame for it.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from ..game_screen import GameScreen
+from ..game_state import GameState
+from ..object_detection.utils import api_boxes, clip_boxes, valid_boxes
+from ..ui_utils import CoordinateTransformer
+from . import color_search
+from .frame_cache import FrameCache
+
+if TYPE_CHECKING:
+    from ..client_window import RuneLiteClientWindow
+
+
+@dataclass
+class ApiTarget:
+    """An API NPC or object mapped onto the screen."""
+    kind: str  # 'npc' or 'object'
+    id: int
+    name: str
+    box: tuple  # Screen (x1, y1, x2, y2), clipped to the game view
+    point: tuple  # Screen (x, y) to click
+    distance: float  # Tiles from the player
+    source: object  # The GameState NPC or GameObject
+    confirmed: bool = None  # Result of the last color check, None if never checked
+
+
+class CanvasMapper:
+    """
+    Maps game-canvas coordinates to screen coordinates.
+
+    The client rect comes from a fixed region, from the frame cache's last
+    capture, or from the window at most once every `rect_ttl` seconds.
+    """
+
+    def __init__(self, client_window: 'RuneLiteClientWindow' = None, frame_cache: FrameCache = None, region: tuple = None,
+                 rect_ttl: float = 1.0):
+        """
+        client_window: the window whose client area holds the canvas (found lazily if None)
+        frame_cache: frame cache whose capture rect is used as the client rect when available
+        region: fixed (x1, y1, x2, y2) screen region to treat as the client area instead
+        rect_ttl: seconds a window lookup of the client rect is reused
+        """
+        self.client = client_window
+        self.frame_cache = frame_cache
+        self.fixed_region = region
+        self.rect_ttl = rect_ttl
+        self._rect = None
+        self._rect_time = 0.0
+
+    def client_rect(self) -> tuple | None:
+        """The (x1, y1, x2, y2) screen rect of the client area."""
+        if self.fixed_region is not None:
+            return tuple(int(v) for v in self.fixed_region)
+        if self.frame_cache is not None and self.frame_cache.rect is not None:
+            return self.frame_cache.rect
+        if self._rect is None or time.time() - self._rect_time > self.rect_ttl:
+            if self.client is None:
+                from ..client_window import RuneLiteClientWindow
+                self.client = RuneLiteClientWindow()
+            rect = self.client.get_client_rect()
+            self._rect = (rect['left'], rect['top'], rect['right'], rect['bottom']) if rect else None
+            self._rect_time = time.time()
+        return self._rect
+
+    def transform(self) -> tuple | None:
+        """Returns (origin_x, origin_y, scale_x, scale_y): the canvas's screen top-left and its stretch."""
+        rect = self.client_rect()
+        if rect is None:
+            return None
+        scale_x = (rect[2] - rect[0]) / CoordinateTransformer.REF_CLIENT_WIDTH
+        scale_y = (rect[3] - rect[1]) / (CoordinateTransformer.REF_CLIENT_HEIGHT + 38)
+        # The canvas shares the client's bottom-right corner
+        return (rect[2] - CoordinateTransformer.REF_CLIENT_WIDTH * scale_x,
+                rect[3] - CoordinateTransformer.REF_CLIENT_HEIGHT * scale_y, scale_x, scale_y)
+
+    def canvas_to_screen(self, points) -> np.ndarray | None:
+        """Screen (x, y) of canvas points as an (N, 2) int array."""
+        transform = self.transform()
+        if transform is None:
+            return None
+        origin_x, origin_y, scale_x, scale_y = transform
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return np.rint(pts * (scale_x, scale_y) + (origin_x, origin_y)).astype(np.int64)
+
+    def screen_to_canvas(self, points) -> np.ndarray | None:
+        """Canvas (x, y) of screen points as an (N, 2) int array."""
+        transform = self.transform()
+        if transform is None:
+            return None
+        origin_x, origin_y, scale_x, scale_y = transform
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return np.rint((pts - (origin_x, origin_y)) / (scale_x, scale_y)).astype(np.int64)
+
+    def boxes_to_screen(self, objects: list) -> np.ndarray | None:
+        """Screen corner boxes of API objects' bounding boxes, as an (N, 4) float array."""
+        transform = self.transform()
+        if transform is None:
+            return None
+        return api_boxes(objects, transform[:2], transform[2:])
+
+
+class TargetLocator:
+    """
+    Finds API NPCs and objects on the screen with one API request.
+
+    Targets outside the game view are dropped. With a color, a small grid of
+    pixels inside each box is sampled from the frame and the nearest target
+    with enough matching pixels wins; its click point moves onto a match.
+    """
+
+    def __init__(self, game_state: GameState, game_screen: GameScreen = None, mapper: CanvasMapper = None,
+                 grid: int = 4, inset: float = 0.2, max_age_ms: float = None):
+        """
+        game_state: API access for NPCs and objects
+        game_screen: screen to sample from; use one with a frame cache to read the shared frame
+        mapper: canvas-to-screen mapping, defaults to one on the game screen's frame cache
+        grid: sample points per box edge for color checks (grid x grid pixels)
+        inset: share of the box trimmed from each side before sampling
+        max_age_ms: maximum age of a cached frame to sample
+        """
+        self.game_state = game_state
+        self.game_screen = game_screen or GameScreen()
+        self.mapper = mapper or CanvasMapper(frame_cache=self.game_screen.frame_cache)
+        self.grid = grid
+        self.inset = inset
+        self.max_age_ms = max_age_ms
+
+    def _view_rect(self) -> tuple | None:
+        rect = self.mapper.client_rect()
+        if rect is None:
+            return None
+        return self.game_screen.ui_masks.game_view_rect(rect)
+
+    def to_targets(self, objects: list, kind: str) -> list:
+        """Maps GameState NPCs or objects to ApiTargets inside the game view, nearest first."""
+        if not objects:
+            return []
+        boxes = self.mapper.boxes_to_screen(objects)
+        view = self._view_rect()
+        if boxes is None or view is None:
+            return []
+        boxes = np.rint(clip_boxes(boxes, view)).astype(np.int64)
+        centers = (boxes[:, :2] + boxes[:, 2:]) // 2
+
+        targets = []
+        for i in np.flatnonzero(valid_boxes(boxes, 2)):
+            obj = objects[i]
+            targets.append(ApiTarget(kind=kind, id=obj.id, name=obj.name, box=tuple(int(v) for v in boxes[i]),
+                                     point=(int(centers[i, 0]), int(centers[i, 1])), distance=obj.distance, source=obj))
+        targets.sort(key=lambda target: target.distance)
+        return targets
+
+    @staticmethod
+    def _matches(targets: list, name: str, target_id: int) -> list:
+        return [target for target in targets
+                if (target_id is None or target.id == target_id) and (name is None or target.name.lower() == name.lower())]
+
+    def npcs(self, name: str = None, npc_id: int = None, max_distance: int = 10) -> list:
+        """On-screen NPCs matching a name and/or id, nearest first."""
+        return self._matches(self.to_targets(self.game_state.get_npcs_in_vicinity(max_distance), 'npc'), name, npc_id)
+
+    def objects(self, name: str = None, object_id: int = None, max_distance: int = 10) -> list:
+        """On-screen objects matching a name and/or id, nearest first."""
+        return self._matches(self.to_targets(self.game_state.get_objects_in_vicinity(max_distance), 'object'), name, object_id)
+
+    def sample_points(self, box: tuple) -> np.ndarray:
+        """The (grid * grid, 2) screen points sampled inside a box."""
+        x1, y1, x2, y2 = box
+        dx, dy = (x2 - x1) * self.inset, (y2 - y1) * self.inset
+        xs = np.linspace(x1 + dx, x2 - dx - 1, self.grid)
+        ys = np.linspace(y1 + dy, y2 - dy - 1, self.grid)
+        return np.rint(np.stack(np.meshgrid(xs, ys), axis=-1).reshape(-1, 2)).astype(np.int64)
+
+    def confirm(self, targets: list, color: tuple = None, spectrum_range: list = None, tolerance: int = 20,
+                min_matches: int = 1) -> list:
+        """
+        Color-checks targets with one pixel sample for all of them. Sets each
+        target's `confirmed`, moves the click point of confirmed targets onto
+        their first matching pixel and returns the confirmed targets.
+        color/spectrum_range: an (r, g, b) color with `tolerance`, or explicit range(s)
+        """
+        if not targets:
+            return []
+        spectrum_range = spectrum_range or color_search.color_to_spectrum(color, tolerance)
+        points = np.concatenate([self.sample_points(target.box) for target in targets])
+        colors = self.game_screen.sample_pixels(points, self.max_age_ms)
+        matches = color_search.color_mask(colors.reshape(-1, 1, 3), spectrum_range).reshape(len(targets), -1) > 0
+        points = points.reshape(len(targets), -1, 2)
+
+        confirmed = []
+        for target, target_matches, target_points in zip(targets, matches, points):
+            target.confirmed = int(np.count_nonzero(target_matches)) >= min_matches
+            if target.confirmed:
+                first = int(np.argmax(target_matches))
+                target.point = (int(target_points[first, 0]), int(target_points[first, 1]))
+                confirmed.append(target)
+        return confirmed
+
+    def _locate(self, targets: list, color: tuple, spectrum_range: list, tolerance: int, min_matches: int) -> ApiTarget | None:
+        if color is None and spectrum_range is None:
+            return targets[0] if targets else None
+        confirmed = self.confirm(targets, color, spectrum_range, tolerance, min_matches)
+        return confirmed[0] if confirmed else None
+
+    def locate_npc(self, name: str = None, npc_id: int = None, max_distance: int = 10, color: tuple = None,
+                   spectrum_range: list = None, tolerance: int = 20, min_matches: int = 1) -> ApiTarget | None:
+        """The nearest on-screen NPC by name and/or id, confirmed by color when one is given."""
+        return self._locate(self.npcs(name, npc_id, max_distance), color, spectrum_range, tolerance, min_matches)
+
+    def locate_object(self, name: str = None, object_id: int = None, max_distance: int = 10, color: tuple = None,
+                      spectrum_range: list = None, tolerance: int = 20, min_matches: int = 1) -> ApiTarget | None:
+        """The nearest on-screen object by name and/or id, confirmed by color when one is given."""
+        return self._locate(self.objects(name, object_id, max_distance), color, spectrum_range, tolerance, min_matches)
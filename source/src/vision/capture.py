@@ -0,0 +1,268 @@
+"""
+This module provides pluggable screen-capture backends for GameScreen.
+
+Every backend is a long-lived grabber that keeps its output buffer between
+calls, so repeated grabs of the same region do not allocate a new image.
+"""
+
+import glob
+import os
+import threading
+import time
+
+import numpy as np
+import cv2
+from PIL import ImageGrab, Image
+
+try:
+    import mss
+except ImportError:
+    mss = None
+
+# Set this to force a backend, e.g. "pil", "native" or "replay:<path>".
+CAPTURE_BACKEND_ENV = "CAPTURE_BACKEND"
+
+
+class CaptureBackend:
+    """
+    Base class for screen grabbers. Subclasses implement `_grab_into`.
+
+    The array returned by `grab` is owned by the backend and is overwritten by
+    the next grab of the same size. Copy it if it has to outlive that call.
+    """
+    name = "base"
+
+    def __init__(self):
+        self._buffer = None
+        self._lock = threading.Lock()
+
+    def _get_buffer(self, width: int, height: int) -> np.ndarray:
+        if self._buffer is None or self._buffer.shape[:2] != (height, width):
+            self._buffer = np.empty((height, width, 3), dtype=np.uint8)
+        return self._buffer
+
+    def grab(self, region: tuple, out: np.ndarray = None) -> np.ndarray | None:
+        """Grab a (x1, y1, x2, y2) screen region as an RGB uint8 array."""
+        x1, y1, x2, y2 = (int(v) for v in region)
+        width, height = x2 - x1, y2 - y1
+        if width <= 0 or height <= 0:
+            return None
+
+        if out is None or out.shape != (height, width, 3):
+            out = None
+        with self._lock:
+            target = out if out is not None else self._get_buffer(width, height)
+            try:
+                return self._grab_into((x1, y1, x2, y2), target)
+            except Exception as e:
+                print(f"Error capturing screen region with '{self.name}' backend: {e}")
+                return None
+
+    def _grab_into(self, region: tuple, out: np.ndarray) -> np.ndarray | None:
+        raise NotImplementedError
+
+    def close(self):
+        """Release any native resources held by the backend."""
+        pass
+
+
+class NativeCaptureBackend(CaptureBackend):
+    """Fast grabber built on `mss` (GDI BitBlt on Windows, XShm on Linux)."""
+    name = "native"
+
+    def __init__(self):
+        super().__init__()
+        if mss is None:
+            raise ImportError("The 'native' capture backend requires the 'mss' package.")
+        # mss handles are bound to the thread that created them.
+        self._local = threading.local()
+        self._handles = []
+
+    def _get_sct(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is None:
+            sct = self._local.sct = mss.mss()
+            self._handles.append(sct)
+        return sct
+
+    def _grab_into(self, region: tuple, out: np.ndarray) -> np.ndarray | None:
+        x1, y1, x2, y2 = region
+        shot = self._get_sct().grab({'left': x1, 'top': y1, 'width': x2 - x1, 'height': y2 - y1})
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        cv2.cvtColor(bgra, cv2.COLOR_BGRA2RGB, dst=out)
+        return out
+
+    def close(self):
+        for sct in self._handles:
+            try:
+                sct.close()
+            except Exception:
+                pass
+        self._handles = []
+        self._local = threading.local()
+
+
+class PILCaptureBackend(CaptureBackend):
+    """The original `ImageGrab.grab` path, copying into a reused buffer."""
+    name = "pil"
+
+    def _grab_into(self, region: tuple, out: np.ndarray) -> np.ndarray | None:
+        screenshot = ImageGrab.grab(bbox=region)
+        if screenshot is None:
+            return None
+        if screenshot.mode != 'RGB':
+            screenshot = screenshot.convert('RGB')
+        np.copyto(out, np.asarray(screenshot))
+        return out
+
+
+class ReplayCaptureBackend(CaptureBackend):
+    """
+    Serves recorded frames instead of the live screen, for headless benchmarks.
+
+    `source` can be a directory of .png/.npy frames, a single .npy/.npz stack of
+    frames or a list of RGB arrays. `origin` is the screen position of the
+    top-left pixel of every frame. Regions outside the frame are zero-filled.
+    """
+    name = "replay"
+
+    def __init__(self, source, origin: tuple = (0, 0), loop: bool = True, advance_on_grab: bool = True):
+        super().__init__()
+        self.frames = self._load_frames(source)
+        if not self.frames:
+            raise ValueError(f"No replay frames found in {source!r}.")
+        self.origin = origin
+        self.loop = loop
+        self.advance_on_grab = advance_on_grab
+        self.index = 0
+
+    @staticmethod
+    def _load_frames(source) -> list:
+        if isinstance(source, (list, tuple)):
+            return [np.ascontiguousarray(frame[..., :3], dtype=np.uint8) for frame in source]
+
+        if os.path.isdir(source):
+            paths = sorted(glob.glob(os.path.join(source, '*.png')) + glob.glob(os.path.join(source, '*.npy')))
+            frames = []
+            for path in paths:
+                if path.endswith('.npy'):
+                    frames.append(np.load(path))
+                else:
+                    frames.append(np.asarray(Image.open(path).convert('RGB')))
+            return [np.ascontiguousarray(frame[..., :3], dtype=np.uint8) for frame in frames]
+
+        if source.endswith('.npz'):
+            with np.load(source) as data:
+                stack = data[data.files[0]]
+        elif source.endswith('.npy'):
+            stack = np.load(source)
+        else:
+            stack = np.asarray(Image.open(source).convert('RGB'))[np.newaxis]
+        if stack.ndim == 3:
+            stack = stack[np.newaxis]
+        return [np.ascontiguousarray(frame[..., :3], dtype=np.uint8) for frame in stack]
+
+    def advance(self):
+        """Move to the next recorded frame."""
+        if self.index + 1 < len(self.frames):
+            self.index += 1
+        elif self.loop:
+            self.index = 0
+
+    def _grab_into(self, region: tuple, out: np.ndarray) -> np.ndarray | None:
+        frame = self.frames[self.index]
+        if self.advance_on_grab:
+            self.advance()
+
+        x1, y1 = region[0] - self.origin[0], region[1] - self.origin[1]
+        x2, y2 = region[2] - self.origin[0], region[3] - self.origin[1]
+        frame_h, frame_w = frame.shape[:2]
+        src_x1, src_y1 = max(x1, 0), max(y1, 0)
+        src_x2, src_y2 = min(x2, frame_w), min(y2, frame_h)
+
+        if src_x1 >= src_x2 or src_y1 >= src_y2:
+            out.fill(0)
+            return out
+        if (src_x1, src_y1, src_x2, src_y2) != (x1, y1, x2, y2):
+            out.fill(0)
+        out[src_y1 - y1:src_y2 - y1, src_x1 - x1:src_x2 - x1] = frame[src_y1:src_y2, src_x1:src_x2]
+        return out
+
+
+# --- Backend Registry --- #
+
+BACKENDS = {
+    NativeCaptureBackend.name: NativeCaptureBackend,
+    PILCaptureBackend.name: PILCaptureBackend,
+    ReplayCaptureBackend.name: ReplayCaptureBackend,
+}
+
+_default_backend_name = None
+_default_backend_kwargs = {}
+_selection_lock = threading.Lock()
+
+
+def benchmark_backend(backend: CaptureBackend, region: tuple = (0, 0, 640, 480), iterations: int = 10) -> float:
+    """Returns the mean seconds per grab of `region`, or infinity if it fails."""
+    if backend.grab(region) is None:  # Warm-up, also allocates the buffer
+        return float('inf')
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if backend.grab(region) is None:
+            return float('inf')
+    return (time.perf_counter() - start) / iterations
+
+
+def select_fastest_backend(region: tuple = (0, 0, 640, 480), candidates: list = None, iterations: int = 10) -> str | None:
+    """Benchmarks the live-screen backends and returns the name of the fastest one."""
+    candidates = candidates or [NativeCaptureBackend.name, PILCaptureBackend.name]
+    timings = {}
+    for name in candidates:
+        try:
+            backend = BACKENDS[name]()
+        except Exception:
+            continue
+        try:
+            timings[name] = benchmark_backend(backend, region, iterations)
+        finally:
+            backend.close()
+
+    timings = {name: t for name, t in timings.items() if t != float('inf')}
+    if not timings:
+        return None
+    return min(timings, key=timings.get)
+
+
+def set_default_backend(name: str, **kwargs):
+    """Overrides the process-wide default backend, e.g. ('replay', source=path)."""
+    global _default_backend_name, _default_backend_kwargs
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown capture backend: {name}")
+    with _selection_lock:
+        _default_backend_name = name
+        _default_backend_kwargs = kwargs
+
+
+def get_default_backend_name() -> str:
+    """Resolves the default backend once per process (env override, then benchmark)."""
+    global _default_backend_name, _default_backend_kwargs
+    with _selection_lock:
+        if _default_backend_name is None:
+            forced = os.environ.get(CAPTURE_BACKEND_ENV)
+            if forced:
+                name, _, source = forced.partition(':')
+                _default_backend_name = name
+                _default_backend_kwargs = {'source': source} if source else {}
+            else:
+                _default_backend_name = select_fastest_backend() or PILCaptureBackend.name
+        return _default_backend_name
+
+
+def create_backend(name: str = None, **kwargs) -> CaptureBackend:
+    """Creates a new backend instance. Defaults to the fastest available one."""
+    if name is None:
+        name = get_default_backend_name()
+        kwargs = {**_default_backend_kwargs, **kwargs}
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown capture backend: {name}")
+    return BACKENDS[name](**kwargs)
@@ -0,0 +1,168 @@
+"""
+This module provides an opt-in background capture thread with latest-frame
+semantics. Only the newest frame is published; older frames are dropped,
+never queued, so consumers always work on the freshest screenshot.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+try:
+    import win32api
+except ImportError:
+    win32api = None
+
+from .capture import CaptureBackend, create_backend
+
+if TYPE_CHECKING:
+    from ..client_window import RuneLiteClientWindow
+
+
+@dataclass
+class Frame:
+    """A captured frame of the client area together with its capture metadata."""
+    image: np.ndarray
+    index: int
+    timestamp: float  # time.perf_counter() at capture
+    rect: tuple  # (x1, y1, x2, y2) screen region covered by image
+    cursor: tuple | None  # (x, y) screen position of the cursor at capture
+
+    def age_ms(self) -> float:
+        """Milliseconds since this frame was captured."""
+        return (time.perf_counter() - self.timestamp) * 1000
+
+    def region(self, region: tuple) -> np.ndarray | None:
+        """Returns a view of a (x1, y1, x2, y2) screen region, or None if it is outside the frame."""
+        x1, y1 = int(region[0]) - self.rect[0], int(region[1]) - self.rect[1]
+        x2, y2 = int(region[2]) - self.rect[0], int(region[3]) - self.rect[1]
+        if x1 < 0 or y1 < 0 or x2 > self.image.shape[1] or y2 > self.image.shape[0]:
+            return None
+        return self.image[y1:y2, x1:x2]
+
+
+class CaptureThread:
+    """
+    Grabs the RuneLite client area at a target FPS on a daemon thread.
+
+    Frames rotate through a small pool of buffers, so a frame stays intact
+    for `buffers - 1` further captures. Consumers that hold on to a frame for
+    longer than that should copy its image.
+    """
+
+    def __init__(self, client_window: 'RuneLiteClientWindow' = None, capture_backend: CaptureBackend = None,
+                 fps: float = 30, region: tuple = None, buffers: int = 3):
+        """
+        client_window: the window whose client area is captured (found lazily if None)
+        capture_backend: grabber to use, defaults to the fastest available one
+        fps: target capture rate
+        region: fixed (x1, y1, x2, y2) screen region to capture instead of the client area
+        buffers: number of frame buffers to rotate through
+        """
+        self.client = client_window
+        self.capture = capture_backend or create_backend()
+        self.fps = fps
+        self.fixed_region = region
+
+        self._buffers = [None] * max(2, buffers)
+        self._latest = None
+        self._index = 0
+        self._condition = threading.Condition()
+        self.running = False
+        self.thread = None
+
+    def _get_capture_rect(self) -> tuple | None:
+        if self.fixed_region is not None:
+            return tuple(int(v) for v in self.fixed_region)
+        if self.client is None:
+            from ..client_window import RuneLiteClientWindow
+            self.client = RuneLiteClientWindow()
+        client_rect = self.client.get_client_rect()
+        if not client_rect:
+            return None
+        return (client_rect['left'], client_rect['top'], client_rect['right'], client_rect['bottom'])
+
+    def _capture_once(self) -> Frame | None:
+        rect = self._get_capture_rect()
+        if rect is None:
+            return None
+        width, height = rect[2] - rect[0], rect[3] - rect[1]
+        if width <= 0 or height <= 0:
+            return None
+
+        slot = self._index % len(self._buffers)
+        buffer = self._buffers[slot]
+        if buffer is None or buffer.shape[:2] != (height, width):
+            buffer = self._buffers[slot] = np.empty((height, width, 3), dtype=np.uint8)
+
+        image = self.capture.grab(rect, out=buffer)
+        if image is None:
+            return None
+        if image is not buffer:
+            np.copyto(buffer, image)
+
+        cursor = None
+        if win32api is not None:
+            try:
+                cursor = win32api.GetCursorPos()
+            except Exception:
+                pass
+        return Frame(image=buffer, index=self._index, timestamp=time.perf_counter(), rect=rect, cursor=cursor)
+
+    def _capture_loop(self):
+        interval = 1.0 / self.fps
+        while self.running:
+            start = time.perf_counter()
+            frame = self._capture_once()
+            if frame is not None:
+                with self._condition:
+                    self._latest = frame
+                    self._index += 1
+                    self._condition.notify_all()
+
+            remaining = interval - (time.perf_counter() - start)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def start(self):
+        if self.running:
+            print("Capture thread is already running.")
+            return
+
+        self.running = True
+        self.thread = threading.Thread(target=self._capture_loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        with self._condition:
+            self._condition.notify_all()
+
+    def latest(self) -> Frame | None:
+        """Returns the newest frame without waiting, or None if nothing was captured yet."""
+        with self._condition:
+            return self._latest
+
+    def next_frame(self, after_index: int = None, timeout: float = None) -> Frame | None:
+        """
+        Blocks until a frame newer than `after_index` is published and returns it.
+        With `after_index` None, any frame captured after this call qualifies.
+        Returns None on timeout or when the thread is stopped.
+        """
+        with self._condition:
+            if after_index is None:
+                after_index = self._latest.index if self._latest else -1
+            self._condition.wait_for(
+                lambda: not self.running or (self._latest is not None and self._latest.index > after_index),
+                timeout=timeout,
+            )
+            if self._latest is None or self._latest.index <= after_index:
+                return None
+            return self._latest
@@ -0,0 +1,154 @@
+"""
+This module provides tile-hash change detection for captured frames.
+
+Frames are split into square tiles that are hashed cheaply (a subsampled,
+vectorized multiply-add hash). Detectors register the screen region they
+read; when none of its tiles changed since the detector last ran, its
+previous result is returned instead of reprocessing the region.
+"""
+
+import threading
+
+import numpy as np
+
+from .color_lut import packed_pixels
+
+_weights_cache = {}
+
+
+def _tile_weights(size: int) -> np.ndarray:
+    """Random odd 64-bit weights per position in a tile, fixed per process."""
+    weights = _weights_cache.get(size)
+    if weights is None:
+        rng = np.random.default_rng(size)
+        weights = rng.integers(0, np.iinfo(np.int64).max, (size, size), dtype=np.int64).astype(np.uint64) | np.uint64(1)
+        weights = _weights_cache[size] = weights
+    return weights
+
+
+def tile_hashes(image: np.ndarray, tile_size: int = 32, step: int = 2) -> np.ndarray:
+    """
+    Hashes an (H, W, 3) image in tile_size x tile_size tiles, reading every
+    `step`-th pixel. Returns a (rows, cols) uint64 array; edge tiles are
+    zero-padded. Any single sampled pixel change always changes its tile hash.
+    """
+    sampled = image[::step, ::step] if step > 1 else image
+    cells = max(1, tile_size // step)
+    height, width = sampled.shape[:2]
+    rows, cols = -(-height // cells), -(-width // cells)
+
+    packed = np.zeros((rows * cells, cols * cells), dtype=np.uint64)
+    if height and width:
+        packed[:height, :width] = packed_pixels(sampled)
+    mixed = packed.reshape(rows, cells, cols, cells) * _tile_weights(cells)[np.newaxis, :, np.newaxis, :]
+    return mixed.sum(axis=(1, 3), dtype=np.uint64)
+
+
+class ChangeDetector:
+    """
+    Tells registered detectors whether their region changed since they last ran.
+
+    Call `update` with every new frame, then `cached(name, compute)` per
+    detector. Only the tiles under a detector's region are hashed, so idle
+    detectors cost a few small hashes per frame.
+    """
+
+    def __init__(self, tile_size: int = 32, step: int = 2):
+        """
+        tile_size: tile edge in screen pixels
+        step: pixel stride inside tiles; 1 hashes every pixel (use it for small text)
+        """
+        self.tile_size = tile_size
+        self.step = step
+        self.regions = {}
+        self.image = None
+        self.rect = None
+
+        self._snapshots = {}  # name -> (frame rect, region, hashes)
+        self._results = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def register(self, name: str, region: tuple):
+        """Registers (or moves) the (x1, y1, x2, y2) screen region a detector reads."""
+        with self._lock:
+            self.regions[name] = tuple(int(v) for v in region)
+
+    def update(self, image: np.ndarray, rect: tuple):
+        """Sets the current frame; `rect` is its (x1, y1, x2, y2) screen position."""
+        with self._lock:
+            self.image = image
+            self.rect = tuple(int(v) for v in rect)
+
+    def _region_hashes(self, region: tuple) -> tuple | None:
+        """Returns (tile bounds, hashes) for the tiles under a screen region of the current frame."""
+        if self.image is None:
+            return None
+        height, width = self.image.shape[:2]
+        x1 = min(max(region[0] - self.rect[0], 0), width)
+        y1 = min(max(region[1] - self.rect[1], 0), height)
+        x2 = min(max(region[2] - self.rect[0], 0), width)
+        y2 = min(max(region[3] - self.rect[1], 0), height)
+        if x1 >= x2 or y1 >= y2:
+            return None
+
+        size = self.tile_size
+        bounds = (x1 // size, y1 // size, -(-x2 // size), -(-y2 // size))
+        block = self.image[bounds[1] * size:bounds[3] * size, bounds[0] * size:bounds[2] * size]
+        return bounds, tile_hashes(block, size, self.step)
+
+    def _changed(self, name: str, region: tuple) -> tuple:
+        current = self._region_hashes(region)
+        snapshot = self._snapshots.get(name)
+        if current is None or snapshot is None:
+            return True, current
+        rect, last_region, hashes = snapshot
+        if rect != self.rect or last_region != region or not np.array_equal(hashes, current[1]):
+            return True, current
+        return False, current
+
+    def changed(self, name: str, region: tuple = None) -> bool:
+        """Checks whether a detector's region changed since its last `cached` call."""
+        with self._lock:
+            region = tuple(int(v) for v in region) if region else self.regions.get(name)
+            if region is None:
+                return True
+            return self._changed(name, region)[0]
+
+    def cached(self, name: str, compute, region: tuple = None):
+        """
+        Returns the previous result of `name` when its region is unchanged,
+        otherwise runs `compute()` and remembers its result.
+        `region` overrides (and does not replace) the registered region.
+        """
+        with self._lock:
+            region = tuple(int(v) for v in region) if region else self.regions.get(name)
+            if region is None:
+                changed, current = True, None
+            else:
+                changed, current = self._changed(name, region)
+            if not changed and name in self._results:
+                self.hits += 1
+                return self._results[name]
+            frame_rect = self.rect
+
+        result = compute()
+        with self._lock:
+            self.misses += 1
+            self._results[name] = result
+            if current is not None:
+                self._snapshots[name] = (frame_rect, region, current[1])
+            else:
+                self._snapshots.pop(name, None)
+        return result
+
+    def reset(self, name: str = None):
+        """Forgets the previous result of one detector, or of all of them."""
+        with self._lock:
+            if name is None:
+                self._snapshots.clear()
+                self._results.clear()
+            else:
+                self._snapshots.pop(name, None)
+                self._results.pop(name, None)
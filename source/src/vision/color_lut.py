@@ -0,0 +1,207 @@
+"""
+This module compiles color tables into 3D RGB lookup tables.
+
+A lookup table maps every (quantized) RGB value straight to a label, so a
+whole region is classified with one numpy indexing operation instead of
+looping over samples x labels x colors x channels in Python.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import cv2
+
+from .color_space import build_space_lut, check_space, color_ranges, convert_color, normalize_tolerance
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'cache')
+
+
+def build_label_lut(boxes: list, bits: int = 8, dtype=np.uint8) -> np.ndarray:
+    """
+    Builds a (2**bits)^3 label table from (label, lower, upper) RGB boxes.
+
+    Bounds are inclusive 0-255 channel values. Where boxes overlap, the box
+    listed first wins. With fewer than 8 bits a bin is labeled when any of
+    its values falls inside a box, so boxes grow by up to one bin width.
+    """
+    size = 1 << bits
+    shift = 8 - bits
+    lut = np.zeros((size, size, size), dtype=dtype)
+    for label, lower, upper in reversed(boxes):
+        lo = [int(v) >> shift for v in lower]
+        hi = [(int(v) >> shift) + 1 for v in upper]
+        lut[lo[0]:hi[0], lo[1]:hi[1], lo[2]:hi[2]] = label
+    return lut
+
+
+def build_bitmask_lut(boxes: list, bits: int = 8, dtype=np.uint16) -> np.ndarray:
+    """
+    Like `build_label_lut`, but ORs `flag` into every bin of its box, so
+    overlapping (flag, lower, upper) boxes all stay visible in the result.
+    """
+    size = 1 << bits
+    shift = 8 - bits
+    lut = np.zeros((size, size, size), dtype=dtype)
+    for flag, lower, upper in boxes:
+        lo = [int(v) >> shift for v in lower]
+        hi = [(int(v) >> shift) + 1 for v in upper]
+        lut[lo[0]:hi[0], lo[1]:hi[1], lo[2]:hi[2]] |= flag
+    return lut
+
+
+def lut_indices(image: np.ndarray, bits: int = 8) -> np.ndarray:
+    """Flat lookup-table indices for every pixel of an (H, W, 3) uint8 image."""
+    shift = 8 - bits
+    channels = image.astype(np.uint32) >> shift if shift else image.astype(np.uint32)
+    return (channels[..., 0] << (2 * bits)) | (channels[..., 1] << bits) | channels[..., 2]
+
+
+def apply_lut(lut: np.ndarray, image: np.ndarray, bits: int = 8) -> np.ndarray:
+    """Maps every pixel of an (H, W, 3) image (or (N, 3) colors) through a lookup table."""
+    return np.take(lut.reshape(-1), lut_indices(image, bits))
+
+
+def pack_lut(lut: np.ndarray) -> np.ndarray:
+    """Reorders an 8-bit table so it can be indexed by `packed_pixels` (B, G, R major order)."""
+    return np.ascontiguousarray(lut.transpose(2, 1, 0)).reshape(-1)
+
+
+def packed_pixels(image: np.ndarray) -> np.ndarray:
+    """
+    Packs every pixel of an (H, W, 3) uint8 image into one 24-bit index.
+    Padding to RGBA lets each pixel be read as a single little-endian uint32,
+    which is much cheaper than combining three widened channel planes.
+    """
+    rgba = cv2.cvtColor(np.ascontiguousarray(image), cv2.COLOR_RGB2RGBA)
+    return rgba.view(np.uint32)[..., 0] & 0xFFFFFF
+
+
+def lookup(image: np.ndarray, lut: np.ndarray, bits: int = 8, packed_lut: np.ndarray = None) -> np.ndarray:
+    """Maps an image through `lut`, using the faster packed-pixel path when a `pack_lut` table is given."""
+    if packed_lut is not None and image.ndim == 3 and image.size:
+        return np.take(packed_lut, packed_pixels(image))
+    return apply_lut(lut, image, bits)
+
+
+def label_counts(labels: np.ndarray, bins: int) -> np.ndarray:
+    """Histogram of a uint8 label array; much faster than np.bincount, which widens to int64 first."""
+    if labels.size == 0:
+        return np.zeros(bins, dtype=np.int64)
+    labels = labels.reshape(labels.shape[0], -1) if labels.ndim > 1 else labels.reshape(-1, 1)
+    hist = cv2.calcHist([np.ascontiguousarray(labels)], [0], None, [bins], [0, bins])
+    return hist.ravel().astype(np.int64)
+
+
+class PhasePalette:
+    """
+    Maps pixels to phase labels with a precompiled lookup table.
+
+    Label 0 means "no phase"; label i maps to `self.phases[i - 1]`. A pixel
+    matches a phase when every channel is within `tolerance` of one of its
+    colors, and phases listed first win, just like the original per-pixel loop.
+
+    With an 'hsv' or 'lab' color space, the phase colors are converted once
+    and the tolerance applies in that space; the table still maps RGB pixels,
+    so frames never need converting.
+    """
+
+    def __init__(self, phase_colors: dict, tolerance=20, bits: int = 8, cache_dir: str = DEFAULT_CACHE_DIR,
+                 color_space: str = 'rgb'):
+        """
+        phase_colors: {phase: [(r, g, b), ...]} in priority order
+        tolerance: maximum per-channel difference for a match, an int or a 3-tuple (None = space default)
+        bits: bits per channel in the table (8 = exact, 16 MB; 6 = 256 KB)
+        cache_dir: directory to store compiled tables in, or None to disable caching
+        color_space: 'rgb', 'hsv' or 'lab'
+        """
+        check_space(color_space)
+        self.phases = list(phase_colors)
+        self.phase_colors = {phase: [tuple(int(c) for c in color[:3]) for color in colors] for phase, colors in phase_colors.items()}
+        self.color_space = color_space
+        self.space_colors = {phase: [convert_color(color, color_space) for color in colors] for phase, colors in self.phase_colors.items()}
+        self.tolerance = normalize_tolerance(tolerance, color_space)
+        self.bits = bits
+        self.cache_dir = cache_dir
+        self.lut = self._load_or_build()
+        self._packed_lut = pack_lut(self.lut) if bits == 8 else None
+
+    @classmethod
+    def from_phase_data(cls, phase_data: dict, tolerance: int = 20, **kwargs) -> 'PhasePalette':
+        """Builds a palette from RotationManager's 'types' table, keyed by combat style."""
+        return cls({info['style']: info['colors'] for info in phase_data.values()}, tolerance, **kwargs)
+
+    def _boxes(self) -> list:
+        boxes = []
+        for label, phase in enumerate(self.phases, start=1):
+            for color in self.phase_colors[phase]:
+                lower = [max(c - t, 0) for c, t in zip(color, self.tolerance)]
+                upper = [min(c + t, 255) for c, t in zip(color, self.tolerance)]
+                boxes.append((label, lower, upper))
+        return boxes
+
+    def _cache_key(self) -> str:
+        spec = json.dumps([self.phases, [self.phase_colors[p] for p in self.phases], self.tolerance, self.bits, self.color_space])
+        return hashlib.sha1(spec.encode('utf-8')).hexdigest()[:16]
+
+    def _load_or_build(self) -> np.ndarray:
+        cache_path = None
+        if self.cache_dir:
+            cache_path = os.path.join(self.cache_dir, f"palette-{self._cache_key()}.npy")
+            if os.path.exists(cache_path):
+                try:
+                    return np.load(cache_path)
+                except Exception as e:
+                    print(f"Ignoring unreadable palette cache {cache_path}: {e}")
+
+        if self.color_space == 'rgb':
+            lut = build_label_lut(self._boxes(), self.bits)
+        else:
+            entries = []
+            for label, phase in enumerate(self.phases, start=1):
+                ranges = []
+                for color in self.space_colors[phase]:
+                    ranges += color_ranges(color, self.color_space, self.tolerance, convert_input=False)
+                entries.append((label, ranges))
+            lut = build_space_lut(entries, self.color_space, self.bits)
+        if cache_path:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                np.save(cache_path, lut)
+            except OSError as e:
+                print(f"Could not write palette cache {cache_path}: {e}")
+        return lut
+
+    def classify(self, image: np.ndarray) -> np.ndarray:
+        """Returns a uint8 label image (0 = no phase) for an (H, W, 3) RGB image."""
+        return lookup(image, self.lut, self.bits, self._packed_lut)
+
+    def classify_color(self, color: tuple) -> str | None:
+        """Returns the phase of a single (r, g, b) color, or None."""
+        label = int(apply_lut(self.lut, np.asarray(color[:3], dtype=np.uint8), self.bits))
+        return self.phases[label - 1] if label else None
+
+    @property
+    def packed_lut(self) -> np.ndarray | None:
+        """The table in `packed_pixels` order (8-bit tables only)."""
+        return self._packed_lut
+
+    def label_of(self, phase: str) -> int:
+        return self.phases.index(phase) + 1
+
+
+_palettes = {}
+_palettes_lock = threading.Lock()
+
+
+def get_phase_palette(phase_colors: dict, tolerance=20, bits: int = 8, color_space: str = 'rgb') -> PhasePalette:
+    """Returns a process-wide shared palette for the given color table, compiling it once."""
+    tolerance = normalize_tolerance(tolerance, color_space)
+    key = (tuple((phase, tuple(tuple(c[:3]) for c in colors)) for phase, colors in phase_colors.items()), tolerance, bits, color_space)
+    with _palettes_lock:
+        palette = _palettes.get(key)
+        if palette is None:
+            palette = _palettes[key] = PhasePalette(phase_colors, tolerance, bits, color_space=color_space)
+        return palette
@@ -0,0 +1,170 @@
+"""
+This module evaluates many color queries against a frame in a single pass.
+
+A ColorQuerySet compiles N named color ranges into one lookup table. Each
+frame is mapped through that table once; the resulting label image then
+answers counts, masks and blobs for every query without rescanning pixels.
+"""
+
+import numpy as np
+import cv2
+
+from .color_lut import build_label_lut, build_bitmask_lut, pack_lut, lookup, label_counts
+from .color_space import build_space_lut, check_space, color_ranges
+from .color_search import mask_blobs, rank_blobs, spectrum_bounds
+from .integral import IntegralImage
+
+
+def _as_ranges(spec) -> list:
+    """Accepts one spectrum range or a list of them."""
+    if len(spec) == 6 and all(isinstance(v, (int, float, np.number)) for v in spec):
+        return [list(spec)]
+    return [list(r) for r in spec]
+
+
+class ColorQuerySet:
+    """
+    A compiled set of named color queries.
+
+    mode 'label': every pixel gets the index of the first query it matches
+    (0 = none), so queries should not overlap.
+    mode 'bits': every query owns one bit and a pixel carries the bits of all
+    the queries it matches (up to 32 queries).
+
+    With color_space 'hsv' or 'lab' the ranges are in that space; they are
+    still compiled into an RGB table, so frames are never converted.
+    """
+
+    def __init__(self, queries: dict = None, mode: str = 'label', bits: int = 8, color_space: str = 'rgb'):
+        """
+        queries: {name: spectrum_range or [spectrum_range, ...]} in priority order
+        mode: 'label' or 'bits'
+        bits: bits per channel of the lookup table (8 = exact)
+        color_space: space the ranges are given in ('rgb', 'hsv' or 'lab')
+        """
+        if mode not in ('label', 'bits'):
+            raise ValueError(f"Unknown color query mode: {mode}")
+        check_space(color_space)
+        self.mode = mode
+        self.bits = bits
+        self.color_space = color_space
+        self.queries = {}
+        self.lut = None
+        self._packed_lut = None
+        for name, spec in (queries or {}).items():
+            self.queries[name] = _as_ranges(spec)
+        self.compile()
+
+    @property
+    def names(self) -> list:
+        return list(self.queries)
+
+    def _dtype(self):
+        count = len(self.queries)
+        if self.mode == 'label':
+            return np.uint8 if count < 256 else np.uint16
+        if count <= 8:
+            return np.uint8
+        if count <= 16:
+            return np.uint16
+        if count <= 32:
+            return np.uint32
+        raise ValueError("A 'bits' query set supports at most 32 queries.")
+
+    def compile(self):
+        """Rebuilds the lookup table. Called automatically by `add` and `remove`."""
+        if self.color_space != 'rgb':
+            entries = [(index + 1 if self.mode == 'label' else 1 << index, ranges)
+                       for index, ranges in enumerate(self.queries.values())]
+            self.lut = build_space_lut(entries, self.color_space, self.bits, self._dtype(), self.mode)
+            self._packed_lut = pack_lut(self.lut) if self.bits == 8 else None
+            return
+
+        boxes = []
+        for index, ranges in enumerate(self.queries.values()):
+            value = index + 1 if self.mode == 'label' else 1 << index
+            for spectrum_range in ranges:
+                lower, upper = spectrum_bounds(spectrum_range)
+                boxes.append((value, lower, upper))
+
+        if self.mode == 'label':
+            self.lut = build_label_lut(boxes, self.bits, self._dtype())
+        else:
+            self.lut = build_bitmask_lut(boxes, self.bits, self._dtype())
+        self._packed_lut = pack_lut(self.lut) if self.bits == 8 else None
+
+    def add(self, name: str, spectrum_range):
+        """Adds (or replaces) a query. The per-frame cost does not grow with the number of queries."""
+        self.queries[name] = _as_ranges(spectrum_range)
+        self.compile()
+
+    def add_color(self, name: str, color: tuple, tolerance=None):
+        """Adds a query around an RGB color, using the set's color space (tolerance None = its default)."""
+        self.add(name, color_ranges(color, self.color_space, tolerance))
+
+    def remove(self, name: str):
+        self.queries.pop(name, None)
+        self.compile()
+
+    def value_of(self, name: str) -> int:
+        """The label (mode 'label') or bit (mode 'bits') of a query."""
+        index = self.names.index(name)
+        return index + 1 if self.mode == 'label' else 1 << index
+
+    def evaluate(self, image: np.ndarray, origin: tuple = (0, 0)) -> 'QueryResult':
+        """Maps an (H, W, 3) RGB image through the table; `origin` is its screen position."""
+        return QueryResult(self, lookup(image, self.lut, self.bits, self._packed_lut), origin)
+
+
+class QueryResult:
+    """The label (or bitmask) image of one frame, with per-query accessors."""
+
+    def __init__(self, query_set: ColorQuerySet, labels: np.ndarray, origin: tuple = (0, 0)):
+        self.query_set = query_set
+        self.labels = labels
+        self.origin = (int(origin[0]), int(origin[1]))
+        self._counts = None
+        self._integrals = {}
+
+    def mask(self, name: str) -> np.ndarray:
+        """uint8 mask (255 = match) of one query."""
+        value = self.query_set.value_of(name)
+        if self.query_set.mode == 'label':
+            return cv2.compare(self.labels, value, cv2.CMP_EQ)
+        return ((self.labels & value) != 0).view(np.uint8) * np.uint8(255)
+
+    def counts(self) -> dict:
+        """{name: matched pixel count} for every query, computed once per result."""
+        if self._counts is None:
+            names = self.query_set.names
+            if self.query_set.mode == 'label':
+                if self.labels.dtype == np.uint8:
+                    hist = label_counts(self.labels, len(names) + 1)
+                else:
+                    hist = np.bincount(self.labels.reshape(-1), minlength=len(names) + 1)
+                self._counts = {name: int(hist[i + 1]) for i, name in enumerate(names)}
+            else:
+                self._counts = {name: int(np.count_nonzero(self.labels & (1 << i))) for i, name in enumerate(names)}
+        return self._counts
+
+    def count(self, name: str) -> int:
+        return self.counts()[name]
+
+    def fraction(self, name: str) -> float:
+        """Fraction (0-1) of the image matching a query."""
+        return self.count(name) / self.labels.size if self.labels.size else 0.0
+
+    def any(self, name: str) -> bool:
+        return self.count(name) > 0
+
+    def integral(self, name: str) -> IntegralImage:
+        """Summed-area table of one query in screen coordinates, built once per result."""
+        integral = self._integrals.get(name)
+        if integral is None:
+            integral = self._integrals[name] = IntegralImage(self.mask(name), self.origin)
+        return integral
+
+    def blobs(self, name: str, min_area: int = 1, near: tuple = None, connectivity: int = 8) -> list:
+        """Screen-space blobs of one query, ranked by area or by distance to the screen point `near`."""
+        blobs = [blob.offset(*self.origin) for blob in mask_blobs(self.mask(name), min_area, connectivity)]
+        return rank_blobs(blobs, near)
@@ -0,0 +1,149 @@
+"""
+This module provides a vectorized color search engine for RGB frames.
+
+All searches take a `spectrum_range` of [r_min, r_max, g_min, g_max, b_min, b_max]
+(or a list of such ranges, matched if any of them matches) and return
+coordinates local to the searched image; callers add the screen offset of
+the image themselves. The searches work on any 3-channel image, so HSV/Lab
+images can be searched with ranges in that space. An optional uint8 `mask`
+of the image's size limits every search to its non-zero pixels.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import cv2
+
+from .color_space import ranges_mask
+from . import kernels
+
+
+@dataclass
+class Blob:
+    """A connected group of matching pixels."""
+    x: float  # Centroid
+    y: float
+    area: int
+    left: int  # Bounding box
+    top: int
+    width: int
+    height: int
+
+    @property
+    def center(self) -> tuple:
+        return (int(round(self.x)), int(round(self.y)))
+
+    @property
+    def bbox(self) -> tuple:
+        """(x1, y1, x2, y2) bounding box, exclusive on the right/bottom."""
+        return (self.left, self.top, self.left + self.width, self.top + self.height)
+
+    def offset(self, dx: int, dy: int) -> 'Blob':
+        return Blob(self.x + dx, self.y + dy, self.area, self.left + dx, self.top + dy, self.width, self.height)
+
+
+def spectrum_bounds(spectrum_range: list) -> tuple:
+    """
+    Converts a spectrum range into the (lower, upper) arrays used by cv2.inRange.
+    Bounds are clipped to 0-255 first, so hand-built `color ± tolerance` ranges don't overflow uint8.
+    """
+    bounds = np.clip(np.asarray(spectrum_range, dtype=np.int64), 0, 255).astype(np.uint8)
+    return bounds[0::2], bounds[1::2]
+
+
+def color_to_spectrum(color: tuple, tolerance: int = 0) -> list:
+    """Builds a spectrum range around a single (r, g, b) color."""
+    spectrum = []
+    for channel in color[:3]:
+        spectrum += [max(int(channel) - tolerance, 0), min(int(channel) + tolerance, 255)]
+    return spectrum
+
+
+def is_range_list(spectrum_range) -> bool:
+    """True for a list of spectrum ranges rather than a single one."""
+    return len(spectrum_range) > 0 and isinstance(spectrum_range[0], (list, tuple, np.ndarray))
+
+
+def color_mask(image: np.ndarray, spectrum_range: list, mask: np.ndarray = None) -> np.ndarray:
+    """Returns a uint8 mask (255 = match) of the pixels inside the spectrum range(s)."""
+    if is_range_list(spectrum_range):
+        matches = ranges_mask(image, spectrum_range)
+    else:
+        lower, upper = spectrum_bounds(spectrum_range)
+        matches = cv2.inRange(image, lower, upper)
+    if mask is not None:
+        cv2.bitwise_and(matches, mask, dst=matches)
+    return matches
+
+
+def find_first(image: np.ndarray, spectrum_range: list, band_height: int = 16, mask: np.ndarray = None) -> tuple | None:
+    """
+    Returns the first (x, y) match in row-major order, or None.
+    The image is scanned in bands of rows and the scan stops at the first band with a match.
+    """
+    if is_range_list(spectrum_range):
+        match_band = lambda band: ranges_mask(band, spectrum_range)
+    else:
+        lower, upper = spectrum_bounds(spectrum_range)
+        match_band = lambda band: cv2.inRange(band, lower, upper)
+    height = image.shape[0]
+    for top in range(0, height, band_height):
+        band = match_band(image[top:top + band_height])
+        if mask is not None:
+            cv2.bitwise_and(band, mask[top:top + band_height], dst=band)
+        if cv2.countNonZero(band):
+            index = int(np.flatnonzero(band)[0])
+            y, x = divmod(index, band.shape[1])
+            return (x, top + y)
+    return None
+
+
+def find_all(image: np.ndarray, spectrum_range: list, mask: np.ndarray = None) -> np.ndarray:
+    """Returns an (N, 2) array of every (x, y) match."""
+    points = cv2.findNonZero(color_mask(image, spectrum_range, mask))
+    if points is None:
+        return np.empty((0, 2), dtype=np.int64)
+    return points.reshape(-1, 2).astype(np.int64)
+
+
+def mask_blobs(mask: np.ndarray, min_area: int = 1, connectivity: int = 8) -> list:
+    """Connected components of a uint8 mask as Blobs, largest first (then top-most, left-most)."""
+    stats, centroids = kernels.blob_stats(mask, connectivity)
+    blobs = []
+    for label in range(len(stats)):
+        area = int(stats[label, cv2.CC_STAT_AREA])
+        if area < min_area:
+            continue
+        blobs.append(Blob(
+            x=float(centroids[label, 0]),
+            y=float(centroids[label, 1]),
+            area=area,
+            left=int(stats[label, cv2.CC_STAT_LEFT]),
+            top=int(stats[label, cv2.CC_STAT_TOP]),
+            width=int(stats[label, cv2.CC_STAT_WIDTH]),
+            height=int(stats[label, cv2.CC_STAT_HEIGHT]),
+        ))
+    blobs.sort(key=lambda blob: (-blob.area, blob.top, blob.left, blob.y, blob.x))
+    return blobs
+
+
+def find_blobs(image: np.ndarray, spectrum_range: list, min_area: int = 1, connectivity: int = 8, mask: np.ndarray = None) -> list:
+    """Connected groups of matching pixels with centroid, area and bounding box, largest first."""
+    return mask_blobs(color_mask(image, spectrum_range, mask), min_area, connectivity)
+
+
+def find_nearest(image: np.ndarray, spectrum_range: list, point: tuple, mask: np.ndarray = None) -> tuple | None:
+    """Returns the match closest to the local (x, y) `point`, or None."""
+    matches = find_all(image, spectrum_range, mask)
+    if len(matches) == 0:
+        return None
+    distances = np.sum((matches - np.asarray(point[:2], dtype=np.int64)) ** 2, axis=1)
+    x, y = matches[int(np.argmin(distances))]
+    return (int(x), int(y))
+
+
+def rank_blobs(blobs: list, point: tuple = None) -> list:
+    """Orders blobs by distance of their centroid to `point`, or by area when no point is given."""
+    if point is None:
+        return sorted(blobs, key=lambda blob: blob.area, reverse=True)
+    return sorted(blobs, key=lambda blob: (blob.x - point[0]) ** 2 + (blob.y - point[1]) ** 2)
@@ -0,0 +1,128 @@
+"""
+This module provides HSV and Lab color matching.
+
+Ranges use the OpenCV 8-bit encodings: HSV has H in 0-179 (circular),
+S and V in 0-255; Lab has L, a and b in 0-255 (a and b centered on 128).
+Matching by hue/chroma with a wide brightness tolerance is much less
+sensitive to RuneLite brightness and GPU shading than an RGB box.
+"""
+
+import numpy as np
+import cv2
+
+SPACES = {
+    'rgb': None,
+    'hsv': cv2.COLOR_RGB2HSV,
+    'lab': cv2.COLOR_RGB2LAB,
+}
+
+HUE_RANGE = 180
+
+# Per-channel tolerances used when none is given: tight on hue/chroma, loose on brightness.
+DEFAULT_TOLERANCES = {
+    'rgb': (20, 20, 20),
+    'hsv': (6, 70, 90),
+    'lab': (60, 12, 12),
+}
+
+
+def check_space(space: str):
+    if space not in SPACES:
+        raise ValueError(f"Unknown color space: {space}")
+
+
+def convert(image: np.ndarray, space: str, dst: np.ndarray = None) -> np.ndarray:
+    """Converts an RGB uint8 image (or (N, 3) colors) to `space`. 'rgb' returns the input."""
+    check_space(space)
+    if SPACES[space] is None:
+        return image
+    if image.ndim == 2:
+        return cv2.cvtColor(np.ascontiguousarray(image[:, np.newaxis, :3]), SPACES[space])[:, 0]
+    if dst is not None and dst.shape == image.shape:
+        return cv2.cvtColor(image, SPACES[space], dst=dst)
+    return cv2.cvtColor(image, SPACES[space])
+
+
+def convert_color(color: tuple, space: str) -> tuple:
+    """Converts one (r, g, b) color to `space`."""
+    converted = convert(np.array([color[:3]], dtype=np.uint8), space)[0]
+    return tuple(int(c) for c in converted)
+
+
+def normalize_tolerance(tolerance, space: str) -> tuple:
+    """None -> the space's default, int -> the same for every channel, else a 3-tuple."""
+    if tolerance is None:
+        return DEFAULT_TOLERANCES[space]
+    if isinstance(tolerance, (int, float, np.number)):
+        return (int(tolerance),) * 3
+    return tuple(int(t) for t in tolerance)
+
+
+def color_ranges(color: tuple, space: str = 'rgb', tolerance=None, convert_input: bool = True) -> list:
+    """
+    Spectrum ranges [c0_min, c0_max, c1_min, c1_max, c2_min, c2_max] in
+    `space` around an RGB `color`. A hue range that wraps around is split in
+    two, so this always returns a list of ranges.
+    """
+    check_space(space)
+    tolerance = normalize_tolerance(tolerance, space)
+    center = convert_color(color, space) if convert_input else tuple(int(c) for c in color[:3])
+
+    bounds = []
+    for value, tol in zip(center, tolerance):
+        bounds.append((max(value - tol, 0), min(value + tol, 255)))
+
+    if space != 'hsv':
+        return [[v for bound in bounds for v in bound]]
+
+    hue, tol = center[0], tolerance[0]
+    if tol * 2 + 1 >= HUE_RANGE:
+        hue_bounds = [(0, HUE_RANGE - 1)]
+    elif hue - tol < 0:
+        hue_bounds = [(0, hue + tol), (HUE_RANGE + hue - tol, HUE_RANGE - 1)]
+    elif hue + tol >= HUE_RANGE:
+        hue_bounds = [(hue - tol, HUE_RANGE - 1), (0, hue + tol - HUE_RANGE)]
+    else:
+        hue_bounds = [(hue - tol, hue + tol)]
+    return [[h_min, h_max, *bounds[1], *bounds[2]] for h_min, h_max in hue_bounds]
+
+
+def ranges_mask(image: np.ndarray, ranges: list) -> np.ndarray:
+    """uint8 mask (255 = match) of the pixels inside any of the ranges."""
+    mask = None
+    for spectrum_range in ranges:
+        lower = np.array(spectrum_range[0::2], dtype=np.uint8)
+        upper = np.array(spectrum_range[1::2], dtype=np.uint8)
+        part = cv2.inRange(image, lower, upper)
+        mask = part if mask is None else cv2.bitwise_or(mask, part, dst=mask)
+    return mask
+
+
+def rgb_cube(bits: int = 8) -> np.ndarray:
+    """Every quantized RGB value (bin start) as an (N, 1, 3) image in lookup-table order."""
+    size = 1 << bits
+    values = (np.arange(size, dtype=np.uint16) << (8 - bits)).astype(np.uint8)
+    cube = np.empty((size, size, size, 3), dtype=np.uint8)
+    cube[..., 0] = values[:, np.newaxis, np.newaxis]
+    cube[..., 1] = values[np.newaxis, :, np.newaxis]
+    cube[..., 2] = values[np.newaxis, np.newaxis, :]
+    return cube.reshape(-1, 1, 3)
+
+
+def build_space_lut(entries: list, space: str, bits: int = 8, dtype=np.uint8, combine: str = 'label') -> np.ndarray:
+    """
+    Compiles (value, ranges) entries whose ranges are in `space` into an RGB
+    lookup table, so matching a frame needs no per-frame conversion.
+    combine 'label': the first matching entry's value wins; 'bits': values are ORed.
+    """
+    size = 1 << bits
+    converted = convert(rgb_cube(bits), space)
+    lut = np.zeros(size ** 3, dtype=dtype)
+    ordered = entries if combine == 'bits' else list(reversed(entries))
+    for value, ranges in ordered:
+        matches = ranges_mask(converted, ranges).reshape(-1) != 0
+        if combine == 'bits':
+            lut[matches] |= value
+        else:
+            lut[matches] = value
+    return lut.reshape(size, size, size)
@@ -0,0 +1,321 @@
+"""
+This module provides a shared-memory frame bus and a process-pool detector stage.
+
+A producer process writes client frames into a ring buffer that lives in
+`multiprocessing.shared_memory`. Any number of processes can attach to the
+bus by name and read frames in place, without copying pixels between them.
+Detector workers in a process pool pick up the latest frame by index and
+return compact results (phase, confidence, coordinates, ...).
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, Future
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .capture import create_backend
+from .phase_detection import detect_phase
+
+DEFAULT_BUS_NAME = "autopython-frames"
+
+# Header layout (int64): write count, max width, max height, slot count.
+_HEADER_FIELDS = 4
+# Per-slot layout (int64): sequence number, timestamp (ns), x1, y1, x2, y2.
+_SLOT_FIELDS = 6
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Attaches to an existing block without letting this process unlink it on exit."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        # Child processes share the creator's resource tracker, which unlinks
+        # the block once; only unrelated scripts must opt out of tracking.
+        if os.name == 'posix' and multiprocessing.parent_process() is None:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+class FrameBus:
+    """
+    A ring buffer of RGB frames in shared memory.
+
+    Frames may be smaller than the bus dimensions (e.g. after a window resize);
+    each slot records the screen rect it was captured from. Frames can never
+    be larger: size the bus for the biggest client it has to hold (see
+    for_client); the producer crops larger captures to the bus size.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        self.name = shm.name
+
+        header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        self.width, self.height, self.slots = int(header[1]), int(header[2]), int(header[3])
+        meta_size = _HEADER_FIELDS + self.slots * _SLOT_FIELDS
+        self._meta = np.ndarray((meta_size,), dtype=np.int64, buffer=shm.buf)
+        self._slot_meta = self._meta[_HEADER_FIELDS:].reshape(self.slots, _SLOT_FIELDS)
+        self._frame_size = self.width * self.height * 3
+        self._pixels = np.ndarray((self.slots, self._frame_size), dtype=np.uint8, buffer=shm.buf, offset=meta_size * 8)
+
+    @classmethod
+    def create(cls, width: int, height: int, slots: int = 4, name: str = DEFAULT_BUS_NAME) -> 'FrameBus':
+        """Creates a new bus able to hold `slots` frames of up to width x height pixels."""
+        meta_size = (_HEADER_FIELDS + slots * _SLOT_FIELDS) * 8
+        shm = shared_memory.SharedMemory(name=name, create=True, size=meta_size + slots * width * height * 3)
+        header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = (0, width, height, slots)
+        bus = cls(shm, owner=True)
+        bus._slot_meta[:, 0] = -1
+        return bus
+
+    @classmethod
+    def for_client(cls, client_window=None, region: tuple = None, slots: int = 4, name: str = DEFAULT_BUS_NAME,
+                   margin: int = 0) -> 'FrameBus':
+        """
+        Creates a bus sized for a fixed region, or for the client area as it is now.
+        margin: extra pixels in both directions, so the window can grow a little without frames being cropped
+        """
+        if region is None:
+            if client_window is None:
+                from ..client_window import RuneLiteClientWindow
+                client_window = RuneLiteClientWindow()
+            client_rect = client_window.get_client_rect()
+            if not client_rect:
+                raise RuntimeError("Client window not found; cannot size the frame bus.")
+            region = (client_rect['left'], client_rect['top'], client_rect['right'], client_rect['bottom'])
+        return cls.create(region[2] - region[0] + margin, region[3] - region[1] + margin, slots, name)
+
+    @classmethod
+    def attach(cls, name: str = DEFAULT_BUS_NAME) -> 'FrameBus':
+        """Attaches to a bus created by another process."""
+        return cls(_attach_shared_memory(name), owner=False)
+
+    # --- Writing --- #
+
+    def _slot_view(self, slot: int, width: int, height: int) -> np.ndarray:
+        return self._pixels[slot, :width * height * 3].reshape(height, width, 3)
+
+    def fit(self, rect: tuple) -> tuple:
+        """`rect` cropped to the bus size, keeping its top-left corner."""
+        return (rect[0], rect[1], min(rect[2], rect[0] + self.width), min(rect[3], rect[1] + self.height))
+
+    def begin_write(self, rect: tuple) -> tuple:
+        """Reserves the next slot for a frame of `rect` and returns (index, writable array)."""
+        width, height = rect[2] - rect[0], rect[3] - rect[1]
+        if width > self.width or height > self.height:
+            raise ValueError(f"Frame {width}x{height} does not fit the {self.width}x{self.height} bus.")
+        index = int(self._meta[0])
+        slot = index % self.slots
+        self._slot_meta[slot, 0] = -1  # Mark as being written
+        self._slot_meta[slot, 2:] = rect
+        return index, self._slot_view(slot, width, height)
+
+    def end_write(self, index: int):
+        """Publishes a frame reserved with `begin_write`."""
+        slot = index % self.slots
+        self._slot_meta[slot, 1] = time.time_ns()
+        self._slot_meta[slot, 0] = index
+        self._meta[0] = index + 1
+
+    def write(self, frame: np.ndarray, rect: tuple) -> int:
+        """Copies a frame onto the bus and returns its index."""
+        index, view = self.begin_write(rect)
+        np.copyto(view, frame)
+        self.end_write(index)
+        return index
+
+    # --- Reading --- #
+
+    def latest_index(self) -> int:
+        """Index of the newest published frame, or -1 if none was written yet."""
+        return int(self._meta[0]) - 1
+
+    def is_valid(self, index: int) -> bool:
+        """Checks that frame `index` is still in its slot (not overwritten or mid-write)."""
+        return index >= 0 and int(self._slot_meta[index % self.slots, 0]) == index
+
+    def read(self, index: int = None) -> tuple | None:
+        """
+        Returns (frame view, rect, timestamp) for frame `index` (default: latest).
+        The view points into shared memory; check `is_valid(index)` after using
+        it to make sure the producer did not overwrite it in the meantime.
+        """
+        if index is None:
+            index = self.latest_index()
+        if not self.is_valid(index):
+            return None
+        slot = index % self.slots
+        x1, y1, x2, y2 = (int(v) for v in self._slot_meta[slot, 2:])
+        timestamp = int(self._slot_meta[slot, 1]) / 1e9
+        return self._slot_view(slot, x2 - x1, y2 - y1), (x1, y1, x2, y2), timestamp
+
+    def close(self):
+        """Detaches from the bus, and frees it if this process created it."""
+        self._meta = self._slot_meta = self._pixels = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# --- Producer --- #
+
+def _producer_loop(bus_name: str, region: tuple, fps: float, backend_name: str, backend_kwargs: dict, stop_event):
+    bus = FrameBus.attach(bus_name)
+    backend = create_backend(backend_name, **(backend_kwargs or {}))
+    client = None
+    if region is None:
+        from ..client_window import RuneLiteClientWindow
+        client = RuneLiteClientWindow()
+
+    interval = 1.0 / fps
+    cropped = False
+    try:
+        while not stop_event.is_set():
+            start = time.perf_counter()
+            rect = region
+            if client is not None:
+                client_rect = client.get_client_rect()
+                rect = (client_rect['left'], client_rect['top'], client_rect['right'], client_rect['bottom']) if client_rect else None
+
+            if rect is not None:
+                fitted = bus.fit(rect)
+                if fitted != tuple(rect) and not cropped:
+                    # Report once; the slot rects tell consumers which area the frames cover
+                    cropped = True
+                    print(f"Frame bus is {bus.width}x{bus.height}, capturing only the top-left of the "
+                          f"{rect[2] - rect[0]}x{rect[3] - rect[1]} client area. Create a larger bus.")
+                rect = fitted
+                index, view = bus.begin_write(rect)
+                if backend.grab(rect, out=view) is not None:
+                    bus.end_write(index)
+                view = None  # Views must be released before the bus can close
+
+            remaining = interval - (time.perf_counter() - start)
+            if remaining > 0:
+                time.sleep(remaining)
+    finally:
+        backend.close()
+        bus.close()
+
+
+class FrameProducer:
+    """Captures the client area (or a fixed region) into a FrameBus from a separate process."""
+
+    def __init__(self, bus_name: str = DEFAULT_BUS_NAME, region: tuple = None, fps: float = 30,
+                 backend_name: str = None, backend_kwargs: dict = None):
+        self.bus_name = bus_name
+        self.region = region
+        self.fps = fps
+        self.backend_name = backend_name
+        self.backend_kwargs = backend_kwargs
+        self.stop_event = multiprocessing.Event()
+        self.process = None
+
+    def start(self):
+        if self.process and self.process.is_alive():
+            print("Frame producer is already running.")
+            return
+        self.stop_event.clear()
+        self.process = multiprocessing.Process(
+            target=_producer_loop,
+            args=(self.bus_name, self.region, self.fps, self.backend_name, self.backend_kwargs, self.stop_event),
+            daemon=True,
+        )
+        self.process.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.process:
+            self.process.join(timeout=2)
+            self.process = None
+
+
+# --- Detector Stage --- #
+
+_worker_bus = None
+
+
+def _init_worker(bus_name: str):
+    global _worker_bus
+    _worker_bus = FrameBus.attach(bus_name)
+
+
+def _run_detector(detector, index: int, args: tuple, kwargs: dict) -> dict | None:
+    if index is None:
+        index = _worker_bus.latest_index()
+    frame = _worker_bus.read(index)
+    if frame is None:
+        return None
+    view, rect, timestamp = frame
+    result = detector(view, rect, *args, **kwargs)
+    if not _worker_bus.is_valid(index):
+        return None  # Overwritten while we were reading it
+    return {'frame_index': index, 'timestamp': timestamp, 'result': result}
+
+
+class DetectorPool:
+    """
+    Runs detector functions on bus frames in a pool of worker processes.
+
+    A detector is a module-level function `detector(frame, rect, *args)` that
+    returns a small, picklable result. Futures resolve to a dict with the
+    frame index, its capture timestamp and the result, or None if the frame
+    was overwritten before the detector finished.
+    """
+
+    def __init__(self, bus_name: str = DEFAULT_BUS_NAME, workers: int = None):
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(bus_name,))
+
+    def submit(self, detector, *args, index: int = None, **kwargs) -> Future:
+        """Schedules `detector` on frame `index` (default: the latest frame when it runs)."""
+        return self.executor.submit(_run_detector, detector, index, args, kwargs)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+# --- Built-in Detectors --- #
+
+def detect_phase_on_frame(frame: np.ndarray, rect: tuple, region: tuple, samples: int, tolerance: int,
+                          phase_colors: dict, exclude_region: tuple = None) -> tuple:
+    """Phase detection on the (x1, y1, x2, y2) screen `region` of a bus frame."""
+    x1, y1 = max(region[0] - rect[0], 0), max(region[1] - rect[1], 0)
+    x2, y2 = region[2] - rect[0], region[3] - rect[1]
+    crop = frame[y1:y2, x1:x2]
+    if crop.size == 0:
+        return None, 0.0
+    return detect_phase(crop, (rect[0] + x1, rect[1] + y1), samples, tolerance, phase_colors, exclude_region)
+
+
+if __name__ == '__main__':
+    from ..phase_tracker import RotationManager
+
+    print("--- Frame Bus Demo ---")
+    phase_data = RotationManager()._get_zulrah_rotations_data()['types']
+    phase_colors = {info['style']: info['colors'] for info in phase_data.values()}
+    game_view_region = (258, 174, 769, 509)
+
+    bus = FrameBus.for_client(margin=64)
+    producer = FrameProducer(bus.name, fps=30)
+    producer.start()
+    pool = DetectorPool(bus.name, workers=2)
+    try:
+        while True:
+            outcome = pool.submit(detect_phase_on_frame, game_view_region, 16, 20, phase_colors).result()
+            if outcome:
+                phase, confidence = outcome['result']
+                print(f"Frame {outcome['frame_index']}: {phase} ({confidence:.1f}%)")
+            time.sleep(0.2)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.shutdown()
+        producer.stop()
+        bus.close()
@@ -0,0 +1,143 @@
+"""
+This module provides a per-tick frame cache for the RuneLite client area.
+
+The client area is captured once per tick and every caller gets a numpy view
+of its own sub-region, so several detectors in one loop iteration share a
+single screenshot instead of each grabbing their own.
+"""
+
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .capture import CaptureBackend, create_backend
+from .color_space import convert as convert_color_space
+
+if TYPE_CHECKING:
+    from ..client_window import RuneLiteClientWindow
+
+
+class FrameCache:
+    """
+    Holds the latest capture of the client area and hands out region views.
+
+    Two buffers are alternated between ticks, so views handed out during one
+    tick stay valid while the next tick is being captured.
+    """
+
+    def __init__(self, client_window: 'RuneLiteClientWindow' = None, capture_backend: CaptureBackend = None,
+                 max_age_ms: float = 50, region: tuple = None):
+        """
+        client_window: the window whose client area is captured (found lazily if None)
+        capture_backend: grabber to use, defaults to the fastest available one
+        max_age_ms: default age after which a frame is considered stale
+        region: fixed (x1, y1, x2, y2) screen region to capture instead of the client area
+        """
+        self.client = client_window
+        self.capture = capture_backend or create_backend()
+        self.max_age_ms = max_age_ms
+        self.fixed_region = region
+
+        self.frame = None
+        self.rect = None  # (x1, y1, x2, y2) screen region covered by self.frame
+        self.timestamp = 0.0
+        self.frame_id = 0
+        self.capture_count = 0
+        self.conversion_count = 0
+
+        self._buffers = [None, None]
+        self._converted = {}  # (color space, buffer index) -> (frame_id, converted frame)
+        self._active = 0
+        self._lock = threading.RLock()
+
+    def _get_capture_rect(self) -> tuple | None:
+        if self.fixed_region is not None:
+            return tuple(int(v) for v in self.fixed_region)
+        if self.client is None:
+            from ..client_window import RuneLiteClientWindow
+            self.client = RuneLiteClientWindow()
+        client_rect = self.client.get_client_rect()
+        if not client_rect:
+            return None
+        return (client_rect['left'], client_rect['top'], client_rect['right'], client_rect['bottom'])
+
+    def tick(self) -> np.ndarray | None:
+        """Captures a new frame of the client area. Call once per loop iteration."""
+        with self._lock:
+            rect = self._get_capture_rect()
+            if rect is None:
+                return None
+            width, height = rect[2] - rect[0], rect[3] - rect[1]
+            if width <= 0 or height <= 0:
+                return None
+
+            index = 1 - self._active
+            buffer = self._buffers[index]
+            if buffer is None or buffer.shape[:2] != (height, width):
+                buffer = self._buffers[index] = np.empty((height, width, 3), dtype=np.uint8)
+
+            frame = self.capture.grab(rect, out=buffer)
+            if frame is None:
+                return None
+            if frame is not buffer:
+                np.copyto(buffer, frame)
+
+            self._active = index
+            self.frame = buffer
+            self.rect = rect
+            self.timestamp = time.perf_counter()
+            self.frame_id += 1
+            self.capture_count += 1
+            return self.frame
+
+    def age_ms(self) -> float:
+        """Milliseconds since the current frame was captured."""
+        if self.frame is None:
+            return float('inf')
+        return (time.perf_counter() - self.timestamp) * 1000
+
+    def get_frame(self, max_age_ms: float = None) -> np.ndarray | None:
+        """Returns the cached frame, capturing a new one only if it is older than `max_age_ms`."""
+        if max_age_ms is None:
+            max_age_ms = self.max_age_ms
+        with self._lock:
+            if self.frame is None or self.age_ms() > max_age_ms:
+                return self.tick()
+            return self.frame
+
+    def convert(self, color_space: str, max_age_ms: float = None) -> np.ndarray | None:
+        """Returns the cached frame in 'rgb', 'hsv' or 'lab', converting it at most once per frame."""
+        with self._lock:
+            frame = self.get_frame(max_age_ms)
+            if frame is None or color_space == 'rgb':
+                return frame
+            key = (color_space, self._active)
+            cached = self._converted.get(key)
+            if cached is not None and cached[0] == self.frame_id:
+                return cached[1]
+            converted = convert_color_space(frame, color_space, dst=cached[1] if cached is not None else None)
+            self._converted[key] = (self.frame_id, converted)
+            self.conversion_count += 1
+            return converted
+
+    def contains(self, region: tuple) -> bool:
+        """Checks whether a (x1, y1, x2, y2) screen region lies inside the cached frame."""
+        if self.rect is None:
+            return False
+        return (self.rect[0] <= region[0] and self.rect[1] <= region[1] and
+                region[2] <= self.rect[2] and region[3] <= self.rect[3])
+
+    def get_region(self, region: tuple, max_age_ms: float = None, color_space: str = 'rgb') -> np.ndarray | None:
+        """
+        Returns a view (no copy) of a (x1, y1, x2, y2) screen region of the cached frame,
+        in `color_space`. Returns None if the region is not inside the client area.
+        """
+        with self._lock:
+            frame = self.convert(color_space, max_age_ms)
+            if frame is None or not self.contains(region):
+                return None
+            x1, y1 = int(region[0]) - self.rect[0], int(region[1]) - self.rect[1]
+            x2, y2 = int(region[2]) - self.rect[0], int(region[3]) - self.rect[1]
+            return frame[y1:y2, x1:x2]
@@ -0,0 +1,98 @@
+"""
+This module provides summed-area tables for fast region pixel counts.
+
+An IntegralImage is built once per frame for a mask (or one class of a
+label image). Afterwards the number of matching pixels in any rectangle
+costs four lookups, so many region or sliding-window checks scale with the
+number of queries instead of the number of pixels.
+"""
+
+import numpy as np
+import cv2
+
+
+def _ceil_div(values, divisor: int):
+    return -(-values // divisor)
+
+
+class IntegralImage:
+    """
+    Summed-area table of a binary mask.
+
+    Rectangles are (x1, y1, x2, y2), exclusive on the right/bottom, in the
+    coordinate space of `origin` (screen coordinates when the mask was cut
+    from a screen region). `scale` is the stride the mask was sampled with.
+    """
+
+    def __init__(self, mask: np.ndarray, origin: tuple = (0, 0), scale: int = 1):
+        binary = mask if mask.dtype == np.bool_ else mask != 0
+        self.table = cv2.integral(binary.view(np.uint8))  # (H + 1, W + 1) int32
+        self.height, self.width = binary.shape[:2]
+        self.origin = (int(origin[0]), int(origin[1]))
+        self.scale = scale
+
+    @classmethod
+    def from_labels(cls, labels: np.ndarray, value: int, origin: tuple = (0, 0), scale: int = 1) -> 'IntegralImage':
+        """Builds the table for the pixels of a label image equal to `value`."""
+        return cls(labels == value, origin, scale)
+
+    def _local_rects(self, rects) -> np.ndarray:
+        """Converts (N, 4) rects to clipped (N, 4) table indices."""
+        rects = np.asarray(rects, dtype=np.int64).reshape(-1, 4)
+        local = np.empty_like(rects)
+        local[:, 0::2] = _ceil_div(rects[:, 0::2] - self.origin[0], self.scale)
+        local[:, 1::2] = _ceil_div(rects[:, 1::2] - self.origin[1], self.scale)
+        np.clip(local[:, 0::2], 0, self.width, out=local[:, 0::2])
+        np.clip(local[:, 1::2], 0, self.height, out=local[:, 1::2])
+        local[:, 2] = np.maximum(local[:, 2], local[:, 0])
+        local[:, 3] = np.maximum(local[:, 3], local[:, 1])
+        return local
+
+    def counts(self, rects) -> np.ndarray:
+        """Matching pixel counts for any number of rectangles at once."""
+        x1, y1, x2, y2 = self._local_rects(rects).T
+        table = self.table
+        return (table[y2, x2] - table[y1, x2] - table[y2, x1] + table[y1, x1]).astype(np.int64)
+
+    def areas(self, rects) -> np.ndarray:
+        """Number of (sampled) pixels of each rectangle that lie inside the mask."""
+        x1, y1, x2, y2 = self._local_rects(rects).T
+        return (x2 - x1) * (y2 - y1)
+
+    def fractions(self, rects) -> np.ndarray:
+        """Matching fraction (0-1) of each rectangle; 0 for rectangles outside the mask."""
+        counts = self.counts(rects)
+        areas = self.areas(rects)
+        return np.divide(counts, areas, out=np.zeros(len(counts), dtype=np.float64), where=areas > 0)
+
+    def count(self, rect: tuple) -> int:
+        return int(self.counts([rect])[0])
+
+    def fraction(self, rect: tuple) -> float:
+        return float(self.fractions([rect])[0])
+
+    def total(self) -> int:
+        return int(self.table[-1, -1])
+
+    def window_counts(self, width: int, height: int) -> np.ndarray:
+        """
+        Counts for every position of a width x height (mask pixels) window.
+        Entry [y, x] is the window whose top-left mask pixel is (x, y).
+        """
+        table = self.table
+        if width > self.width or height > self.height:
+            return np.zeros((0, 0), dtype=np.int64)
+        return (table[height:, width:] - table[:-height, width:] - table[height:, :-width] + table[:-height, :-width]).astype(np.int64)
+
+    def best_window(self, width: int, height: int) -> tuple | None:
+        """
+        Finds the window with the most matches. `width`/`height` are in the
+        coordinate space of the rects. Returns ((x1, y1, x2, y2), count) or None.
+        """
+        w, h = max(1, width // self.scale), max(1, height // self.scale)
+        windows = self.window_counts(w, h)
+        if windows.size == 0:
+            return None
+        y, x = (int(v) for v in np.unravel_index(int(np.argmax(windows)), windows.shape))
+        x1, y1 = self.origin[0] + x * self.scale, self.origin[1] + y * self.scale
+        return (x1, y1, x1 + w * self.scale, y1 + h * self.scale), int(windows[y, x])
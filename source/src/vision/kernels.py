@@ -0,0 +1,359 @@
+"""
+This module provides per-pixel kernels that are JIT-compiled when numba is
+installed, with numpy/OpenCV fallbacks otherwise.
+
+The kernels cover the loops that do not map cleanly onto broadcasting:
+tolerance matching against many palette colors (with an early exit per
+pixel), strided label counting that skips excluded pixels without building
+a label image, and run-length blob statistics. The first time the compiled
+kernels are needed they are checked against the fallbacks, and a mismatch
+disables them for the rest of the process.
+"""
+
+import os
+import threading
+
+import numpy as np
+import cv2
+
+from .color_lut import label_counts, packed_pixels
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Set this to "numpy" to never use the compiled kernels.
+KERNELS_ENV = "VISION_KERNELS"
+
+_jit = None
+_jit_lock = threading.Lock()
+
+
+# --- Loop Kernels (compiled with numba when available, plain Python otherwise) --- #
+
+def _palette_labels_loop(image, colors, labels, tolerance, out):
+    height, width = image.shape[0], image.shape[1]
+    for y in range(height):
+        for x in range(width):
+            r = np.int32(image[y, x, 0])
+            g = np.int32(image[y, x, 1])
+            b = np.int32(image[y, x, 2])
+            label = 0
+            for i in range(colors.shape[0]):
+                if (abs(r - colors[i, 0]) <= tolerance[0] and abs(g - colors[i, 1]) <= tolerance[1]
+                        and abs(b - colors[i, 2]) <= tolerance[2]):
+                    label = labels[i]
+                    break
+            out[y, x] = label
+    return out
+
+
+def _sample_counts_loop(image, packed_lut, stride, excluded, bins):
+    counts = np.zeros(bins, dtype=np.int64)
+    height, width = image.shape[0], image.shape[1]
+    for y in range(0, height, stride):
+        for x in range(0, width, stride):
+            index = np.int64(image[y, x, 0]) | (np.int64(image[y, x, 1]) << 8) | (np.int64(image[y, x, 2]) << 16)
+            counts[packed_lut[index]] += 1
+
+    strided_width = (width + stride - 1) // stride
+    for i in range(excluded.shape[0]):
+        y = (excluded[i] // strided_width) * stride
+        x = (excluded[i] % strided_width) * stride
+        index = np.int64(image[y, x, 0]) | (np.int64(image[y, x, 1]) << 8) | (np.int64(image[y, x, 2]) << 16)
+        counts[packed_lut[index]] -= 1
+    return counts
+
+
+def _find_root(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+if numba is not None:
+    _njit = numba.njit(cache=True, nogil=True)
+    # Compiled up front (lazily, on first call) so the blob loop can call it in both modes.
+    _find_root = _njit(_find_root)
+
+
+def _blob_stats_loop(mask, reach):
+    height, width = mask.shape[0], mask.shape[1]
+
+    # Pass 1: horizontal runs of set pixels, in raster order
+    count = 0
+    for y in range(height):
+        inside = False
+        for x in range(width):
+            if mask[y, x] != 0:
+                if not inside:
+                    count += 1
+                inside = True
+            else:
+                inside = False
+
+    run_y = np.empty(count, dtype=np.int64)
+    run_x0 = np.empty(count, dtype=np.int64)
+    run_x1 = np.empty(count, dtype=np.int64)  # Exclusive
+    row_start = np.zeros(height + 1, dtype=np.int64)
+    k = 0
+    for y in range(height):
+        row_start[y] = k
+        x = 0
+        while x < width:
+            if mask[y, x] != 0:
+                start = x
+                while x < width and mask[y, x] != 0:
+                    x += 1
+                run_y[k] = y
+                run_x0[k] = start
+                run_x1[k] = x
+                k += 1
+            else:
+                x += 1
+    row_start[height] = k
+
+    # Pass 2: join runs that touch a run of the row above (reach 1 = diagonals too)
+    parent = np.arange(count)
+    for y in range(1, height):
+        j = row_start[y - 1]
+        for i in range(row_start[y], row_start[y + 1]):
+            while j < row_start[y] and run_x1[j] + reach <= run_x0[i]:
+                j += 1
+            jj = j
+            while jj < row_start[y] and run_x0[jj] < run_x1[i] + reach:
+                a = _find_root(parent, i)
+                b = _find_root(parent, jj)
+                if a < b:
+                    parent[b] = a
+                elif b < a:
+                    parent[a] = b
+                jj += 1
+
+    # Pass 3: accumulate per component, numbered by its first run
+    component = np.full(count, -1, dtype=np.int64)
+    components = 0
+    for i in range(count):
+        root = _find_root(parent, i)
+        if component[root] < 0:
+            component[root] = components
+            components += 1
+        component[i] = component[root]
+
+    stats = np.zeros((components, 5), dtype=np.int32)  # left, top, width, height, area (OpenCV layout)
+    right = np.zeros(components, dtype=np.int64)
+    bottom = np.zeros(components, dtype=np.int64)
+    sums = np.zeros((components, 2), dtype=np.float64)
+    for c in range(components):
+        stats[c, 0] = width
+        stats[c, 1] = height
+    for i in range(count):
+        c = component[i]
+        length = run_x1[i] - run_x0[i]
+        stats[c, 0] = min(stats[c, 0], run_x0[i])
+        stats[c, 1] = min(stats[c, 1], run_y[i])
+        right[c] = max(right[c], run_x1[i])
+        bottom[c] = max(bottom[c], run_y[i] + 1)
+        stats[c, 4] += length
+        sums[c, 0] += (run_x0[i] + run_x1[i] - 1) * length / 2.0
+        sums[c, 1] += run_y[i] * length
+
+    centroids = np.zeros((components, 2), dtype=np.float64)
+    for c in range(components):
+        stats[c, 2] = right[c] - stats[c, 0]
+        stats[c, 3] = bottom[c] - stats[c, 1]
+        centroids[c, 0] = sums[c, 0] / stats[c, 4]
+        centroids[c, 1] = sums[c, 1] / stats[c, 4]
+    return stats, centroids
+
+
+_LOOPS = {
+    'palette_labels': _palette_labels_loop,
+    'sample_counts': _sample_counts_loop,
+    'blob_stats': _blob_stats_loop,
+}
+
+
+def _compile() -> dict | None:
+    try:
+        kernels = {name: _njit(loop) for name, loop in _LOOPS.items()}
+        if not _compare(kernels):
+            print("Compiled vision kernels disagree with the numpy versions, using numpy.")
+            return None
+        return kernels
+    except Exception as e:
+        print(f"Could not compile vision kernels, using numpy: {e}")
+        return None
+
+
+def _get_jit() -> dict | None:
+    """The compiled kernels, compiled and checked on first use, or None when unavailable."""
+    global _jit
+    if _jit is None:
+        with _jit_lock:
+            if _jit is None:
+                enabled = numba is not None and os.environ.get(KERNELS_ENV, '').lower() != 'numpy'
+                _jit = (enabled and _compile()) or {}
+    return _jit or None
+
+
+def jit_enabled() -> bool:
+    return _get_jit() is not None
+
+
+def warm_up():
+    """Compiles (or loads the cached) kernels now instead of on the first frame."""
+    _get_jit()
+
+
+# --- Numpy/OpenCV Fallbacks --- #
+
+def _palette_labels_numpy(image, colors, labels, tolerance, out):
+    wide = image[..., :3].astype(np.int16)
+    out[:] = 0
+    for color, label in zip(colors[::-1], labels[::-1]):  # The first color listed wins
+        matches = np.all(np.abs(wide - color.astype(np.int16)) <= tolerance.astype(np.int16), axis=2)
+        out[matches] = label
+    return out
+
+
+def _sample_counts_numpy(image, packed_lut, stride, excluded, bins):
+    if stride > 1:
+        image = image[::stride, ::stride]
+    labels = np.take(packed_lut, packed_pixels(image))
+    counts = label_counts(labels, bins)
+    if excluded.size:
+        counts = counts - label_counts(np.take(labels, excluded), bins)
+    return counts
+
+
+def _blob_stats_opencv(mask, reach):
+    _, _, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=8 if reach else 4)
+    return stats[1:, :5].astype(np.int32), centroids[1:].astype(np.float64)
+
+
+_FALLBACKS = {
+    'palette_labels': _palette_labels_numpy,
+    'sample_counts': _sample_counts_numpy,
+    'blob_stats': _blob_stats_opencv,
+}
+
+
+def _run(name: str, *args):
+    kernels = _get_jit()
+    return (kernels[name] if kernels else _FALLBACKS[name])(*args)
+
+
+# --- Public Kernels --- #
+
+def palette_labels(image: np.ndarray, colors, tolerance=20, labels=None) -> np.ndarray:
+    """
+    Labels every pixel of an (H, W, 3) RGB image with the first of `colors`
+    that every channel is within `tolerance` of (an int or a 3-tuple).
+    Label i + 1 means colors[i] unless `labels` gives the label per color; 0 = no match.
+    """
+    colors = np.asarray(colors, dtype=np.int32).reshape(-1, 3)
+    if labels is None:
+        labels = np.arange(1, len(colors) + 1)
+    labels = np.asarray(labels, dtype=np.uint8)
+    tolerance = np.broadcast_to(np.asarray(tolerance, dtype=np.int32), (3,)).copy()
+    out = np.empty(image.shape[:2], dtype=np.uint8)
+    return _run('palette_labels', np.ascontiguousarray(image[..., :3]), colors, labels, tolerance, out)
+
+
+def sample_label_counts(image: np.ndarray, packed_lut: np.ndarray, bins: int, stride: int = 1, excluded: np.ndarray = None) -> np.ndarray:
+    """
+    Histogram of the labels a `pack_lut` table gives every `stride`-th pixel,
+    minus the pixels at `excluded` (flat indices into the strided grid).
+    """
+    excluded = np.empty(0, dtype=np.intp) if excluded is None else np.asarray(excluded, dtype=np.intp)
+    if image.shape[0] == 0 or image.shape[1] == 0:
+        return np.zeros(bins, dtype=np.int64)
+    return _run('sample_counts', np.ascontiguousarray(image), packed_lut, int(stride), excluded, int(bins))
+
+
+def blob_stats(mask: np.ndarray, connectivity: int = 8) -> tuple:
+    """
+    Connected components of a mask from a run-length scan.
+    Returns (stats, centroids) like cv2.connectedComponentsWithStats without
+    the background row: stats columns are left, top, width, height, area.
+    Component order is unspecified, sort the result when it matters.
+    """
+    return _run('blob_stats', np.ascontiguousarray(mask, dtype=np.uint8), 1 if connectivity == 8 else 0)
+
+
+# --- Self-Check --- #
+
+def _sorted_blobs(stats, centroids) -> tuple:
+    order = np.lexsort((centroids[:, 0], centroids[:, 1], stats[:, 1], stats[:, 0], stats[:, 4]))
+    return stats[order], centroids[order]
+
+
+def _check_cases(seed: int = 0, size: tuple = (48, 64)) -> list:
+    rng = np.random.default_rng(seed)
+    height, width = size
+    image = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    colors = rng.integers(0, 256, (6, 3))
+    colors[0] = image[3, 5]
+    image[10:20, 10:30] = colors[1]
+
+    lut = rng.integers(0, 4, 1 << 24, dtype=np.uint8)
+    excluded = np.flatnonzero(rng.random(((height + 1) // 2) * ((width + 1) // 2)) < 0.2)
+
+    mask = ((rng.random((height, width)) < 0.45) * 255).astype(np.uint8)
+    mask[:, -1] = 255
+    return [
+        ('palette_labels', (image, colors.astype(np.int32), np.arange(1, 7, dtype=np.uint8), np.array([40, 40, 40], dtype=np.int32),
+                            np.empty((height, width), dtype=np.uint8))),
+        ('sample_counts', (image, lut, 1, np.empty(0, dtype=np.intp), 4)),
+        ('sample_counts', (image, lut, 2, excluded, 4)),
+        ('blob_stats', (mask, 1)),
+        ('blob_stats', (mask, 0)),
+    ]
+
+
+def _compare(kernels: dict, verbose: bool = False) -> bool:
+    ok = True
+    for name, args in _check_cases():
+        expected = _FALLBACKS[name](*(a.copy() if isinstance(a, np.ndarray) else a for a in args))
+        actual = kernels[name](*(a.copy() if isinstance(a, np.ndarray) else a for a in args))
+        if name == 'blob_stats':
+            (es, ec), (as_, ac) = _sorted_blobs(*expected), _sorted_blobs(*actual)
+            same = np.array_equal(es, as_) and np.allclose(ec, ac)
+        else:
+            same = np.array_equal(expected, actual)
+        if verbose:
+            print(f"{name}: {'ok' if same else 'MISMATCH'}")
+        ok &= bool(same)
+    return ok
+
+
+def self_check(verbose: bool = True) -> bool:
+    """
+    Checks that the loop kernels and the numpy/OpenCV versions give identical
+    results. Uses the compiled kernels when numba is available, the plain
+    Python loops otherwise.
+    """
+    kernels = _get_jit()
+    if verbose:
+        print(f"Checking {'compiled' if kernels else 'pure Python'} kernels against numpy/OpenCV")
+    return _compare(kernels or _LOOPS, verbose)
+
+
+if __name__ == '__main__':
+    import time
+
+    print("--- Vision Kernels Self-Check ---")
+    print("All kernels match." if self_check() else "Kernel mismatch!")
+
+    frame = np.random.default_rng(1).integers(0, 256, (335, 511, 3), dtype=np.uint8)
+    blob_mask = cv2.inRange(frame, (0, 0, 0), (120, 255, 255))
+    for name, call in [('palette_labels', lambda: palette_labels(frame, [(30, 200, 40), (200, 30, 40), (40, 30, 200)], 20)),
+                       ('blob_stats', lambda: blob_stats(blob_mask))]:
+        call()
+        start = time.perf_counter()
+        for _ in range(20):
+            call()
+        print(f"{name}: {(time.perf_counter() - start) / 20 * 1000:.2f} ms ({'numba' if jit_enabled() else 'numpy'})")
@@ -0,0 +1,178 @@
+"""
+This module finds entity dots on the minimap at frame rate.
+
+The minimap crop is classified with one ColorQuerySet label pass (yellow
+NPCs, white players, red items, green friends), limited to the circular map
+area, and every small blob becomes a dot. Dot positions are given relative
+to the player at the minimap's center, in pixels and in tiles, together with
+a compass bearing and a tile distance.
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+import cv2
+
+from ..game_screen import GameScreen
+from .color_query import ColorQuerySet
+
+if TYPE_CHECKING:
+    from ..client_window import RuneLiteClientWindow
+
+# Minimap dot colors as [r_min, r_max, g_min, g_max, b_min, b_max], in priority order.
+DOT_RANGES = {
+    'npc': [220, 255, 220, 255, 0, 80],
+    'player': [225, 255, 225, 255, 225, 255],
+    'item': [200, 255, 0, 50, 0, 50],
+    'friend': [0, 70, 200, 255, 0, 70],
+}
+
+# The minimap shows 4 pixels per tile at the default zoom.
+PIXELS_PER_TILE = 4
+# Dots are about 4x4 pixels; bigger blobs are map features.
+MIN_DOT_AREA = 2
+MAX_DOT_AREA = 30
+# Radius around the center that holds the local player's own dot.
+CENTER_RADIUS = 3
+
+
+@dataclass
+class RadarDot:
+    """An entity dot on the minimap."""
+    kind: str
+    x: float  # Screen position of the dot
+    y: float
+    dx: float  # Offset from the player in minimap pixels (right/down positive)
+    dy: float
+    tiles_x: float  # Offset in tiles, east/north positive after undoing the minimap rotation
+    tiles_y: float
+    bearing: float  # Compass degrees, 0 = north, clockwise
+    distance: float  # Tiles
+    area: int
+
+    @property
+    def center(self) -> tuple:
+        return (int(round(self.x)), int(round(self.y)))
+
+
+class MinimapRadar:
+    """Finds NPC, player, item and friend dots inside the circular minimap."""
+
+    def __init__(self, game_screen: GameScreen = None, client_window: 'RuneLiteClientWindow' = None, region: tuple = None,
+                 dot_ranges: dict = None, pixels_per_tile: float = PIXELS_PER_TILE, max_age_ms: float = None):
+        """
+        game_screen: screen to read from; use one with a frame cache to read the shared frame
+        client_window: window to take the minimap rect from (found lazily if None)
+        region: fixed (x1, y1, x2, y2) screen region of the minimap instead of get_minimap_rect()
+        dot_ranges: {kind: spectrum_range} to override DOT_RANGES
+        pixels_per_tile: minimap pixels per tile at the current zoom
+        max_age_ms: maximum age of a cached frame to read from
+        """
+        self.game_screen = game_screen or GameScreen()
+        self.client = client_window
+        self.fixed_region = region
+        self.query_set = ColorQuerySet(dot_ranges or DOT_RANGES)
+        self.pixels_per_tile = pixels_per_tile
+        self.max_age_ms = max_age_ms
+        self.dots = []
+        self._circles = {}
+
+    def minimap_region(self) -> tuple | None:
+        """Screen (x1, y1, x2, y2) of the minimap."""
+        if self.fixed_region is not None:
+            return tuple(int(v) for v in self.fixed_region)
+        if self.client is None:
+            from ..client_window import RuneLiteClientWindow
+            self.client = RuneLiteClientWindow()
+        rect = self.client.get_minimap_rect()
+        if not rect:
+            return None
+        return (rect['left'], rect['top'], rect['left'] + rect['w'], rect['top'] + rect['h'])
+
+    def _circle_mask(self, height: int, width: int) -> np.ndarray:
+        """Bool mask of the map circle without the player's own dot, cached per size."""
+        mask = self._circles.get((height, width))
+        if mask is None:
+            circle = np.zeros((height, width), dtype=np.uint8)
+            center = (width // 2, height // 2)
+            cv2.circle(circle, center, min(width, height) // 2 - 1, 1, -1)
+            cv2.circle(circle, center, CENTER_RADIUS, 0, -1)
+            mask = self._circles[(height, width)] = circle.astype(bool)
+        return mask
+
+    def scan(self, rotation: float = 0.0, max_age_ms: float = None) -> list:
+        """
+        Returns every dot as a RadarDot, nearest first.
+        rotation: the minimap's rotation in degrees (the camera yaw), used for tiles_x/tiles_y and bearing
+        """
+        region = self.minimap_region()
+        if region is None:
+            return []
+        image = self.game_screen.grab_region(region, max_age_ms if max_age_ms is not None else self.max_age_ms)
+        if image is None:
+            return []
+
+        result = self.query_set.evaluate(image, region[:2])
+        result.labels[~self._circle_mask(*result.labels.shape)] = 0
+
+        center_x = region[0] + (region[2] - region[0] - 1) / 2
+        center_y = region[1] + (region[3] - region[1] - 1) / 2
+        angle = math.radians(rotation)
+        cos_a, sin_a = math.cos(angle), math.sin(angle)
+
+        dots = []
+        for kind, count in result.counts().items():
+            if not count:
+                continue
+            for blob in result.blobs(kind, MIN_DOT_AREA):
+                if blob.area > MAX_DOT_AREA:
+                    continue
+                dx, dy = blob.x - center_x, blob.y - center_y
+                # Screen right/up, rotated back to world east/north
+                east = (dx * cos_a - dy * sin_a) / self.pixels_per_tile
+                north = (-dy * cos_a - dx * sin_a) / self.pixels_per_tile
+                dots.append(RadarDot(
+                    kind=kind, x=blob.x, y=blob.y, dx=dx, dy=dy, tiles_x=east, tiles_y=north,
+                    bearing=math.degrees(math.atan2(east, north)) % 360,
+                    distance=math.hypot(east, north), area=blob.area,
+                ))
+        dots.sort(key=lambda dot: dot.distance)
+        self.dots = dots
+        return dots
+
+    def nearest(self, kind: str, max_distance: float = None, rotation: float = 0.0) -> RadarDot | None:
+        """The nearest dot of one kind from a fresh scan, or None."""
+        for dot in self.scan(rotation):
+            if dot.kind == kind and (max_distance is None or dot.distance <= max_distance):
+                return dot
+        return None
+
+    def count(self, kind: str, max_distance: float = None) -> int:
+        """Number of dots of one kind in the last scan."""
+        return sum(1 for dot in self.dots if dot.kind == kind and (max_distance is None or dot.distance <= max_distance))
+
+    def consistency_check(self, game_state, max_distance: int = 15) -> tuple:
+        """
+        Compares the NPC dots of the last scan with the API's NPC list.
+        Returns (radar count, API count) for NPCs within `max_distance` tiles.
+        """
+        npcs = game_state.get_npcs_in_vicinity(max_distance)
+        return self.count('npc', max_distance), len(npcs)
+
+
+if __name__ == '__main__':
+    print("--- Minimap Radar ---")
+    radar = MinimapRadar()
+    try:
+        while True:
+            start = time.perf_counter()
+            dots = radar.scan()
+            elapsed = (time.perf_counter() - start) * 1000
+            summary = ", ".join(f"{d.kind} {d.distance:.1f}t @{d.bearing:.0f}" for d in dots[:5])
+            print(f"{len(dots)} dots ({elapsed:.2f} ms): {summary}")
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,254 @@
+"""
+This module tracks highlighted NPCs in the game view across frames.
+
+RuneLite's NPC indicators draw a solid-color outline around each highlighted
+NPC. Every frame the outline color is masked, gaps are closed and each
+external contour becomes a detection box. Detections are matched to the
+existing tracks by IoU against each track's constant-velocity prediction
+(Hungarian assignment when scipy is installed, greedy otherwise), so every
+NPC keeps a stable track id. Between full scans only a window around each
+predicted box is searched.
+"""
+
+import itertools
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import cv2
+
+from ..game_screen import GameScreen
+from ..object_detection.utils import api_boxes, iou_matrix, match_boxes
+from . import color_search
+from .api_fusion import CanvasMapper
+
+# RuneLite's default NPC highlight color (cyan).
+DEFAULT_OUTLINE_RANGE = [0, 40, 220, 255, 220, 255]
+
+
+def detect_outlines(image: np.ndarray, spectrum_range: list = None, origin: tuple = (0, 0), min_area: int = 64,
+                    close_size: int = 5, mask: np.ndarray = None) -> list:
+    """
+    Screen (x1, y1, x2, y2) boxes of the highlight outlines in an RGB image.
+    Outlines are closed with a `close_size` kernel so dashed or broken edges
+    form one contour; boxes smaller than `min_area` pixels are dropped.
+    """
+    outline = color_search.color_mask(image, spectrum_range or DEFAULT_OUTLINE_RANGE, mask)
+    if not cv2.countNonZero(outline):
+        return []
+    if close_size > 1:
+        outline = cv2.morphologyEx(outline, cv2.MORPH_CLOSE, np.ones((close_size, close_size), dtype=np.uint8))
+    contours, _ = cv2.findContours(outline, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    boxes = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if w * h >= min_area:
+            boxes.append((x + origin[0], y + origin[1], x + w + origin[0], y + h + origin[1]))
+    return boxes
+
+
+@dataclass
+class Track:
+    """One tracked NPC outline."""
+    track_id: int
+    box: tuple  # Screen (x1, y1, x2, y2) at `timestamp`
+    timestamp: float
+    velocity: tuple = (0.0, 0.0)  # Box center pixels per second
+    hits: int = 1
+    misses: int = 0
+    npc_id: int = None  # Joined from the API
+    npc_name: str = None
+    history: list = field(default_factory=list)
+
+    @property
+    def center(self) -> tuple:
+        return ((self.box[0] + self.box[2]) / 2, (self.box[1] + self.box[3]) / 2)
+
+    def predict(self, timestamp: float) -> tuple:
+        """The box moved along the track's velocity to `timestamp`."""
+        dt = timestamp - self.timestamp
+        dx, dy = self.velocity[0] * dt, self.velocity[1] * dt
+        return (self.box[0] + dx, self.box[1] + dy, self.box[2] + dx, self.box[3] + dy)
+
+    def predict_center(self, timestamp: float) -> tuple:
+        x1, y1, x2, y2 = self.predict(timestamp)
+        return (int(round((x1 + x2) / 2)), int(round((y1 + y2) / 2)))
+
+
+class NPCTracker:
+    """
+    Keeps stable ids for highlighted NPC outlines.
+
+    Call `step()` once per frame (or `update()` with your own detections).
+    Every `full_scan_every`-th step scans the whole region; the steps in
+    between only search a window around each track's predicted box, and new
+    tracks are only started from full scans.
+    """
+
+    def __init__(self, game_screen: GameScreen = None, region: tuple = None, spectrum_range: list = None,
+                 min_iou: float = 0.1, max_misses: int = 5, velocity_smoothing: float = 0.5, full_scan_every: int = 5,
+                 search_margin: int = 24, min_area: int = 64, game_view_only: bool = True, max_age_ms: float = None,
+                 mapper: CanvasMapper = None):
+        """
+        game_screen: screen to read from; use one with a frame cache to read the shared frame
+        region: screen (x1, y1, x2, y2) to track in, defaults to the game view
+        spectrum_range: outline color range, defaults to RuneLite's cyan highlight
+        min_iou: minimum overlap between a prediction and a detection to continue a track
+        max_misses: consecutive frames a track may go undetected before it is dropped
+        velocity_smoothing: weight of the newest velocity measurement (0-1)
+        full_scan_every: steps between full-region scans (1 = always scan everything)
+        search_margin: pixels around a predicted box searched between full scans
+        min_area: smallest outline bounding box, in pixels
+        game_view_only: ignore outline-colored pixels on the UI chrome
+        max_age_ms: maximum age of a cached frame to read from
+        mapper: canvas-to-screen mapping for join_api, defaults to one on the game screen's frame cache
+        """
+        self.game_screen = game_screen or GameScreen()
+        self.region = region
+        self.spectrum_range = spectrum_range or DEFAULT_OUTLINE_RANGE
+        self.min_iou = min_iou
+        self.max_misses = max_misses
+        self.velocity_smoothing = velocity_smoothing
+        self.full_scan_every = max(1, full_scan_every)
+        self.search_margin = search_margin
+        self.min_area = min_area
+        self.game_view_only = game_view_only
+        self.max_age_ms = max_age_ms
+        self.mapper = mapper or CanvasMapper(frame_cache=self.game_screen.frame_cache)
+
+        self.tracks = {}
+        self.frame_count = 0
+        self.last_scan_full = False
+        self._ids = itertools.count(1)
+
+    def _track_region(self) -> tuple | None:
+        if self.region is not None:
+            return tuple(int(v) for v in self.region)
+        return self.game_screen.ui_masks.game_view_rect()
+
+    def _detect(self, region: tuple) -> list:
+        image = self.game_screen.grab_region(region, self.max_age_ms)
+        if image is None:
+            return []
+        mask = self.game_screen.ui_masks.region_mask(region) if self.game_view_only else None
+        return detect_outlines(image, self.spectrum_range, region[:2], self.min_area, mask=mask)
+
+    def detect(self, timestamp: float = None) -> list:
+        """Detection boxes for this frame: a full scan, or windows around the predicted tracks."""
+        region = self._track_region()
+        if region is None:
+            return []
+        self.last_scan_full = not self.tracks or self.frame_count % self.full_scan_every == 0
+        if self.last_scan_full:
+            return self._detect(region)
+
+        timestamp = timestamp or time.time()
+        boxes = {}
+        m = self.search_margin
+        for track in self.tracks.values():
+            x1, y1, x2, y2 = track.predict(timestamp)
+            window = (max(int(x1) - m, region[0]), max(int(y1) - m, region[1]),
+                      min(int(x2) + m, region[2]), min(int(y2) + m, region[3]))
+            if window[0] >= window[2] or window[1] >= window[3]:
+                continue
+            for box in self._detect(window):
+                boxes[box] = box  # Overlapping windows can find the same outline
+        return list(boxes.values())
+
+    def update(self, detections: list, timestamp: float = None, spawn: bool = True) -> dict:
+        """
+        Associates detection boxes with the tracks; unmatched detections start
+        new tracks when `spawn` is set. Returns {track_id: Track} of the live tracks.
+        """
+        timestamp = timestamp or time.time()
+        tracks = list(self.tracks.values())
+        predicted = [track.predict(timestamp) for track in tracks]
+        pairs = match_boxes(iou_matrix(predicted, detections), self.min_iou) if tracks and detections else []
+
+        matched_tracks, matched_detections = set(), set()
+        for t, d in pairs:
+            track, box = tracks[t], tuple(detections[d])
+            dt = timestamp - track.timestamp
+            if dt > 0:
+                old_x, old_y = track.center
+                new_x, new_y = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+                a = self.velocity_smoothing if track.hits > 1 else 1.0  # The first measurement is the velocity
+                track.velocity = (a * (new_x - old_x) / dt + (1 - a) * track.velocity[0],
+                                  a * (new_y - old_y) / dt + (1 - a) * track.velocity[1])
+            track.box, track.timestamp = box, timestamp
+            track.hits += 1
+            track.misses = 0
+            track.history = (track.history + [track.center])[-16:]
+            matched_tracks.add(track.track_id)
+            matched_detections.add(d)
+
+        for track in tracks:
+            if track.track_id not in matched_tracks:
+                track.misses += 1
+                if track.misses > self.max_misses:
+                    del self.tracks[track.track_id]
+
+        for d, box in enumerate(detections if spawn else []):
+            if d not in matched_detections:
+                track = Track(next(self._ids), tuple(box), timestamp)
+                track.history.append(track.center)
+                self.tracks[track.track_id] = track
+
+        self.frame_count += 1
+        return self.tracks
+
+    def step(self, timestamp: float = None) -> dict:
+        """Detects and updates in one call. Returns the live tracks."""
+        timestamp = timestamp or time.time()
+        detections = self.detect(timestamp)
+        return self.update(detections, timestamp, spawn=self.last_scan_full)
+
+    def join_api(self, npcs: list, canvas_transform: tuple = None, min_iou: float = 0.2):
+        """
+        Labels tracks with the API's NPC ids by bounding-box overlap.
+        npcs: NPC objects from GameState.get_npcs_in_vicinity
+        canvas_transform: (origin_x, origin_y, scale_x, scale_y) of the game canvas on the screen,
+        defaults to the tracker's CanvasMapper
+        """
+        tracks = [track for track in self.tracks.values() if track.misses == 0]
+        if not tracks or not npcs:
+            return
+        if canvas_transform is None:
+            canvas_transform = self.mapper.transform()
+            if canvas_transform is None:
+                return
+        boxes = api_boxes(npcs, canvas_transform[:2], canvas_transform[2:4])
+        for t, n in match_boxes(iou_matrix([track.box for track in tracks], boxes), min_iou):
+            tracks[t].npc_id = npcs[n].id
+            tracks[t].npc_name = npcs[n].name
+
+    def find(self, npc_id: int = None, name: str = None) -> list:
+        """Live tracks joined to an NPC id or name."""
+        return [track for track in self.tracks.values()
+                if (npc_id is None or track.npc_id == npc_id) and (name is None or (track.npc_name or '').lower() == name.lower())]
+
+    def target(self, track_id: int, lead: float = 0.0) -> tuple | None:
+        """Screen point to click for a track, predicted `lead` seconds ahead (e.g. the input latency)."""
+        track = self.tracks.get(track_id)
+        if track is None:
+            return None
+        return track.predict_center(time.time() + lead)
+
+    def reset(self):
+        self.tracks = {}
+        self.frame_count = 0
+
+
+if __name__ == '__main__':
+    print("--- NPC Outline Tracker ---")
+    tracker = NPCTracker()
+    try:
+        while True:
+            start = time.perf_counter()
+            tracks = tracker.step()
+            elapsed = (time.perf_counter() - start) * 1000
+            summary = ", ".join(f"#{t.track_id} {t.predict_center(time.time())}" for t in tracks.values() if t.misses == 0)
+            print(f"{len(tracks)} tracks ({elapsed:.2f} ms): {summary}")
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,97 @@
+"""
+This module holds the process-wide easyocr reader.
+
+Building an easyocr.Reader imports torch and loads the model weights, which
+takes seconds and a lot of memory. The reader is created on first use and
+shared by every GameScreen; scripts that know they will read text can start
+building it on a background thread at startup with warm_up().
+"""
+
+import os
+import sys
+import threading
+import warnings
+
+_reader = None
+_lock = threading.Lock()  # Held for the whole load
+_state_lock = threading.Lock()  # Guards the warm-up thread and releases; never held during a load
+_warm_up_thread = None
+_generation = 0  # Bumped by release(), so a load that was in flight does not store its reader
+
+
+def _create_reader():
+    import easyocr
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        if threading.current_thread() is not threading.main_thread():
+            # Swapping sys.stdout here would swallow the main thread's output for the whole load
+            return easyocr.Reader(['en'], verbose=False)
+
+        # Temporarily suppress stdout/stderr to hide the noisy
+        # "CUDA not available" and "pin_memory" messages from easyocr/torch.
+        original_stdout = sys.stdout
+        original_stderr = sys.stderr
+        sys.stdout = open(os.devnull, 'w')
+        sys.stderr = open(os.devnull, 'w')
+        try:
+            return easyocr.Reader(['en'], verbose=False)
+        finally:
+            # Restore stdout/stderr
+            sys.stdout.close()
+            sys.stderr.close()
+            sys.stdout = original_stdout
+            sys.stderr = original_stderr
+
+
+def get_reader():
+    """The shared easyocr.Reader, created on the first call. Waits for a running warm-up."""
+    global _reader
+    reader = _reader
+    if reader is None:
+        with _lock:
+            reader = _reader
+            if reader is None:
+                generation = _generation
+                reader = _create_reader()
+                with _state_lock:
+                    if generation == _generation:
+                        _reader = reader
+    return reader
+
+
+def is_ready() -> bool:
+    """Whether the reader has been created, i.e. OCR calls will not block on loading it."""
+    return _reader is not None
+
+
+def _warm_up():
+    try:
+        get_reader()
+    except Exception as e:
+        print(f"Error loading the OCR reader: {str(e)}")
+
+
+def warm_up(background: bool = True):
+    """Creates the reader now, on a daemon thread unless `background` is False. Returns at once while one is loading."""
+    global _warm_up_thread
+    if _reader is not None:
+        return
+    if not background:
+        get_reader()
+        return
+    with _state_lock:
+        if _warm_up_thread is None or not _warm_up_thread.is_alive():
+            _warm_up_thread = threading.Thread(target=_warm_up, name="ocr-warm-up", daemon=True)
+            _warm_up_thread.start()
+
+
+def release():
+    """
+    Drops the shared reader so its memory can be freed; the next OCR call creates it again.
+    Does not wait for a load in progress: that load's reader goes to its caller but is not kept.
+    """
+    global _reader, _generation
+    with _state_lock:
+        _generation += 1
+        _reader = None
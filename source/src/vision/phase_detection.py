@@ -0,0 +1,173 @@
+"""
+This module provides pure phase-detection functions that work on an already
+captured RGB array, so they can run in any thread or worker process.
+
+Every pixel of the region (or every `stride`-th pixel in both directions) is
+classified through the phase palette lookup table, and the labels outside
+the exclusion mask are counted with one histogram.
+"""
+
+import threading
+
+import numpy as np
+import cv2
+
+from .color_lut import get_phase_palette, label_counts
+from .integral import IntegralImage
+from . import kernels
+
+_MASK_CACHE_SIZE = 32
+_mask_cache = {}
+_mask_cache_lock = threading.Lock()
+
+
+def _is_point(value) -> bool:
+    return isinstance(value, (tuple, list)) and len(value) == 2 and all(isinstance(v, (int, float, np.number)) for v in value)
+
+
+def normalize_exclusions(exclude) -> tuple:
+    """
+    Normalizes an exclusion spec into a hashable tuple of shapes.
+
+    `exclude` can be None, a (x1, y1, x2, y2) rectangle, a polygon given as a
+    list of (x, y) screen points, or a list mixing any of those.
+    """
+    if exclude is None:
+        return ()
+    if len(exclude) == 4 and all(isinstance(v, (int, float, np.number)) for v in exclude):
+        return (('rect', tuple(int(v) for v in exclude)),)
+    if len(exclude) >= 3 and all(_is_point(p) for p in exclude):
+        return (('poly', tuple((int(x), int(y)) for x, y in exclude)),)
+    shapes = ()
+    for shape in exclude:
+        shapes += normalize_exclusions(shape)
+    return shapes
+
+
+def _build_excluded_indices(height: int, width: int, origin: tuple, stride: int, shapes: tuple) -> np.ndarray:
+    mask = np.zeros((height, width), dtype=np.uint8)
+    for kind, shape in shapes:
+        if kind == 'rect':
+            x1, y1 = max(shape[0] - origin[0], 0), max(shape[1] - origin[1], 0)
+            x2, y2 = max(shape[2] - origin[0], 0), max(shape[3] - origin[1], 0)
+            mask[y1:y2, x1:x2] = 1
+        else:
+            points = np.array(shape, dtype=np.int32) - np.array(origin[:2], dtype=np.int32)
+            cv2.fillPoly(mask, [points], 1)
+    return np.flatnonzero(mask[::stride, ::stride])
+
+
+def get_excluded_indices(height: int, width: int, origin: tuple, stride: int, exclude) -> np.ndarray:
+    """
+    Flat indices of the excluded pixels of a strided region, cached per
+    region size, origin and exclusion spec so the mask is only drawn once.
+    """
+    shapes = normalize_exclusions(exclude)
+    if not shapes:
+        return np.empty(0, dtype=np.intp)
+    key = (height, width, int(origin[0]), int(origin[1]), stride, shapes)
+    with _mask_cache_lock:
+        indices = _mask_cache.get(key)
+        if indices is None:
+            if len(_mask_cache) >= _MASK_CACHE_SIZE:
+                _mask_cache.clear()
+            indices = _mask_cache[key] = _build_excluded_indices(height, width, origin, stride, shapes)
+        return indices
+
+
+def samples_to_stride(height: int, width: int, samples: int = None) -> int:
+    """Picks the pixel stride that yields roughly `samples` pixels (None = every pixel)."""
+    if not samples:
+        return 1
+    return max(1, int(np.sqrt((height * width) / samples)))
+
+
+def phase_histogram(img_array: np.ndarray, origin: tuple, tolerance: int, phase_colors: dict,
+                    exclude_region=None, stride: int = 1, color_space: str = 'rgb') -> tuple:
+    """
+    Counts the pixels of every phase in `img_array`.
+    Returns (phases, counts, valid pixel count), with counts aligned to phases.
+    """
+    palette = get_phase_palette(phase_colors, tolerance, color_space=color_space)
+    height, width = img_array.shape[:2]
+    bins = len(palette.phases) + 1
+    excluded = get_excluded_indices(height, width, origin, stride, exclude_region)
+    if palette.packed_lut is not None:
+        # One pass over the sampled pixels, without building a label image
+        counts = kernels.sample_label_counts(img_array, palette.packed_lut, bins, stride, excluded)
+        valid = len(range(0, height, stride)) * len(range(0, width, stride)) - excluded.size
+        return palette.phases, counts[1:], valid
+
+    if stride > 1:
+        img_array = img_array[::stride, ::stride]
+
+    labels = palette.classify(img_array)
+    counts = label_counts(labels, bins)
+    if excluded.size:
+        counts = counts - label_counts(np.take(labels, excluded), bins)
+
+    return palette.phases, counts[1:], labels.size - excluded.size
+
+
+def detect_phase_scores(img_array: np.ndarray, origin: tuple, tolerance: int, phase_colors: dict,
+                        exclude_region=None, stride: int = 1, color_space: str = 'rgb') -> dict:
+    """Returns {phase: confidence} for every phase, as the percentage of non-excluded pixels it covers."""
+    phases, counts, valid = phase_histogram(img_array, origin, tolerance, phase_colors, exclude_region, stride, color_space)
+    if valid <= 0:
+        return {phase: 0.0 for phase in phases}
+    return {phase: float(count) * 100 / valid for phase, count in zip(phases, counts)}
+
+
+def detect_phase(img_array: np.ndarray, origin: tuple, samples: int, tolerance: int, phase_colors: dict,
+                 exclude_region=None, stride: int = None, color_space: str = 'rgb') -> tuple:
+    """
+    Detects the most likely phase in `img_array` based on its colors.
+    `origin` is the screen position of the array's top-left pixel and is used
+    to place the exclusion rectangles/polygons. `samples` is the approximate
+    number of pixels to classify (None = all), unless `stride` is given.
+    With color_space 'hsv' or 'lab', `tolerance` applies in that space
+    (None = its default) and the palette is compiled for it once.
+    """
+    height, width = img_array.shape[:2]
+    if stride is None:
+        stride = samples_to_stride(height, width, samples)
+
+    phases, counts, valid = phase_histogram(img_array, origin, tolerance, phase_colors, exclude_region, stride, color_space)
+    if valid <= 0:
+        return None, 0.0
+
+    best = int(np.argmax(counts))
+    return phases[best], float(counts[best]) * 100 / valid
+
+
+def phase_integrals(img_array: np.ndarray, origin: tuple, tolerance: int, phase_colors: dict, stride: int = 1,
+                    color_space: str = 'rgb') -> dict:
+    """Classifies the image once and returns {phase: IntegralImage} in screen coordinates."""
+    palette = get_phase_palette(phase_colors, tolerance, color_space=color_space)
+    labels = palette.classify(img_array[::stride, ::stride] if stride > 1 else img_array)
+    return {phase: IntegralImage.from_labels(labels, label, origin, stride)
+            for label, phase in enumerate(palette.phases, start=1)}
+
+
+def detect_phase_in_regions(img_array: np.ndarray, origin: tuple, regions: list, tolerance: int, phase_colors: dict, stride: int = 1,
+                            color_space: str = 'rgb') -> list:
+    """
+    Returns the best (phase, confidence) for each (x1, y1, x2, y2) screen
+    region inside `img_array`. The image is classified once; every extra
+    region only costs a few table lookups per phase.
+    """
+    integrals = phase_integrals(img_array, origin, tolerance, phase_colors, stride, color_space)
+    phases = list(integrals)
+    if not phases or not len(regions):
+        return [(None, 0.0) for _ in regions]
+
+    counts = np.stack([integrals[phase].counts(regions) for phase in phases])
+    areas = integrals[phases[0]].areas(regions)
+    results = []
+    for i, area in enumerate(areas):
+        if area <= 0:
+            results.append((None, 0.0))
+            continue
+        best = int(np.argmax(counts[:, i]))
+        results.append((phases[best], float(counts[best, i] * 100 / area)))
+    return results
@@ -0,0 +1,327 @@
+"""
+This module provides a declarative vision pipeline.
+
+Scripts declare detectors, each with a client-relative ROI, a preprocessing
+chain and a rate. Every frame the pipeline captures only the merged ROIs of
+the detectors that are due, computes each preprocessing chain once per
+captured area (so detectors sharing e.g. 'gray' share the conversion) and
+hands every detector a view of its own ROI.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, TYPE_CHECKING
+
+import numpy as np
+import cv2
+
+from .capture import CaptureBackend, create_backend
+from .color_search import color_mask
+
+if TYPE_CHECKING:
+    from ..client_window import RuneLiteClientWindow
+
+
+# --- Preprocessing Steps --- #
+
+def _threshold(image: np.ndarray, value: int = 180) -> np.ndarray:
+    return cv2.threshold(image, value, 255, cv2.THRESH_BINARY)[1]
+
+
+STEPS = {
+    'gray': lambda image: cv2.cvtColor(image, cv2.COLOR_RGB2GRAY),
+    'hsv': lambda image: cv2.cvtColor(image, cv2.COLOR_RGB2HSV),
+    'lab': lambda image: cv2.cvtColor(image, cv2.COLOR_RGB2LAB),
+    'threshold': _threshold,
+    'invert': cv2.bitwise_not,
+    'in_range': lambda image, spectrum_range: color_mask(image, list(spectrum_range)),
+    'blur': lambda image, size=3: cv2.GaussianBlur(image, (size, size), 0),
+}
+
+
+def register_step(name: str, function: Callable):
+    """Adds a preprocessing step, called as function(image, *args). It must keep the image size."""
+    STEPS[name] = function
+
+
+def _normalize_chain(chain) -> tuple:
+    """Turns ['gray', ('threshold', 180)] into a hashable (('gray',), ('threshold', 180))."""
+    steps = []
+    for step in chain or ():
+        if isinstance(step, str):
+            step = (step,)
+        name, *args = step
+        if name not in STEPS:
+            raise ValueError(f"Unknown preprocessing step: {name}")
+        steps.append((name, *(tuple(a) if isinstance(a, list) else a for a in args)))
+    return tuple(steps)
+
+
+# --- Detectors --- #
+
+@dataclass
+class Detector:
+    """
+    A declared detector.
+
+    roi: (x1, y1, x2, y2) relative to the client area's top-left; negative
+         values count from the right/bottom edge (0 as x2/y2 means the edge)
+    function: called as function(ctx) with a DetectorContext, returns the result
+    preprocess: chain of step names or (name, *args) tuples, e.g. ['gray', ('threshold', 180)]
+    rate: runs per second, or None to run on every frame
+    on_result: optional callback(name, result)
+    """
+    name: str
+    roi: tuple
+    function: Callable
+    preprocess: list = field(default_factory=list)
+    rate: float = None
+    on_result: Callable = None
+
+    def __post_init__(self):
+        self.chain = _normalize_chain(self.preprocess)
+        self.next_run = 0.0
+
+    def resolve_roi(self, client_rect: tuple) -> tuple | None:
+        """Screen (x1, y1, x2, y2) of the ROI for a client rect, clipped to it."""
+        left, top, right, bottom = client_rect
+        width, height = right - left, bottom - top
+
+        def axis(value, size, is_end):
+            if value < 0 or (is_end and value == 0):
+                return size + value
+            return value
+
+        x1, y1 = axis(self.roi[0], width, False), axis(self.roi[1], height, False)
+        x2, y2 = axis(self.roi[2], width, True), axis(self.roi[3], height, True)
+        x1, x2 = max(0, min(x1, width)), max(0, min(x2, width))
+        y1, y2 = max(0, min(y1, height)), max(0, min(y2, height))
+        if x1 >= x2 or y1 >= y2:
+            return None
+        return (left + x1, top + y1, left + x2, top + y2)
+
+
+@dataclass
+class DetectorContext:
+    """What a detector gets to work with on one frame."""
+    detector: Detector
+    rect: tuple  # Screen (x1, y1, x2, y2) of the ROI
+    frame_index: int
+    timestamp: float
+    _area: Any  # The _CaptureArea the ROI was cut from
+
+    @property
+    def image(self) -> np.ndarray:
+        """RGB view of the ROI."""
+        return self.get(())
+
+    @property
+    def data(self) -> np.ndarray:
+        """Output of the detector's own preprocessing chain for the ROI."""
+        return self.get(self.detector.chain)
+
+    def get(self, chain) -> np.ndarray:
+        """Output of any preprocessing chain for the ROI, shared with the other detectors."""
+        return self._area.view(_normalize_chain(chain), self.rect)
+
+
+class _CaptureArea:
+    """One captured screen area and the preprocessing results computed on it this frame."""
+
+    def __init__(self, rect: tuple, image: np.ndarray):
+        self.rect = rect
+        self.image = image
+        self._cache = {(): image}
+
+    def compute(self, chain: tuple) -> np.ndarray:
+        result = self._cache.get(chain)
+        if result is None:
+            name, *args = chain[-1]
+            result = self._cache[chain] = STEPS[name](self.compute(chain[:-1]), *args)
+        return result
+
+    def view(self, chain: tuple, rect: tuple) -> np.ndarray:
+        x1, y1 = rect[0] - self.rect[0], rect[1] - self.rect[1]
+        x2, y2 = rect[2] - self.rect[0], rect[3] - self.rect[1]
+        return self.compute(chain)[y1:y2, x1:x2]
+
+
+def merge_rects(rects: list, gap: int = 0) -> list:
+    """Merges rects that overlap (or are within `gap` pixels) until no two do."""
+    merged = [tuple(r) for r in rects]
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(merged)):
+            for j in range(i + 1, len(merged)):
+                a, b = merged[i], merged[j]
+                if a[0] <= b[2] + gap and b[0] <= a[2] + gap and a[1] <= b[3] + gap and b[1] <= a[3] + gap:
+                    merged[i] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                    del merged[j]
+                    changed = True
+                    break
+            if changed:
+                break
+    return merged
+
+
+# --- Engine --- #
+
+class VisionPipeline:
+    """
+    Runs declared detectors in one capture loop.
+
+    Each frame, only the ROIs of due detectors are captured, after merging
+    overlapping ones, and each preprocessing chain runs at most once per
+    captured area.
+    """
+
+    def __init__(self, client_window: 'RuneLiteClientWindow' = None, capture_backend: CaptureBackend = None,
+                 fps: float = 30, region: tuple = None, merge_gap: int = 16):
+        """
+        client_window: the window whose client area the ROIs are relative to (found lazily if None)
+        capture_backend: grabber to use, defaults to the fastest available one
+        fps: maximum loop rate
+        region: fixed (x1, y1, x2, y2) screen region to use instead of the client area
+        merge_gap: ROIs closer than this many pixels are captured together
+        """
+        self.client = client_window
+        self.capture = capture_backend or create_backend()
+        self.fps = fps
+        self.fixed_region = region
+        self.merge_gap = merge_gap
+
+        self.detectors = {}
+        self.results = {}
+        self.frame_index = 0
+        self._buffers = {}
+        self._lock = threading.Lock()
+        self.running = False
+        self.thread = None
+
+    def add(self, name: str, roi: tuple, function: Callable, preprocess: list = None, rate: float = None,
+            on_result: Callable = None) -> Detector:
+        """Declares a detector. See Detector for the meaning of the arguments."""
+        detector = Detector(name, roi, function, preprocess or [], rate, on_result)
+        with self._lock:
+            self.detectors[name] = detector
+        return detector
+
+    def remove(self, name: str):
+        with self._lock:
+            self.detectors.pop(name, None)
+            self.results.pop(name, None)
+
+    def _get_client_rect(self) -> tuple | None:
+        if self.fixed_region is not None:
+            return tuple(int(v) for v in self.fixed_region)
+        if self.client is None:
+            from ..client_window import RuneLiteClientWindow
+            self.client = RuneLiteClientWindow()
+        client_rect = self.client.get_client_rect()
+        if not client_rect:
+            return None
+        return (client_rect['left'], client_rect['top'], client_rect['right'], client_rect['bottom'])
+
+    def _grab_area(self, slot: int, rect: tuple) -> _CaptureArea | None:
+        width, height = rect[2] - rect[0], rect[3] - rect[1]
+        buffer = self._buffers.get(slot)
+        if buffer is None or buffer.shape[:2] != (height, width):
+            buffer = self._buffers[slot] = np.empty((height, width, 3), dtype=np.uint8)
+        image = self.capture.grab(rect, out=buffer)
+        if image is None:
+            return None
+        if image is not buffer:
+            np.copyto(buffer, image)
+        return _CaptureArea(rect, buffer)
+
+    def run_once(self) -> dict:
+        """Runs every due detector on a fresh capture. Returns {name: result} for the detectors that ran."""
+        now = time.perf_counter()
+        with self._lock:
+            due = [d for d in self.detectors.values() if now >= d.next_run]
+        if not due:
+            return {}
+
+        client_rect = self._get_client_rect()
+        if client_rect is None:
+            return {}
+        rois = {d.name: d.resolve_roi(client_rect) for d in due}
+        due = [d for d in due if rois[d.name] is not None]
+
+        areas = []
+        for slot, rect in enumerate(merge_rects([rois[d.name] for d in due], self.merge_gap)):
+            area = self._grab_area(slot, rect)
+            if area is not None:
+                areas.append(area)
+
+        timestamp = time.perf_counter()
+        ran = {}
+        for detector in due:
+            roi = rois[detector.name]
+            area = next((a for a in areas if a.rect[0] <= roi[0] and a.rect[1] <= roi[1] and
+                         roi[2] <= a.rect[2] and roi[3] <= a.rect[3]), None)
+            if area is None:
+                continue
+            ctx = DetectorContext(detector, roi, self.frame_index, timestamp, area)
+            # Scheduled before running, so a failing detector is retried at its own rate
+            detector.next_run = now + (1.0 / detector.rate if detector.rate else 0.0)
+            try:
+                result = detector.function(ctx)
+            except Exception as e:
+                print(f"Error in detector '{detector.name}': {e}")
+                continue
+            ran[detector.name] = self.results[detector.name] = result
+            if detector.on_result:
+                detector.on_result(detector.name, result)
+
+        self.frame_index += 1
+        return ran
+
+    def _loop(self):
+        interval = 1.0 / self.fps
+        while self.running:
+            start = time.perf_counter()
+            self.run_once()
+            remaining = interval - (time.perf_counter() - start)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def start(self):
+        if self.running:
+            print("Vision pipeline is already running.")
+            return
+
+        self.running = True
+        self.thread = threading.Thread(target=self._loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+
+if __name__ == '__main__':
+    from ..phase_tracker import PhaseDetector, RotationManager
+
+    print("--- Vision Pipeline Demo ---")
+    phase_data = RotationManager()._get_zulrah_rotations_data()['types']
+
+    pipeline = VisionPipeline()
+    # Game view and the top-left action text share one capture area.
+    phase_detector = PhaseDetector(phase_data, on_phase_change=lambda phase, confidence: print(f"phase: {phase} ({confidence:.1f}%)"))
+    phase_detector.attach(pipeline, (4, 4, 515, 339))
+    pipeline.add('action_text_pixels', (4, 4, 284, 36), lambda ctx: int(cv2.countNonZero(ctx.data)),
+                 preprocess=['gray', ('threshold', 180)], rate=5,
+                 on_result=lambda name, result: print(f"{name}: {result}"))
+    pipeline.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        phase_detector.stop()
+        pipeline.stop()
@@ -0,0 +1,168 @@
+"""
+This module provides a lazily built image pyramid and coarse-to-fine searches.
+
+Level k of the pyramid is the frame downscaled by 2**k. Color levels are
+plain strided views, so pixel colors stay exact; template levels are area
+averaged. Searches run on the coarsest level that still resolves the target
+and only refine around the candidates at full resolution.
+"""
+
+import numpy as np
+import cv2
+
+from .color_search import color_mask, find_first, mask_blobs, rank_blobs
+from .kernels import blob_stats
+
+# A target must still cover this many pixels (per side) on the level searched.
+MIN_COLOR_PIXELS = 2
+MIN_TEMPLATE_PIXELS = 8
+
+
+class FramePyramid:
+    """Downscaled views of one RGB frame, computed on first use."""
+
+    def __init__(self, image: np.ndarray, origin: tuple = (0, 0), max_level: int = 3):
+        """
+        image: (H, W, 3) RGB frame, level 0
+        origin: screen position of the frame's top-left pixel
+        max_level: coarsest level (3 = 1/8 scale)
+        """
+        self.image = image
+        self.origin = (int(origin[0]), int(origin[1]))
+        self.max_level = max_level
+        self._smooth = {0: image}
+        self._gray = {}
+
+    @staticmethod
+    def scale(level: int) -> int:
+        return 1 << level
+
+    def color_level(self, level: int) -> np.ndarray:
+        """Strided view of every 2**level-th pixel; colors are not blended."""
+        step = self.scale(level)
+        return self.image[::step, ::step] if step > 1 else self.image
+
+    def smooth_level(self, level: int) -> np.ndarray:
+        """Area-averaged downscale, built from the next finer level."""
+        image = self._smooth.get(level)
+        if image is None:
+            finer = self.smooth_level(level - 1)
+            size = (max(1, finer.shape[1] // 2), max(1, finer.shape[0] // 2))
+            image = self._smooth[level] = cv2.resize(finer, size, interpolation=cv2.INTER_AREA)
+        return image
+
+    def gray_level(self, level: int) -> np.ndarray:
+        image = self._gray.get(level)
+        if image is None:
+            image = self._gray[level] = cv2.cvtColor(self.smooth_level(level), cv2.COLOR_RGB2GRAY)
+        return image
+
+    def level_for_size(self, target_size: int, min_pixels: int = MIN_COLOR_PIXELS) -> int:
+        """The coarsest level on which a target of `target_size` pixels still spans `min_pixels`."""
+        if not target_size:
+            return 0
+        level = 0
+        while level < self.max_level and target_size // self.scale(level + 1) >= min_pixels:
+            level += 1
+        return level
+
+    def _candidate_boxes(self, level: int, spectrum_range: list) -> list:
+        """Full-resolution (x1, y1, x2, y2) boxes around the coarse matches, merged per component."""
+        step = self.scale(level)
+        mask = color_mask(self.color_level(level), spectrum_range)
+        if not cv2.countNonZero(mask):
+            return []
+        mask = cv2.dilate(mask, np.ones((3, 3), dtype=np.uint8))  # Join matches split by the stride
+        stats, _ = blob_stats(mask)
+        height, width = self.image.shape[:2]
+        boxes = []
+        for label in range(len(stats)):
+            x, y, w, h = (int(v) for v in stats[label, :4])
+            boxes.append((max((x - 1) * step, 0), max((y - 1) * step, 0),
+                          min((x + w + 1) * step, width), min((y + h + 1) * step, height)))
+        return boxes
+
+    # --- Searches (local coordinates are converted to screen coordinates) --- #
+
+    def find_color(self, spectrum_range: list, target_size: int = None) -> tuple | None:
+        """
+        Finds a matching pixel, searching coarse-first for targets of at least
+        `target_size` pixels. Returns a screen (x, y) or None. Unlike a full
+        scan, the match is the first one inside the first coarse candidate.
+        """
+        level = self.level_for_size(target_size)
+        if level == 0:
+            match = find_first(self.image, spectrum_range)
+            return (match[0] + self.origin[0], match[1] + self.origin[1]) if match else None
+
+        for x1, y1, x2, y2 in self._candidate_boxes(level, spectrum_range):
+            match = find_first(self.image[y1:y2, x1:x2], spectrum_range)
+            if match:
+                return (x1 + match[0] + self.origin[0], y1 + match[1] + self.origin[1])
+        return None
+
+    def find_blobs(self, spectrum_range: list, min_area: int = 1, target_size: int = None, near: tuple = None) -> list:
+        """
+        Finds full-resolution blobs, only refining the areas where a coarse
+        level found the color. Blobs smaller than about 2**level pixels per
+        side may be missed, so pick `target_size` as the smallest target side.
+        """
+        level = self.level_for_size(target_size)
+        if level == 0:
+            boxes = [(0, 0, self.image.shape[1], self.image.shape[0])]
+        else:
+            boxes = self._candidate_boxes(level, spectrum_range)
+
+        blobs = {}
+        for x1, y1, x2, y2 in boxes:
+            for blob in mask_blobs(color_mask(self.image[y1:y2, x1:x2], spectrum_range), min_area):
+                blob = blob.offset(x1 + self.origin[0], y1 + self.origin[1])
+                blobs[blob.bbox] = blob  # The same blob can be refined from two touching boxes
+        return rank_blobs(list(blobs.values()), near)
+
+    def find_template(self, template: np.ndarray, confidence: float = 0.8, target_size: int = None,
+                      margin: float = 0.15, max_candidates: int = 5) -> tuple | None:
+        """
+        Matches an RGB template coarse-to-fine. Candidates scoring within
+        `margin` of `confidence` on the coarse level are re-matched at full
+        resolution in a small window. Returns (x, y, score) of the best
+        match's screen top-left, or None.
+        """
+        if template.shape[0] > self.image.shape[0] or template.shape[1] > self.image.shape[1]:
+            return None
+        template_gray = cv2.cvtColor(np.ascontiguousarray(template[..., :3]), cv2.COLOR_RGB2GRAY)
+        level = self.level_for_size(target_size or min(template.shape[:2]), MIN_TEMPLATE_PIXELS)
+
+        if level == 0:
+            scores = cv2.matchTemplate(self.gray_level(0), template_gray, cv2.TM_CCOEFF_NORMED)
+            _, score, _, (x, y) = cv2.minMaxLoc(scores)
+            return (x + self.origin[0], y + self.origin[1], float(score)) if score >= confidence else None
+
+        step = self.scale(level)
+        coarse_template = cv2.resize(template_gray, (max(1, template.shape[1] // step), max(1, template.shape[0] // step)),
+                                     interpolation=cv2.INTER_AREA)
+        coarse = self.gray_level(level)
+        if coarse_template.shape[0] > coarse.shape[0] or coarse_template.shape[1] > coarse.shape[1]:
+            return None
+        scores = cv2.matchTemplate(coarse, coarse_template, cv2.TM_CCOEFF_NORMED)
+
+        full = self.gray_level(0)
+        t_height, t_width = template_gray.shape
+        best = None
+        for _ in range(max_candidates):
+            _, score, _, (cx, cy) = cv2.minMaxLoc(scores)
+            if score < confidence - margin:
+                break
+            # Suppress this peak before looking for the next candidate
+            scores[max(cy - 1, 0):cy + 2, max(cx - 1, 0):cx + 2] = -1
+
+            x1, y1 = max(cx * step - step, 0), max(cy * step - step, 0)
+            x2 = min(cx * step + step + t_width, full.shape[1])
+            y2 = min(cy * step + step + t_height, full.shape[0])
+            window = full[y1:y2, x1:x2]
+            if window.shape[0] < t_height or window.shape[1] < t_width:
+                continue
+            _, fine_score, _, (fx, fy) = cv2.minMaxLoc(cv2.matchTemplate(window, template_gray, cv2.TM_CCOEFF_NORMED))
+            if fine_score >= confidence and (best is None or fine_score > best[2]):
+                best = (x1 + fx + self.origin[0], y1 + fy + self.origin[1], float(fine_score))
+        return best
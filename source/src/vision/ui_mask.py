@@ -0,0 +1,155 @@
+"""
+This module provides cached masks of the static UI chrome around the game view.
+
+The chrome rects come from the 'chrome' section of user-interface.json and
+scale with the client like every other reference coordinate. Masks are built
+once per client size and only rebuilt when the window is resized; moving the
+window just shifts the screen coordinates.
+"""
+
+import threading
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from ..ui_utils import CoordinateTransformer, get_chrome_rects
+
+if TYPE_CHECKING:
+    from ..client_window import RuneLiteClientWindow
+
+GAME_VIEW = 'game_view'
+# Masks that are only applied when asked for, since they are not UI chrome.
+OPTIONAL_MASKS = ('player',)
+
+
+class UIMaskCache:
+    """
+    Client-sized "game view only" masks, rebuilt only when the client is resized.
+
+    A mask is 255 inside the game view and 0 on the minimap, side panel,
+    chatbox and any other chrome listed in user-interface.json.
+    """
+
+    def __init__(self, client_window: 'RuneLiteClientWindow' = None, region: tuple = None, chrome: dict = None):
+        """
+        client_window: the window whose client area the masks cover (found lazily if None)
+        region: fixed (x1, y1, x2, y2) screen region to treat as the client area instead
+        chrome: {name: (x1, y1, x2, y2)} bottom-right-relative reference rects, defaults to user-interface.json
+        """
+        self.client = client_window
+        self.fixed_region = region
+        self.chrome = chrome if chrome is not None else get_chrome_rects()
+        self.build_count = 0
+
+        self._size = None
+        self._local_rects = {}  # name -> client-local (x1, y1, x2, y2) for the current size
+        self._masks = {}  # excluded optional names -> client-sized mask
+        self._lock = threading.Lock()
+
+    def client_rect(self) -> tuple | None:
+        """The (x1, y1, x2, y2) screen rect of the client area."""
+        if self.fixed_region is not None:
+            return tuple(int(v) for v in self.fixed_region)
+        if self.client is None:
+            from ..client_window import RuneLiteClientWindow
+            self.client = RuneLiteClientWindow()
+        client_rect = self.client.get_client_rect()
+        if not client_rect:
+            return None
+        return (client_rect['left'], client_rect['top'], client_rect['right'], client_rect['bottom'])
+
+    def _scale_rects(self, width: int, height: int) -> dict:
+        scale_x = width / CoordinateTransformer.REF_CLIENT_WIDTH
+        scale_y = height / (CoordinateTransformer.REF_CLIENT_HEIGHT + 38)
+        rects = {}
+        for name, (x1, y1, x2, y2) in self.chrome.items():
+            left, right = sorted((int(width - x1 * scale_x), int(width - x2 * scale_x)))
+            top, bottom = sorted((int(height - y1 * scale_y), int(height - y2 * scale_y)))
+            rects[name] = (max(left, 0), max(top, 0), min(right, width), min(bottom, height))
+        return rects
+
+    def _resolve(self, client_rect: tuple = None) -> tuple | None:
+        """Returns the client rect, rebuilding the local rects if the client was resized."""
+        client_rect = client_rect or self.client_rect()
+        if client_rect is None:
+            return None
+        size = (client_rect[2] - client_rect[0], client_rect[3] - client_rect[1])
+        with self._lock:
+            if size != self._size:
+                self._size = size
+                self._local_rects = self._scale_rects(*size)
+                self._masks = {}
+        return client_rect
+
+    def _excluded_names(self, exclude: tuple) -> list:
+        return [name for name in self._local_rects
+                if name != GAME_VIEW and (name not in OPTIONAL_MASKS or name in exclude)]
+
+    def rects(self, client_rect: tuple = None) -> dict:
+        """Every chrome rect as {name: (x1, y1, x2, y2)} in screen coordinates."""
+        client_rect = self._resolve(client_rect)
+        if client_rect is None:
+            return {}
+        left, top = client_rect[:2]
+        return {name: (x1 + left, y1 + top, x2 + left, y2 + top) for name, (x1, y1, x2, y2) in self._local_rects.items()}
+
+    def game_view_rect(self, client_rect: tuple = None) -> tuple | None:
+        """Screen (x1, y1, x2, y2) of the game view, or the whole client area when it is not configured."""
+        client_rect = self._resolve(client_rect)
+        if client_rect is None:
+            return None
+        return self.rects(client_rect).get(GAME_VIEW, client_rect)
+
+    def exclude_rects(self, client_rect: tuple = None, exclude: tuple = ()) -> list:
+        """
+        Screen rects of the chrome overlapping the game view (plus the optional
+        masks named in `exclude`, e.g. ('player',)), usable as `exclude_region`.
+        """
+        client_rect = self._resolve(client_rect)
+        if client_rect is None:
+            return []
+        rects = self.rects(client_rect)
+        view = rects.get(GAME_VIEW, client_rect)
+        return [rects[name] for name in self._excluded_names(exclude)
+                if rects[name][0] < view[2] and view[0] < rects[name][2] and rects[name][1] < view[3] and view[1] < rects[name][3]]
+
+    def game_view_mask(self, client_rect: tuple = None, exclude: tuple = ()) -> np.ndarray | None:
+        """Client-sized uint8 mask, 255 on game-view pixels. Cached per client size; do not modify it."""
+        client_rect = self._resolve(client_rect)
+        if client_rect is None:
+            return None
+        key = tuple(sorted(exclude))
+        with self._lock:
+            mask = self._masks.get(key)
+            if mask is None:
+                width, height = self._size
+                mask = np.zeros((height, width), dtype=np.uint8)
+                x1, y1, x2, y2 = self._local_rects.get(GAME_VIEW, (0, 0, width, height))
+                mask[y1:y2, x1:x2] = 255
+                for name in self._excluded_names(key):
+                    x1, y1, x2, y2 = self._local_rects[name]
+                    mask[y1:y2, x1:x2] = 0
+                self._masks[key] = mask
+                self.build_count += 1
+            return mask
+
+    def region_mask(self, region: tuple, client_rect: tuple = None, exclude: tuple = ()) -> np.ndarray | None:
+        """
+        The game-view mask for a screen (x1, y1, x2, y2) region. A region inside
+        the client area gets a view of the cached mask; pixels outside it are 0.
+        """
+        client_rect = self._resolve(client_rect)
+        if client_rect is None:
+            return None
+        mask = self.game_view_mask(client_rect, exclude)
+        x1, y1 = region[0] - client_rect[0], region[1] - client_rect[1]
+        x2, y2 = region[2] - client_rect[0], region[3] - client_rect[1]
+        height, width = mask.shape
+        if x1 >= 0 and y1 >= 0 and x2 <= width and y2 <= height:
+            return mask[y1:y2, x1:x2]
+
+        out = np.zeros((region[3] - region[1], region[2] - region[0]), dtype=np.uint8)
+        cx1, cy1, cx2, cy2 = max(x1, 0), max(y1, 0), min(x2, width), min(y2, height)
+        if cx1 < cx2 and cy1 < cy2:
+            out[cy1 - y1:cy2 - y1, cx1 - x1:cx2 - x1] = mask[cy1:cy2, cx1:cx2]
+        return out
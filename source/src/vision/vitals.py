@@ -0,0 +1,173 @@
+"""
+This module reads hitpoints, prayer and run energy from the minimap orbs.
+
+An orb drains from the top: its filled part is saturated (red, cyan, amber,
+or green when poisoned) and the drained part is dark. The fill ratio is the
+share of orb rows whose side columns are mostly colored; the middle columns
+are skipped because the orb's icon is drawn there. Reading all orbs is one
+grab of their bounding box and a few vectorized operations on it.
+"""
+
+import time
+
+import numpy as np
+import cv2
+
+from ..game_screen import GameScreen
+from ..ui_utils import get_ui_rects
+from .ui_mask import UIMaskCache
+
+# API stat names for the orbs, used to look up maximum levels and cross-check.
+ORB_STATS = {
+    'hitpoints': 'HITPOINTS',
+    'prayer': 'PRAYER',
+    'run': 'RUN_ENERGY',
+}
+
+DEFAULT_MAX = {'hitpoints': 99, 'prayer': 99, 'run': 100}
+
+# A pixel counts as filled when it is at least this saturated and bright (OpenCV HSV units).
+MIN_SATURATION = 90
+MIN_VALUE = 70
+# A row counts as filled when this share of its side-column pixels is.
+ROW_FILL = 0.5
+# Minimum seconds between API requests made to confirm an empty orb or to stand in for unreadable orbs.
+CONFIRM_INTERVAL = 1.0
+
+_side_masks = {}
+
+
+def _side_mask(height: int, width: int) -> np.ndarray:
+    """Bool mask of the orb circle without its middle (icon) columns, cached per size."""
+    mask = _side_masks.get((height, width))
+    if mask is None:
+        circle = np.zeros((height, width), dtype=np.uint8)
+        cv2.ellipse(circle, (width // 2, height // 2), (max(width // 2 - 1, 1), max(height // 2 - 1, 1)), 0, 0, 360, 1, -1)
+        circle[:, width // 3:width - width // 3] = 0
+        mask = _side_masks[(height, width)] = circle.astype(bool)
+    return mask
+
+
+def fill_ratio(image: np.ndarray) -> float:
+    """Fill ratio (0.0-1.0) of one orb's RGB crop."""
+    height, width = image.shape[:2]
+    if height < 3 or width < 3:
+        return 0.0
+    hsv = cv2.cvtColor(np.ascontiguousarray(image), cv2.COLOR_RGB2HSV)
+    filled = (hsv[..., 1] >= MIN_SATURATION) & (hsv[..., 2] >= MIN_VALUE)
+
+    side = _side_mask(height, width)
+    row_pixels = side.sum(axis=1)
+    rows = row_pixels > 0
+    row_filled = (filled & side).sum(axis=1) >= ROW_FILL * row_pixels
+    return float(np.count_nonzero(row_filled & rows)) / max(int(np.count_nonzero(rows)), 1)
+
+
+class VitalsReader:
+    """
+    Estimates hitpoints, prayer and run energy from the orbs on the cached frame.
+
+    Maximum levels come from `max_levels`, or from the API when one is given.
+    With an API, every `check_interval` seconds one stats request refreshes the
+    maximum levels and records how far the vision values drift from it; if
+    the orbs cannot be read at all, the API values are used instead.
+    An empty orb is confirmed with the API (at most once per second), since a
+    menu drawn over the orb reads as empty too. Boosted levels above the
+    maximum read as the maximum, since the orb is full.
+    """
+
+    def __init__(self, game_screen: GameScreen = None, api=None, check_interval: float = 10.0, max_levels: dict = None,
+                 max_age_ms: float = None, orbs: dict = None):
+        """
+        game_screen: screen to read from; use one with a frame cache to read the shared frame
+        api: optional RuneLiteAPI for maximum levels, cross-checks and fallback
+        check_interval: seconds between API cross-checks (None = never)
+        max_levels: {orb: maximum level}, defaults to 99/99/100 until the API says otherwise
+        max_age_ms: maximum age of a cached frame to read from
+        orbs: {orb: (x1, y1, x2, y2)} bottom-right-relative reference rects, defaults to user-interface.json
+        """
+        self.game_screen = game_screen or GameScreen()
+        self.api = api
+        self.check_interval = check_interval
+        self.max_levels = dict(DEFAULT_MAX, **(max_levels or {}))
+        self.max_age_ms = max_age_ms
+
+        frame_cache = self.game_screen.frame_cache
+        self.orb_rects = UIMaskCache(frame_cache.client if frame_cache else None,
+                                     frame_cache.fixed_region if frame_cache else None,
+                                     chrome=orbs if orbs is not None else get_ui_rects('orbs'))
+
+        self.ratios = {}
+        self.values = {}
+        self.api_values = {}
+        self.drift = {}  # orb -> vision value minus API value at the last cross-check
+        self.last_check = 0.0
+
+    def read_ratios(self, max_age_ms: float = None) -> dict:
+        """Returns {orb: fill ratio} from one grab of the orbs, or {} if they cannot be captured."""
+        rects = self.orb_rects.rects()
+        if not rects:
+            return {}
+        x1, y1 = min(r[0] for r in rects.values()), min(r[1] for r in rects.values())
+        x2, y2 = max(r[2] for r in rects.values()), max(r[3] for r in rects.values())
+        image = self.game_screen.grab_region((x1, y1, x2, y2), max_age_ms if max_age_ms is not None else self.max_age_ms)
+        if image is None:
+            return {}
+        return {name: fill_ratio(image[r[1] - y1:r[3] - y1, r[0] - x1:r[2] - x1]) for name, r in rects.items()}
+
+    def _cross_check(self, interval: float | None):
+        if self.api is None or interval is None or time.time() - self.last_check < interval:
+            return
+        self.last_check = time.time()
+        stats = self.api.get_stats()
+        if not stats:
+            return
+        for orb, stat in ORB_STATS.items():
+            if stat not in stats:
+                continue
+            if orb != 'run':  # Run energy is always out of 100
+                self.max_levels[orb] = stats[stat]['level']
+            self.api_values[orb] = stats[stat]['boostedLevel']
+            if self.values.get(orb) is not None:
+                self.drift[orb] = self.values[orb] - self.api_values[orb]
+
+    def read(self, max_age_ms: float = None) -> dict:
+        """Returns {'hitpoints': int, 'prayer': int, 'run': int}; values are None when unreadable."""
+        self.ratios = self.read_ratios(max_age_ms)
+        if self.ratios:
+            if not self.last_check:
+                self._cross_check(0)  # Learn the maximum levels before the first estimate
+            self.values = {orb: int(round(self.ratios[orb] * self.max_levels.get(orb, 100))) if orb in self.ratios else None
+                           for orb in ORB_STATS}
+            empty = [orb for orb, value in self.values.items() if value == 0]
+            self._cross_check(CONFIRM_INTERVAL if empty else self.check_interval)
+            for orb in empty:
+                if orb in self.api_values:
+                    self.values[orb] = self.api_values[orb]
+        else:
+            self._cross_check(CONFIRM_INTERVAL)
+            self.values = {orb: self.api_values.get(orb) for orb in ORB_STATS}
+        return self.values
+
+    def get_health_points(self) -> int | None:
+        return self.read().get('hitpoints')
+
+    def get_prayer_points(self) -> int | None:
+        return self.read().get('prayer')
+
+    def get_energy(self) -> int | None:
+        return self.read().get('run')
+
+
+if __name__ == '__main__':
+    print("--- Orb Vitals Reader ---")
+    reader = VitalsReader()
+    try:
+        while True:
+            start = time.perf_counter()
+            values = reader.read()
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{values} ratios={ {k: round(v, 2) for k, v in reader.ratios.items()} } ({elapsed:.2f} ms)")
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
@@ -4,6 +4,9 @@ from datetime import timedelta
 import os
 from .game_screen import GameScreen
 from .runelite_api import RuneLiteAPI
+from .vision.change_detector import ChangeDetector
+from .vision import ocr
+from .vision.glyph_ocr import DIGITS
 
 class XPTracker:
     def __init__(self, skill_name='MAGIC'):
@@ -11,6 +14,10 @@ class XPTracker:
         self.runelite = RuneLiteAPI()
         self.skill_name = skill_name.upper()
         self.using_runelite = False
+
+        # OCR fallback: the XP counter is only re-read when its pixels change
+        self.xp_region = (1571, 35, 1658, 48)
+        self.xp_changes = ChangeDetector(tile_size=16, step=1)
         
         self.start_xp = None
         self.current_xp = None
@@ -62,6 +69,7 @@ class XPTracker:
                 return True
         except:
             self.using_runelite = False
+        ocr.warm_up()  # The OCR fallback will be used; load the reader in the background
         return False
 
     def get_xp(self):
@@ -82,7 +90,11 @@ class XPTracker:
         if not self.using_runelite:
             try:
                 # Capture and read XP from the specified coordinates (1571, 35) to (1658, 48)
-                xp_text = self.ocr.read_region(1571, 35, 1658, 48)
+                image = self.ocr.capture_region(*self.xp_region)
+                xp_text = None
+                if image is not None:
+                    self.xp_changes.update(image, self.xp_region)
+                    xp_text = self.xp_changes.cached('xp', lambda: self.ocr.read_text_from_image(image, charset=DIGITS), self.xp_region)
                 if xp_text:
                     return int(xp_text.replace(',', ''))
             except Exception as e:
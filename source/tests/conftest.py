@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the library as `src`, like the scripts in the project root do
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.vision.api_fusion import CanvasMapper
+
+
+def npc(x, y, width, height):
+    return SimpleNamespace(bounding_box=SimpleNamespace(x=x, y=y, width=width, height=height))
+
+
+def test_transform_fixed_client():
+    # A 765x541 client area holds the 765x503 canvas at its bottom, below 38 rows of chrome
+    assert CanvasMapper(region=(100, 50, 865, 591)).transform() == (100.0, 88.0, 1.0, 1.0)
+
+
+@pytest.mark.parametrize('scale', [1.5, 2.0])
+def test_transform_stretched_client_anchors_bottom_right(scale):
+    width, height = round(765 * scale), round(541 * scale)
+    origin_x, origin_y, scale_x, scale_y = CanvasMapper(region=(0, 0, width, height)).transform()
+    assert (scale_x, scale_y) == pytest.approx((width / 765, height / 541))
+    # The canvas's bottom-right corner is the client's
+    assert origin_x + 765 * scale_x == pytest.approx(width)
+    assert origin_y + 503 * scale_y == pytest.approx(height)
+
+
+def test_canvas_screen_round_trip():
+    mapper = CanvasMapper(region=(100, 50, 1630, 1132))
+    points = np.array([(0, 0), (200, 100), (764, 502)])
+    screen = mapper.canvas_to_screen(points)
+    np.testing.assert_array_equal(screen, [(100, 126), (500, 326), (1628, 1130)])
+    np.testing.assert_array_equal(mapper.screen_to_canvas(screen), points)
+
+
+def test_boxes_to_screen_scales_api_boxes():
+    mapper = CanvasMapper(region=(100, 50, 1630, 1132))
+    np.testing.assert_array_equal(mapper.boxes_to_screen([npc(200, 100, 60, 80)]), [(500, 326, 620, 486)])
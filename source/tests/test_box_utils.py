@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from src.object_detection import utils
+from src.object_detection.utils import iou_matrix, match_boxes, nms
+
+
+def random_boxes(rng, count, size=400, max_edge=60):
+    xy = rng.uniform(0, size, (count, 2))
+    wh = rng.uniform(4, max_edge, (count, 2))
+    return np.concatenate([xy, xy + wh], axis=1), rng.uniform(0, 1, count)
+
+
+def greedy_nms(boxes, scores, iou_threshold, class_ids=None):
+    """The per-box loop nms replaces."""
+    keep = []
+    for i in np.argsort(-scores, kind='stable'):
+        overlaps = [k for k in keep if class_ids is None or class_ids[k] == class_ids[i]]
+        if not overlaps or iou_matrix(boxes[i], boxes[overlaps]).max() <= iou_threshold:
+            keep.append(i)
+    return np.array(keep, dtype=np.int64)
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('iou_threshold', [0.2, 0.45, 0.7])
+def test_nms_matches_greedy_loop(seed, iou_threshold):
+    rng = np.random.default_rng(seed)
+    boxes, scores = random_boxes(rng, 300)
+    np.testing.assert_array_equal(nms(boxes, scores, iou_threshold), greedy_nms(boxes, scores, iou_threshold))
+
+
+def test_nms_per_class():
+    rng = np.random.default_rng(7)
+    boxes, scores = random_boxes(rng, 200)
+    class_ids = rng.integers(0, 3, len(boxes))
+    np.testing.assert_array_equal(nms(boxes, scores, 0.45, class_ids), greedy_nms(boxes, scores, 0.45, class_ids))
+
+
+def test_nms_chain_and_limits():
+    # b suppresses c, so c must not suppress d although they overlap
+    boxes = [(0, 0, 10, 10), (4, 0, 14, 10), (8, 0, 18, 10), (12, 0, 22, 10)]
+    scores = [0.9, 0.8, 0.7, 0.6]
+    np.testing.assert_array_equal(nms(boxes, scores, 0.3), [0, 2])
+    np.testing.assert_array_equal(nms(boxes, scores, 0.3, max_detections=1), [0])
+    assert nms(np.empty((0, 4)), []).size == 0
+
+
+def test_overlapping_pairs_blocks():
+    rng = np.random.default_rng(3)
+    boxes, _ = random_boxes(rng, 150, size=100)
+    rows, cols = utils.overlapping_pairs(boxes, 0.1, block=16)
+    iou = iou_matrix(boxes, boxes)
+    expected = {(i, j) for i, j in zip(*np.nonzero(np.triu(iou > 0.1, k=1)))}
+    assert set(zip(rows.tolist(), cols.tolist())) == expected
+
+
+@pytest.mark.skipif(utils.linear_sum_assignment is None, reason="needs scipy")
+def test_match_boxes_maximizes_total_overlap():
+    iou = np.array([[0.9, 0.6],
+                    [0.8, 0.0],
+                    [0.0, 0.1]])
+    assert sorted(match_boxes(iou, 0.2)) == [(0, 1), (1, 0)]
+    assert match_boxes(np.zeros((0, 3)), 0.2) == []
+
+
+def test_match_boxes_greedy_fallback(monkeypatch):
+    monkeypatch.setattr(utils, 'linear_sum_assignment', None)
+    iou = np.array([[0.9, 0.6],
+                    [0.8, 0.0]])
+    # Takes the best pair first, which leaves row 1 without a partner
+    assert sorted(match_boxes(iou, 0.2)) == [(0, 0)]
+    assert match_boxes(np.zeros((0, 3)), 0.2) == []
+
+
+def test_box_conversions():
+    boxes = utils.xywh_to_xyxy([(10, 20, 30, 40)])
+    np.testing.assert_array_equal(boxes, [[10, 20, 40, 60]])
+    np.testing.assert_array_equal(utils.xyxy_to_xywh(boxes), [[10, 20, 30, 40]])
+    np.testing.assert_array_equal(utils.cxcywh_to_xyxy([(25, 40, 30, 40)]), boxes)
+    np.testing.assert_array_equal(utils.clip_boxes([(-5, 0, 50, 90)], (0, 0, 40, 60)), [[0, 0, 40, 60]])
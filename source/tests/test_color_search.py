@@ -0,0 +1,17 @@
+import numpy as np
+
+from src.vision.color_search import color_mask, spectrum_bounds
+
+
+def test_spectrum_bounds_clips_out_of_range_values():
+    lower, upper = spectrum_bounds([255 - 20, 255 + 20, 0 - 20, 0 + 20, 128, 128])
+    assert lower.dtype == upper.dtype == np.uint8
+    assert lower.tolist() == [235, 0, 128]
+    assert upper.tolist() == [255, 20, 128]
+
+
+def test_color_mask_with_unclipped_range():
+    image = np.zeros((2, 2, 3), dtype=np.uint8)
+    image[0, 0] = (250, 5, 128)
+    mask = color_mask(image, [230, 270, -15, 25, 128, 128])
+    assert np.count_nonzero(mask) == 1 and mask[0, 0]
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from src.object_detection.detector import ObjectDetector
+
+LABELS = ['guard', 'chest', 'door']
+
+
+@pytest.fixture
+def make_detector(monkeypatch):
+    monkeypatch.setattr(ObjectDetector, '_load', lambda self: None)
+
+    def make(**kwargs):
+        return ObjectDetector('model.onnx', labels=LABELS, backend='opencv', **kwargs)
+    return make
+
+
+def yolov8_output(anchors: int = 6) -> np.ndarray:
+    """A (4 + classes, anchors) output: two overlapping guards, a chest, and background anchors."""
+    rows = np.zeros((anchors, 4 + len(LABELS)), dtype=np.float32)
+    rows[:, :4] = (160, 160, 10, 10)
+    rows[0, :4], rows[0, 4] = (100, 100, 40, 40), 0.9  # guard
+    rows[1, :4], rows[1, 4] = (102, 101, 40, 40), 0.7  # same guard, suppressed
+    rows[2, :4], rows[2, 5] = (200, 120, 20, 30), 0.8  # chest
+    rows[3, 6] = 0.1  # below the confidence threshold
+    return rows.T
+
+
+def test_decodes_yolov8_layout_with_nms(make_detector):
+    detector = make_detector()
+    detections = detector._decode(yolov8_output(), (1.0, 0, 0), (10, 20), (320, 320))
+    assert [(d.label, round(d.confidence, 2)) for d in detections] == [('guard', 0.9), ('chest', 0.8)]
+    assert detections[0].box == (90, 100, 130, 140)
+    assert detections[1].box == (200, 125, 220, 155)
+
+
+def test_decodes_yolov5_layout_with_fewer_anchors_than_columns(make_detector):
+    # Five anchors of 5 + 3 columns: rows < columns, yet the channels are the columns
+    output = np.zeros((5, 5 + len(LABELS)), dtype=np.float32)
+    output[0, :5] = (50, 60, 20, 20, 0.8)
+    output[0, 5 + 2] = 1.0
+    detector = make_detector()
+    detections = detector._decode(output, (0.5, 10, 0), (0, 0), (640, 640))
+    assert detector._output_layout(output.shape) == (False, 'yolov5')
+    assert [(d.label, round(d.confidence, 2)) for d in detections] == [('door', 0.8)]
+    # Letterbox offsets and scale are undone
+    assert detections[0].box == (60, 100, 100, 140)
+
+
+def test_square_yolov8_output_is_read_by_channel_count(make_detector):
+    # 7 anchors x 7 channels: only the class count tells the axes apart
+    output = yolov8_output(anchors=7)
+    detector = make_detector()
+    assert detector._output_layout(output.shape) == (True, 'yolov8')
+    assert len(detector._decode(output, (1.0, 0, 0), (0, 0), (320, 320))) == 2
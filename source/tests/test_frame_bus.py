@@ -0,0 +1,68 @@
+import time
+import uuid
+
+import numpy as np
+
+from src.vision.frame_bus import FrameBus, FrameProducer
+
+
+def _frame(width=120, height=80):
+    rng = np.random.default_rng(3)
+    return rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def _wait_for_frame(bus, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        result = bus.read()
+        if result is not None:
+            return result
+        time.sleep(0.01)
+    return None
+
+
+def _run_producer(bus, region, frame):
+    producer = FrameProducer(bus_name=bus.name, region=region, fps=100,
+                             backend_name='replay', backend_kwargs={'source': [frame]})
+    producer.start()
+    try:
+        result = _wait_for_frame(bus)
+        assert result is not None, "producer did not publish a frame"
+        view, rect, _ = result
+        pixels = view.copy()
+        index = bus.latest_index()
+        return pixels, rect, index
+    finally:
+        producer.stop()
+
+
+def test_producer_publishes_replay_frames():
+    frame = _frame()
+    bus = FrameBus.create(120, 80, slots=3, name=f"test-bus-{uuid.uuid4().hex[:8]}")
+    try:
+        pixels, rect, index = _run_producer(bus, (10, 20, 60, 50), frame)
+        assert rect == (10, 20, 60, 50)
+        assert index >= 0
+        np.testing.assert_array_equal(pixels, frame[20:50, 10:60])
+    finally:
+        bus.close()
+
+
+def test_producer_crops_frames_larger_than_the_bus():
+    frame = _frame()
+    bus = FrameBus.create(40, 30, slots=3, name=f"test-bus-{uuid.uuid4().hex[:8]}")
+    try:
+        pixels, rect, _ = _run_producer(bus, (5, 5, 105, 75), frame)
+        assert rect == (5, 5, 45, 35)
+        np.testing.assert_array_equal(pixels, frame[5:35, 5:45])
+    finally:
+        bus.close()
+
+
+def test_for_client_sizes_bus_from_region():
+    bus = FrameBus.for_client(region=(100, 50, 300, 200), margin=8, name=f"test-bus-{uuid.uuid4().hex[:8]}")
+    try:
+        assert (bus.width, bus.height) == (208, 158)
+        assert bus.fit((0, 0, 500, 100)) == (0, 0, 208, 100)
+    finally:
+        bus.close()
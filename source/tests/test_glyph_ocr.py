@@ -0,0 +1,77 @@
+import numpy as np
+import cv2
+import pytest
+
+from src.vision import glyph_ocr
+from src.vision.glyph_ocr import DIGITS, GlyphFont, GlyphReader, supports_scale
+
+ImageFont = pytest.importorskip('PIL.ImageFont')
+from PIL import Image, ImageDraw
+
+
+def render(text, color=(255, 255, 0), width=300):
+    """Text drawn pixel-exact with the game font on a dark background."""
+    canvas = Image.new('RGB', (width, 22), (20, 20, 20))
+    draw = ImageDraw.Draw(canvas)
+    draw.fontmode = '1'
+    draw.text((3, 2), text, fill=color, font=ImageFont.truetype(glyph_ocr.FONT_PATH, glyph_ocr.FONT_SIZE))
+    return np.asarray(canvas)
+
+
+@pytest.fixture(scope='module')
+def reader():
+    return GlyphReader(glyph_ocr.default_font())
+
+
+@pytest.mark.parametrize('text', ['Attack Goblin (level-2)', 'Walk here', 'Take Coins -> 12,500gp',
+                                  'Mining: 99 / 99', 'Hello, world! {x} @#~', 'ij"%,\'gy'])
+def test_reads_rendered_text(reader, text):
+    result = reader.read(render(text))
+    assert result.text == text
+    assert result.confidence == 1.0
+    assert len(result.glyphs) == len(text.replace(' ', ''))
+
+
+@pytest.mark.parametrize('scale', [2, 3])
+def test_reads_whole_stretch_factors(reader, scale):
+    image = cv2.resize(render('Attack Goblin'), None, fx=scale, fy=scale, interpolation=cv2.INTER_NEAREST)
+    result = reader.read(image, scale=scale)
+    assert result.text == 'Attack Goblin'
+    assert result.glyphs[0].box[2] - result.glyphs[0].box[0] >= 2 * scale
+
+
+@pytest.mark.parametrize('scale', [1.25, 1.5, 1.75])
+def test_refuses_fractional_stretch(reader, scale):
+    assert not supports_scale(scale)
+    image = cv2.resize(render('12,345'), None, fx=scale, fy=scale, interpolation=cv2.INTER_NEAREST)
+    assert reader.read(image, scale=scale).text == ''
+
+
+def test_digit_charset(reader):
+    assert reader.read(render('12,345'), charset=DIGITS).text == '12,345'
+    # 'l' is not a digit, so it must not be read as '1'
+    assert reader.read(render('l2'), charset=DIGITS).text[0] != '1'
+
+
+def test_empty_and_multiline(reader):
+    assert reader.read(np.zeros((20, 40, 3), np.uint8)).text == ''
+    image = np.concatenate([render('Bank'), render('Deposit')])
+    assert reader.read(image).text == 'Bank\nDeposit'
+
+
+def test_learn_and_sheet_round_trip(tmp_path):
+    font = GlyphFont()
+    assert font.learn(render('Hello'), 'Hello')
+    assert sorted(set(font.chars)) == ['H', 'e', 'l', 'o']
+    assert not font.learn(render('Hello'), 'Help')
+
+    path = str(tmp_path / 'sheet.npz')
+    font.save(path)
+    loaded = GlyphFont()
+    loaded.load(path)
+    assert loaded.chars == font.chars and loaded.tops == font.tops
+    assert GlyphReader(loaded).read(render('Hole')).text == 'Hole'
+
+
+def test_empty_font_reads_nothing():
+    assert GlyphReader(GlyphFont()).read(render('Walk')).text == ''
@@ -0,0 +1,55 @@
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from src.vision import ocr
+
+LOAD_SECONDS = 0.5
+
+
+@pytest.fixture
+def slow_easyocr(monkeypatch):
+    """An easyocr stand-in whose Reader takes LOAD_SECONDS to build."""
+    loads = []
+
+    class Reader:
+        def __init__(self, languages, verbose=True):
+            loads.append(threading.current_thread().name)
+            time.sleep(LOAD_SECONDS)
+
+    monkeypatch.setitem(sys.modules, 'easyocr', types.SimpleNamespace(Reader=Reader))
+    monkeypatch.setattr(ocr, '_reader', None)
+    monkeypatch.setattr(ocr, '_warm_up_thread', None)
+    yield loads
+    if ocr._warm_up_thread is not None:
+        ocr._warm_up_thread.join()
+
+
+def test_warm_up_returns_while_a_load_is_running(slow_easyocr):
+    ocr.warm_up()
+    time.sleep(0.05)  # Let the thread take the load lock
+    start = time.perf_counter()
+    for _ in range(5):
+        ocr.warm_up()
+    assert time.perf_counter() - start < LOAD_SECONDS / 5
+    assert not ocr.is_ready()
+
+    reader = ocr.get_reader()  # Waits for the warm-up instead of loading again
+    assert ocr.is_ready() and ocr.get_reader() is reader
+    assert slow_easyocr == ['ocr-warm-up']
+
+
+def test_release_does_not_wait_for_a_load(slow_easyocr):
+    ocr.warm_up()
+    time.sleep(0.05)
+    start = time.perf_counter()
+    ocr.release()
+    assert time.perf_counter() - start < LOAD_SECONDS / 5
+
+    ocr._warm_up_thread.join()
+    assert not ocr.is_ready()  # The released load is not kept
+    assert ocr.get_reader() is not None and ocr.is_ready()
+    assert len(slow_easyocr) == 2
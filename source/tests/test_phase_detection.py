@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from src.vision import kernels, phase_detection
+from src.vision.color_lut import PhasePalette
+
+TOLERANCE = 20
+PHASE_COLORS = {
+    'RANGE': [(129, 144, 17), (96, 110, 20)],
+    'MAGIC': [(20, 90, 160), (60, 120, 200)],
+    'MELEE': [(160, 40, 30)],
+}
+
+
+@pytest.fixture(autouse=True)
+def uncached_palettes(monkeypatch):
+    """Compiles palettes in memory instead of writing them to src/data/cache."""
+    palettes = {}
+
+    def get_phase_palette(phase_colors, tolerance=20, bits=8, color_space='rgb'):
+        key = (tuple(phase_colors), tolerance, bits, color_space)
+        if key not in palettes:
+            palettes[key] = PhasePalette(phase_colors, tolerance, bits, cache_dir=None, color_space=color_space)
+        return palettes[key]
+
+    monkeypatch.setattr(phase_detection, 'get_phase_palette', get_phase_palette)
+
+
+def phase_image(seed, height=60, width=80):
+    """Phase colors with noise inside and just outside the tolerance, mixed with random pixels."""
+    rng = np.random.default_rng(seed)
+    colors = np.array([color for colors in PHASE_COLORS.values() for color in colors])
+    image = colors[rng.integers(0, len(colors), (height, width))] + rng.integers(-TOLERANCE - 4, TOLERANCE + 5, (height, width, 3))
+    noise = rng.random((height, width)) < 0.3
+    image[noise] = rng.integers(0, 256, (int(noise.sum()), 3))
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def reference_scores(image, origin, stride, exclude_region):
+    """The original per-pixel loop, on every `stride`-th pixel."""
+    scores = {phase: 0 for phase in PHASE_COLORS}
+    valid = 0
+    for y in range(0, image.shape[0], stride):
+        for x in range(0, image.shape[1], stride):
+            abs_x, abs_y = origin[0] + x, origin[1] + y
+            if exclude_region and (exclude_region[0] <= abs_x < exclude_region[2] and exclude_region[1] <= abs_y < exclude_region[3]):
+                continue
+            valid += 1
+            pixel = image[y, x]
+            for phase, colors in PHASE_COLORS.items():
+                for color in colors:
+                    if all(abs(int(pixel[i]) - color[i]) <= TOLERANCE for i in range(3)):
+                        scores[phase] += 1
+                        break
+    return scores, valid
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('stride', [1, 3])
+@pytest.mark.parametrize('exclude_region', [None, (120, 215, 150, 240)])
+@pytest.mark.parametrize('compiled', [True, False])
+def test_phase_histogram_matches_pixel_loop(monkeypatch, seed, stride, exclude_region, compiled):
+    if not compiled:
+        monkeypatch.setattr(kernels, '_jit', {})  # Use the numpy fallbacks
+    image = phase_image(seed)
+    origin = (100, 200)
+    phases, counts, valid = phase_detection.phase_histogram(image, origin, TOLERANCE, PHASE_COLORS, exclude_region, stride)
+    scores, expected_valid = reference_scores(image, origin, stride, exclude_region)
+    assert valid == expected_valid
+    assert dict(zip(phases, counts.tolist())) == scores
+
+
+def test_detect_phase_confidence():
+    image = phase_image(5)
+    scores, valid = reference_scores(image, (0, 0), 1, None)
+    best = max(scores, key=scores.get)
+    phase, confidence = phase_detection.detect_phase(image, (0, 0), None, TOLERANCE, PHASE_COLORS, stride=1)
+    assert phase == best
+    assert confidence == pytest.approx(scores[best] * 100 / valid)
+
+
+def test_palette_classify_matches_colors():
+    palette = PhasePalette(PHASE_COLORS, TOLERANCE, cache_dir=None)
+    image = phase_image(9, 30, 30)
+    labels = palette.classify(image)
+    for (y, x), label in np.ndenumerate(labels):
+        expected = next((i for i, colors in enumerate(PHASE_COLORS.values(), start=1)
+                         if any(np.all(np.abs(image[y, x].astype(int) - color) <= TOLERANCE) for color in colors)), 0)
+        assert label == expected
+    assert palette.classify_color((129, 144, 17)) == 'RANGE'
+    assert palette.classify_color((0, 0, 0)) is None
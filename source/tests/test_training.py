@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.object_detection.training import FrameStore, build_dataset, label_events, match_labels
+
+
+def frame(value: int, width: int = 64, height: int = 48) -> np.ndarray:
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def event(event_type: str, timestamp, npc_id: int, name: str, box: tuple) -> dict:
+    id_key, name_key = ('actorId', 'actorName') if event_type == 'ACTOR_POSITION_UPDATE' else ('npcId', 'npcName')
+    x, y, width, height = box
+    return {'eventType': event_type, 'timestamp': timestamp,
+            'eventData': {id_key: npc_id, name_key: name, 'boundingBox': {'x': x, 'y': y, 'width': width, 'height': height}}}
+
+
+EVENTS = [
+    event('NPC_SPAWNED', '1970-01-01T00:00:01.000000000Z', 1, 'Guard', (10, 8, 20, 16)),
+    event('ACTOR_POSITION_UPDATE', 1.9, 1, 'Guard', (11, 8, 20, 16)),
+    event('ACTOR_POSITION_UPDATE', 2.05, 1, 'Guard', (12, 8, 20, 16)),
+    event('ACTOR_POSITION_UPDATE', 2.1, 2, 'Cow', (40, 30, 2, 2)),  # Too small to keep
+    {'eventType': 'NPC_SPAWNED', 'timestamp': 2.0, 'eventData': {'npcId': 3}},  # No box
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = FrameStore(str(tmp_path / 'frames'), chunk_size=4)
+    # Frame at t=2.5 repeats the previous one and is dropped
+    for timestamp, value in [(1.0, 10), (2.0, 20), (2.5, 20), (3.0, 30), (4.0, 40), (5.0, 50), (6.0, 60)]:
+        store.add(frame(value), timestamp)
+    store.flush()
+    return store
+
+
+def test_store_skips_duplicates_and_chunks_frames(store):
+    assert (store.added, store.duplicates) == (6, 1)
+    assert len(store.chunk_paths()) == 2
+    stored = list(store)
+    assert [timestamp for _, timestamp, _ in stored] == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    assert stored[1][0][0, 0, 0] == 20 and stored[0][2] == (0, 0, 64, 48)
+
+
+def test_match_labels_keeps_the_nearest_event_per_npc():
+    labels = label_events(EVENTS)
+    times = np.array([label.timestamp for label in labels])
+    matched = match_labels(labels, 2.0, 0.3, times)
+    assert sorted((label.name, label.timestamp) for label in matched) == [('Cow', 2.1), ('Guard', 2.05)]
+    assert match_labels(labels, 2.0, 0.3) == matched
+
+
+def test_build_dataset_writes_yolo_labels(store, tmp_path):
+    output = str(tmp_path / 'dataset')
+    summary = build_dataset(store, EVENTS, output, canvas_transform=(0, 0, 1, 1))
+    assert summary == {'frames': 2, 'boxes': 2, 'classes': ['Cow', 'Guard']}
+
+    label_dir = os.path.join(output, 'labels', 'train')
+    lines = [open(os.path.join(label_dir, name)).read() for name in sorted(os.listdir(label_dir))]
+    assert lines == ["1 0.312500 0.333333 0.312500 0.333333",
+                     "1 0.343750 0.333333 0.312500 0.333333"]
+    assert len(os.listdir(os.path.join(output, 'images', 'train'))) == 2
+    assert open(os.path.join(output, 'classes.txt')).read() == "Cow\nGuard"
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from src.game_screen import GameScreen
+from src.ui_utils import get_ui_rects
+from src.vision.capture import create_backend
+from src.vision.frame_cache import FrameCache
+from src.vision.ui_mask import UIMaskCache
+from src.vision.vitals import VitalsReader
+
+CLIENT = (0, 0, 765, 541)
+# Orb colors: hitpoints red, prayer cyan, run amber
+COLORS = {'hitpoints': (200, 30, 30), 'prayer': (40, 190, 210), 'run': (220, 170, 20)}
+
+
+def draw_orbs(rects: dict, ratios: dict) -> np.ndarray:
+    """A client frame whose orbs are dark above their fill level and colored below it, with a grey icon in the middle."""
+    image = np.full((CLIENT[3], CLIENT[2], 3), 40, dtype=np.uint8)
+    for orb, (x1, y1, x2, y2) in rects.items():
+        height = y2 - y1
+        filled_from = y2 - int(round(ratios[orb] * height))
+        image[y1:y2, x1:x2] = (15, 15, 15)
+        image[filled_from:y2, x1:x2] = COLORS[orb]
+        width = x2 - x1
+        image[y1 + height // 3:y2 - height // 3, x1 + width // 3:x2 - width // 3] = (180, 180, 180)
+    return image
+
+
+def make_reader(ratios: dict, **kwargs) -> VitalsReader:
+    frame = draw_orbs(UIMaskCache(region=CLIENT, chrome=get_ui_rects('orbs')).rects(), ratios)
+    frame_cache = FrameCache(capture_backend=create_backend('replay', source=[frame]), region=CLIENT)
+    return VitalsReader(GameScreen(frame_cache=frame_cache), **kwargs)
+
+
+def test_fill_ratios_follow_orb_levels():
+    ratios = {'hitpoints': 0.5, 'prayer': 1.0, 'run': 0.25}
+    measured = make_reader(ratios).read_ratios()
+    assert measured.keys() == ratios.keys()
+    for orb, ratio in ratios.items():
+        assert measured[orb] == pytest.approx(ratio, abs=0.1)
+
+
+def test_read_scales_ratios_to_levels():
+    reader = make_reader({'hitpoints': 0.5, 'prayer': 1.0, 'run': 0.0}, max_levels={'hitpoints': 80, 'prayer': 70})
+    values = reader.read()
+    assert values['hitpoints'] == pytest.approx(40, abs=8)
+    assert values['prayer'] == 70
+    # Without an API an empty orb cannot be confirmed, so it reads as empty
+    assert values['run'] == 0
@@ -1,25 +1,24 @@
 import sys
 from pynput import mouse, keyboard
-from PIL import ImageGrab
 from src.phase_tracker import RotationManager
+from src.game_screen import GameScreen
+from src.vision.color_lut import PhasePalette
 
 # --- Global Variables ---
 TOLERANCE = 20
 PHASE_COLORS = {}
+PALETTE = None
+GAME_SCREEN = None
 
 def get_phase_from_color(clicked_color: tuple) -> str:
     """Compares a clicked color to the phase colors and returns the phase name."""
-    for phase, colors in PHASE_COLORS.items():
-        for color in colors:
-            if all(abs(int(clicked_color[i]) - color[i]) <= TOLERANCE for i in range(3)):
-                return phase
-    return None
+    return PALETTE.classify_color(clicked_color)
 
 def on_click(x, y, button, pressed):
     """Callback function for mouse clicks."""
     if pressed and button == mouse.Button.left:
         try:
-            pixel_color = ImageGrab.grab(bbox=(x, y, x+1, y+1)).getpixel((0, 0))
+            pixel_color = tuple(int(c) for c in GAME_SCREEN.sample_pixels([(x, y)])[0])
             phase = get_phase_from_color(pixel_color)
             if phase:
                 print(f"Click at ({int(x)}, {int(y)}) with color {pixel_color} -> Phase Detected: {phase}")
@@ -35,7 +34,7 @@ def on_press(key):
         return False # Stop listener
 
 def main():
-    global PHASE_COLORS
+    global PHASE_COLORS, PALETTE, GAME_SCREEN
     print("Starting click phase detector...")
     
     # Load phase color data from RotationManager
@@ -43,11 +42,14 @@ def main():
         rotation_manager = RotationManager()
         phase_data = rotation_manager._get_zulrah_rotations_data()['types']
         PHASE_COLORS = {phase_info['style']: phase_info['colors'] for _, phase_info in phase_data.items()}
+        PALETTE = PhasePalette(PHASE_COLORS, TOLERANCE)
         print("Phase colors loaded successfully.")
     except Exception as e:
         print(f"Failed to load phase colors: {e}")
         return
 
+    GAME_SCREEN = GameScreen()
+
     print("Left-click on the boss to detect its phase.")
     print("Press 'Esc' to stop.")
 
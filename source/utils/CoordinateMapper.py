@@ -1,10 +1,12 @@
 import threading
 import keyboard
 import win32api
-import pyautogui
 import time
 from src.graphics.window_overlay import WindowOverlay
 from src.client_window import RuneLiteClientWindow
+from src.game_screen import GameScreen
+from src.vision.capture_thread import CaptureThread
+from src.vision.change_detector import ChangeDetector
 
 if __name__ == "__main__":
     print("Starting Coordinate Mapper...")
@@ -13,6 +15,13 @@ if __name__ == "__main__":
 
     stop_event = threading.Event()
     client = RuneLiteClientWindow()
+    capture_thread = CaptureThread(client, fps=30)
+    game_screen = GameScreen(capture_backend=capture_thread.capture)
+    changes = ChangeDetector(tile_size=16, step=1)
+
+    def get_cursor_color(frame, cursor_x, cursor_y):
+        """Reads the pixel under the cursor from a captured frame, grabbing it only if the frame does not cover it."""
+        return tuple(int(c) for c in game_screen.sample_pixels([(cursor_x, cursor_y)], frame=frame)[0])
 
     def record_coordinates():
         """Records and prints the current relative mouse coordinates and color."""
@@ -23,7 +32,7 @@ if __name__ == "__main__":
                 return
 
             # Get color at cursor
-            rgb_color = pyautogui.pixel(cursor_x, cursor_y)
+            rgb_color = get_cursor_color(capture_thread.latest(), cursor_x, cursor_y)
 
             # Calculate relative coordinates
             win_left, win_top = win_rect['left'], win_rect['top']
@@ -34,7 +43,7 @@ if __name__ == "__main__":
             offset_y = win_height - rel_y
             
             print(f"Recorded Coordinates: X={offset_x}, Y={offset_y}, Color={rgb_color}")
-        except (win32api.error, pyautogui.PyAutoGUIException):
+        except win32api.error:
             print("Could not record coordinates. Is the RuneLite window active and cursor in bounds?")
 
     keyboard.add_hotkey('`', record_coordinates)
@@ -43,15 +52,22 @@ if __name__ == "__main__":
         win_rect = client.get_rect()
         if win_rect:
             overlay = WindowOverlay(title="CoordinateMapper", width=win_rect["w"], height=win_rect["h"], x=win_rect['left'], y=win_rect['top'])
-            
-            # Main drawing loop
+            capture_thread.start()
+
+            # Main drawing loop, driven by newly captured frames
+            last_index = None
+            last_drawn = None
             while not stop_event.is_set():
-                cursor_x, cursor_y = win32api.GetCursorPos()
-                
-                try:
-                    rgb_color = pyautogui.pixel(cursor_x, cursor_y)
-                except pyautogui.PyAutoGUIException:
-                    rgb_color = (0, 0, 0) # Default color if out of bounds
+                frame = capture_thread.next_frame(last_index, timeout=1.0)
+                if frame is None:
+                    continue
+                last_index = frame.index
+                cursor_x, cursor_y = frame.cursor or win32api.GetCursorPos()
+
+                # Re-read the pixel only when the cursor moved or the tile under it changed
+                changes.update(frame.image, frame.rect)
+                rgb_color = changes.cached('cursor', lambda: get_cursor_color(frame, cursor_x, cursor_y),
+                                           (cursor_x, cursor_y, cursor_x + 1, cursor_y + 1))
 
                 win_rect = client.get_rect()
                 if not win_rect:
@@ -65,6 +81,11 @@ if __name__ == "__main__":
                 offset_x = win_width - rel_x
                 offset_y = win_height - rel_y
 
+                # Nothing to redraw while the readout is the same
+                if (offset_x, offset_y, rgb_color) == last_drawn:
+                    continue
+                last_drawn = (offset_x, offset_y, rgb_color)
+
                 overlay.clear()
                 # Draw Coordinates Text
                 overlay.draw_text(
@@ -81,7 +102,6 @@ if __name__ == "__main__":
                     color=(255, 255, 255)  # White
                 )
                 overlay.update_overlay()
-                time.sleep(1/30) # Update at 30 FPS
         else:
             print("RuneLite window not found. Exiting.")
 
@@ -91,4 +111,5 @@ if __name__ == "__main__":
         print(f"An unexpected error occurred: {e}")
     finally:
         print("\nStopping Coordinate Mapper...")
-        stop_event.set()
\ No newline at end of file
+        stop_event.set()
+        capture_thread.stop()
\ No newline at end of file
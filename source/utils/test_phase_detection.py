@@ -2,6 +2,7 @@
 import time
 from src.phase_tracker import RotationManager, PhaseDetector
 from src.client_window import RuneLiteClientWindow
+from src.vision.ui_mask import UIMaskCache
 
 def on_phase_change(phase, confidence):
     """Callback function for when a phase change is detected."""
@@ -14,12 +15,13 @@ def test_phase_detection():
 
     phase_detector = PhaseDetector(phase_data, on_phase_change=on_phase_change)
 
-    # Define the precise game view and player exclusion regions
-    game_view_region = (258, 174, 769, 509)
-    player_mask_region = (471, 292, 565, 399)
+    # The game view and player regions follow the client's size and position (see "chrome" in user-interface.json)
+    ui_masks = UIMaskCache(RuneLiteClientWindow())
+    game_view_region = ui_masks.game_view_rect()
+    player_mask_region = ui_masks.exclude_rects(exclude=('player',))
 
     print(f"Starting phase detection in region: {game_view_region}")
-    print(f"Excluding region: {player_mask_region}")
+    print(f"Excluding regions: {player_mask_region}")
     phase_detector.start(game_view_region, exclude_region=player_mask_region, interval=0.2)
 
     try: